@@ -1,18 +1,21 @@
 from groq import Groq
 import pandas as pd
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import random
 import time
 
-def generate_email(row: pd.Series, client: Groq, prompt: dict[str, str]) -> str:
-    segment: str = row["segmentation"]
+from src.email_cache_methods import EmailCache, check_cache_mode, make_cache_key
 
-    instruction: str = prompt[segment]
+DEFAULT_MODEL: str = "openai/gpt-oss-120b"
+DEFAULT_TEMPERATURE: float = 0.7
 
-    formatted_prompt: str = f"""
+EMAIL_PROMPT_TEMPLATE: str = """
     ROLE: You are an expert Email Marketer for the store 'Wojciech Kiełbowicz & Co'.
     GOAL: Write a warm, professional email based on this idea: "{instruction}"
     
     STRICT WRITING RULES:
-    1. OPENING: Start the email EXACTLY with: "Dear Customer {row['customer_id']},"
+    1. OPENING: Start the email EXACTLY with: "Dear Customer {customer_id},"
     2. BODY: Write 2-3 short paragraphs. Use double new lines (\\n\\n) between paragraphs to ensure readability.
     3. ENDING: Sign off EXACTLY as:
        "Best regards,
@@ -20,21 +23,357 @@ def generate_email(row: pd.Series, client: Groq, prompt: dict[str, str]) -> str:
     4. PROHIBITED: Do NOT use placeholders like [Name], [Date], or [ID]. Do NOT use square brackets text at all.
     """
 
+SEGMENT_EMAIL_OPENING: str = "Dear Customer,"
+
+def compile_prompt_templates(prompt: dict[str, str]) -> dict[str, tuple[str, str]]:
+    """
+    Pre-renders the email prompt once per segment.
+
+    The ROLE/GOAL/STRICT WRITING RULES block and the segment instruction are
+    formatted a single time; the result is split around the customer id, so a
+    per-customer prompt is just `head + customer_id + tail`.
+
+    Args:
+        prompt (dict[str, str]): Segment name -> campaign instruction.
+
+    Returns:
+        dict[str, tuple[str, str]]: Segment name -> (head, tail) of the prompt.
+    """
+    templates: dict[str, tuple[str, str]] = {}
+
+    for segment, instruction in prompt.items():
+        segment_prompt: str = EMAIL_PROMPT_TEMPLATE.replace("{instruction}", instruction)
+        head, tail = segment_prompt.split("{customer_id}", 1)
+        templates[segment] = (head, tail)
+
+    return templates
+
+def render_prompt(templates: dict[str, tuple[str, str]], segment: str, customer_id: object) -> str:
+    head, tail = templates[segment]
+    return f"{head}{customer_id}{tail}"
+
+def build_segment_prompt(templates: dict[str, tuple[str, str]], segment: str) -> str:
+    """Builds a customer-agnostic prompt whose email opens with `SEGMENT_EMAIL_OPENING`."""
+    head, tail = templates[segment]
+    return f"{head.removesuffix('Dear Customer ')}{SEGMENT_EMAIL_OPENING}{tail.removeprefix(',')}"
+
+def personalise_email(email: str, customer_id: object) -> str:
+    """
+    Fills the customer id into a segment-level draft.
+
+    The opening line produced for `build_segment_prompt` ("Dear Customer,") is
+    replaced with "Dear Customer {customer_id},". If the model did not follow the
+    opening rule, the personalised greeting is prepended instead.
+    """
+    greeting: str = f"Dear Customer {customer_id},"
+    stripped: str = email.lstrip()
+
+    if stripped.startswith(SEGMENT_EMAIL_OPENING):
+        return greeting + stripped[len(SEGMENT_EMAIL_OPENING):]
+    return f"{greeting}\n\n{stripped}"
+
+def build_email_prompt(segment: str, customer_id: object, templates: dict[str, tuple[str, str]]) -> str:
+    """
+    Builds the full prompt sent to the LLM for a single customer.
+
+    Args:
+        segment (str): The RFM segment of the customer (key of `templates`).
+        customer_id (object): The customer identifier used in the email opening.
+        templates (dict[str, tuple[str, str]]): Output of `compile_prompt_templates`, compiled once per campaign.
+
+    Returns:
+        str: The formatted prompt.
+    """
+    return render_prompt(templates, segment, customer_id)
+
+def generate_email(
+        row: pd.Series,
+        client: Groq,
+        templates: dict[str, tuple[str, str]],
+        cache: EmailCache|None = None,
+        cache_mode: str = "use"
+) -> str|None:
+    """
+    Generates the email of one customer row ("segmentation", "customer_id").
+
+    `templates` comes from `compile_prompt_templates(prompt)`, called once before
+    `DataFrame.apply`, so no row re-renders the prompt template.
+    """
+    formatted_prompt: str = build_email_prompt(row["segmentation"], row["customer_id"], templates)
+
+    if cache is not None:
+        check_cache_mode(cache_mode)
+        key: str = make_cache_key(formatted_prompt, DEFAULT_MODEL, DEFAULT_TEMPERATURE)
+        if cache_mode != "refresh":
+            cached: str|None = cache.get(key)
+            if cached is not None or cache_mode == "cache_only":
+                return cached
+
     try:
         completion = client.chat.completions.create(
-            model="openai/gpt-oss-120b",
+            model=DEFAULT_MODEL,
             messages=[
                 {
                     "role": "user",
                     "content": formatted_prompt
                 }
             ],
-            temperature=0.7
+            temperature=DEFAULT_TEMPERATURE
         )
         email: str = completion.choices[0].message.content
+        if cache is not None:
+            cache.put(key, email)
         time.sleep(1)
         return email
     except Exception as e:
         print(f"Error:\n{e}")
         return "ERROR"
-        
\ No newline at end of file
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket refilled continuously at `per_minute` units per minute.
+
+    Used to keep concurrent completions under the provider's requests-per-minute
+    and tokens-per-minute limits. The bucket starts full, so the first `capacity`
+    units are available immediately.
+    """
+
+    def __init__(self, per_minute: float, capacity: float|None = None) -> None:
+        self.rate: float = per_minute / 60.0
+        self.capacity: float = capacity if capacity is not None else per_minute
+        self.tokens: float = self.capacity
+        self.updated_at: float = time.monotonic()
+        self._lock: asyncio.Lock|None = None
+        self._loop: asyncio.AbstractEventLoop|None = None
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Waits until `amount` units are available and takes them."""
+        amount = min(amount, self.capacity)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A bucket may be shared by consecutive asyncio.run() calls; locks are loop-bound.
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Takes (positive) or returns (negative) units after the real usage is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def _is_retryable(error: Exception) -> bool:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+async def _create_completion(client: Groq, formatted_prompt: str, model: str, temperature: float):
+    create = client.chat.completions.create
+    kwargs: dict = {
+        "model": model,
+        "messages": [{"role": "user", "content": formatted_prompt}],
+        "temperature": temperature,
+    }
+    if asyncio.iscoroutinefunction(create):
+        return await create(**kwargs)
+    return await asyncio.to_thread(create, **kwargs)
+
+async def complete_prompts_async(
+        prompts: list[str],
+        client: Groq,
+        labels: list[object]|None = None,
+        max_concurrency: int = 8,
+        requests_per_minute: float = 30,
+        tokens_per_minute: float|None = None,
+        max_completion_tokens: int = 400,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        model: str = DEFAULT_MODEL,
+        temperature: float = DEFAULT_TEMPERATURE,
+        cache: EmailCache|None = None,
+        cache_mode: str = "use",
+        request_limiter: TokenBucket|None = None,
+        token_limiter: TokenBucket|None = None
+) -> list[str|None]:
+    """
+    Runs many chat completions concurrently under rate limits.
+
+    Completions run at most `max_concurrency` at a time and are throttled by token
+    buckets for requests and (optionally) tokens per minute. Token usage is estimated
+    up front from the prompt length plus `max_completion_tokens` and corrected with
+    the real usage when the response reports it. Rate-limit (429) and server (5xx)
+    errors are retried with full-jitter exponential backoff; any other error, or
+    running out of retries, yields "ERROR" for that prompt, like `generate_email`.
+
+    Args:
+        prompts (list[str]): Fully formatted prompts.
+        client (Groq): A `Groq`/`AsyncGroq` client or any object exposing
+            `chat.completions.create`.
+        labels (list[object]|None): Names used in error messages (default: positions).
+        max_concurrency (int): Maximum number of in-flight completions.
+        requests_per_minute (float): Request rate limit.
+        tokens_per_minute (float|None): Token rate limit, None to disable.
+        max_completion_tokens (int): Expected completion size used for token estimates.
+        max_retries (int): Retries per prompt for retryable errors.
+        base_delay (float): Backoff base in seconds.
+        max_delay (float): Backoff cap in seconds.
+        model (str): Model name.
+        temperature (float): Sampling temperature.
+        cache (EmailCache|None): Optional persistent cache of generated emails.
+        cache_mode (str): "use" reads the cache and calls the API only on misses,
+            "refresh" always calls the API and overwrites the cache, "cache_only"
+            never calls the API and returns None for misses.
+        request_limiter (TokenBucket|None): Shared request bucket, overrides
+            `requests_per_minute` (lets several batches share one limit).
+        token_limiter (TokenBucket|None): Shared token bucket, overrides `tokens_per_minute`.
+
+    Returns:
+        list[str|None]: Completions in the same order as `prompts`.
+    """
+    if cache is not None:
+        check_cache_mode(cache_mode)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    request_bucket = request_limiter or TokenBucket(requests_per_minute)
+    token_bucket = token_limiter
+    if token_bucket is None and tokens_per_minute:
+        token_bucket = TokenBucket(tokens_per_minute)
+
+    async def complete_one(formatted_prompt: str, label: object) -> str|None:
+        if cache is not None:
+            key: str = make_cache_key(formatted_prompt, model, temperature)
+            if cache_mode != "refresh":
+                cached: str|None = cache.get(key)
+                if cached is not None or cache_mode == "cache_only":
+                    return cached
+
+        estimated_tokens: int = len(formatted_prompt) // 4 + max_completion_tokens
+
+        async with semaphore:
+            for attempt in range(max_retries + 1):
+                await request_bucket.acquire()
+                if token_bucket is not None:
+                    await token_bucket.acquire(estimated_tokens)
+                try:
+                    completion = await _create_completion(client, formatted_prompt, model, temperature)
+                except Exception as e:
+                    if attempt < max_retries and _is_retryable(e):
+                        delay: float = min(max_delay, base_delay * 2 ** attempt)
+                        await asyncio.sleep(random.uniform(0, delay))
+                        continue
+                    print(f"Error ({label}):\n{e}")
+                    return "ERROR"
+
+                usage = getattr(completion, "usage", None)
+                if token_bucket is not None and getattr(usage, "total_tokens", None) is not None:
+                    token_bucket.adjust(usage.total_tokens - estimated_tokens)
+                email: str = completion.choices[0].message.content
+                if cache is not None:
+                    cache.put(key, email)
+                return email
+
+        return "ERROR"
+
+    labels = labels if labels is not None else list(range(len(prompts)))
+    return list(await asyncio.gather(*(complete_one(p, label) for p, label in zip(prompts, labels))))
+
+async def generate_emails_async(dataframe: pd.DataFrame, client: Groq, prompt: dict[str, str], **kwargs) -> list[str|None]:
+    """
+    Generates email drafts for every row of the segmented RFM DataFrame concurrently.
+
+    Prompts are rendered from templates compiled once per segment and completed
+    with `complete_prompts_async`.
+
+    Args:
+        dataframe (pd.DataFrame): Must contain "customer_id" and "segmentation" columns.
+        client (Groq): A `Groq`/`AsyncGroq` client or a compatible fake.
+        prompt (dict[str, str]): Segment name -> campaign instruction.
+        **kwargs: Passed through to `complete_prompts_async`.
+
+    Returns:
+        list[str|None]: Email drafts in the same order as the input rows.
+    """
+    templates: dict[str, tuple[str, str]] = compile_prompt_templates(prompt)
+    customer_ids: list[object] = dataframe["customer_id"].tolist()
+    prompts: list[str] = [
+        render_prompt(templates, segment, customer_id)
+        for segment, customer_id in zip(dataframe["segmentation"], customer_ids)
+    ]
+    labels: list[str] = [f"customer {customer_id}" for customer_id in customer_ids]
+
+    return await complete_prompts_async(prompts, client, labels, **kwargs)
+
+def _run_sync(coroutine):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # Inside Jupyter an event loop is already running, so run on a helper thread.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+def generate_emails_batch(dataframe: pd.DataFrame, client: Groq, prompt: dict[str, str], **kwargs) -> pd.Series:
+    """
+    Synchronous wrapper around `generate_emails_async`.
+
+    Works both in plain scripts and inside Jupyter, where an event loop is already
+    running (the coroutine is then executed on a helper thread).
+
+    Args:
+        dataframe (pd.DataFrame): Must contain "customer_id" and "segmentation" columns.
+        client (Groq): A `Groq` client or a compatible fake.
+        prompt (dict[str, str]): Segment name -> campaign instruction.
+        **kwargs: Passed through to `complete_prompts_async`.
+
+    Returns:
+        pd.Series: Email drafts aligned with `dataframe.index`.
+    """
+    emails: list[str|None] = _run_sync(generate_emails_async(dataframe, client, prompt, **kwargs))
+
+    return pd.Series(emails, index=dataframe.index, name="email_draft")
+
+def generate_segment_emails(dataframe: pd.DataFrame, client: Groq, prompt: dict[str, str], **kwargs) -> pd.Series:
+    """
+    Generates one draft per segment and personalises it locally for each customer.
+
+    Only the segments present in `dataframe` are sent to the LLM, so a campaign
+    costs O(segments) API calls instead of O(customers). Every customer of a
+    segment gets the same body with their own "Dear Customer {id}," opening.
+    Segments whose generation failed keep "ERROR" (or None for cache misses).
+
+    Args:
+        dataframe (pd.DataFrame): Must contain "customer_id" and "segmentation" columns.
+        client (Groq): A `Groq` client or a compatible fake.
+        prompt (dict[str, str]): Segment name -> campaign instruction.
+        **kwargs: Passed through to `complete_prompts_async`.
+
+    Returns:
+        pd.Series: Email drafts aligned with `dataframe.index`.
+    """
+    templates: dict[str, tuple[str, str]] = compile_prompt_templates(prompt)
+    segments: list[str] = dataframe["segmentation"].unique().tolist()
+    prompts: list[str] = [build_segment_prompt(templates, segment) for segment in segments]
+    labels: list[str] = [f"segment {segment}" for segment in segments]
+
+    drafts: dict[str, str|None] = dict(zip(segments, _run_sync(complete_prompts_async(prompts, client, labels, **kwargs))))
+
+    emails: list[str|None] = [
+        personalise_email(drafts[segment], customer_id) if drafts[segment] not in (None, "ERROR") else drafts[segment]
+        for segment, customer_id in zip(dataframe["segmentation"], dataframe["customer_id"])
+    ]
+
+    return pd.Series(emails, index=dataframe.index, name="email_draft")
@@ -0,0 +1,182 @@
+import time
+from collections.abc import Callable
+import pandas as pd
+from sqlalchemy import Engine, create_engine, text
+
+from src import database_methods as dbm
+from src import rfm_methods as rfm
+from src import schema_methods as scm
+
+# The RFM aggregation from notebook 02, with the table name left as a placeholder.
+NOTEBOOK_RFM_QUERY: str = """
+SELECT 
+    customer_id, 
+    SUM(quantity * price) AS monetary, 
+    COUNT (DISTINCT order_id) AS frequency,
+    ((SELECT MAX(date) FROM {table_name}) - MAX(date)) AS recency, 
+    ROUND((SUM(quantity * price) / (COUNT (DISTINCT order_id))), 2) AS average_order_value, 
+    CASE
+        WHEN 
+            ((SELECT MAX(date) FROM {table_name}) - MAX(date)) >= 90
+        THEN
+            1
+        ELSE
+            0
+    END AS churn, 
+    CONCAT('customer_', customer_id,'@mail.com') AS email
+FROM 
+    {table_name}
+GROUP BY 
+    customer_id;
+"""
+
+def create_synthetic_orders(
+        engine: Engine,
+        table_name: str = "benchmark_order_details",
+        n_rows: int = 1_000_000,
+        n_customers: int = 5_000,
+        n_days: int = 365
+) -> None:
+    """
+    Creates a synthetic order table with the `e_commerce_order_details` schema.
+
+    Rows are generated server side with `generate_series`, in date order (like
+    the real daily loads), with about 3 lines per order.
+
+    Args:
+        engine (Engine): SQLAlchemy engine connected to PostgreSQL.
+        table_name (str): Table to (re)create.
+        n_rows (int): Number of order lines.
+        n_customers (int): Number of distinct customers.
+        n_days (int): Number of days covered, ending today.
+    """
+    column_definitions: str = ", ".join(f"{name} {sql_type}" for name, sql_type in dbm.ORDER_DETAILS_COLUMNS.items())
+
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {table_name};"))
+        connection.execute(text(f"CREATE TABLE {table_name} ({column_definitions});"))
+
+    append_synthetic_orders(engine, table_name, n_rows, n_customers, n_days)
+
+def append_synthetic_orders(
+        engine: Engine,
+        table_name: str = "benchmark_order_details",
+        n_rows: int = 1_000_000,
+        n_customers: int = 5_000,
+        n_days: int = 365,
+        last_day: int = 0
+) -> None:
+    """
+    Appends synthetic order lines for the `n_days` days ending `last_day` days after today.
+
+    Order ids continue after the ones already in the table, so an appended day
+    behaves like a nightly load.
+    """
+    with engine.begin() as connection:
+        first_id: int = connection.execute(text(f"SELECT (COUNT(*) + 2) / 3 * 3 FROM {table_name};")).scalar()
+        connection.execute(
+            text(f"""
+                INSERT INTO {table_name} (order_id, date, product_id, product_name, price, quantity, customer_id, country)
+                SELECT
+                    CAST(i / 3 AS VARCHAR),
+                    CURRENT_DATE + :last_day - :n_days + 1 + CAST(FLOOR(CAST(i - :first_id AS NUMERIC) * :n_days / :n_rows) AS INT),
+                    CAST(i % 3000 AS VARCHAR),
+                    'Product ' || (i % 3000),
+                    ROUND(CAST(1 + random() * 50 AS NUMERIC), 2),
+                    1 + CAST(FLOOR(random() * 20) AS INT),
+                    CAST(FLOOR(random() * :n_customers) AS VARCHAR),
+                    'United Kingdom'
+                FROM
+                    generate_series(:first_id, :first_id + :n_rows - 1) AS i;
+            """),
+            {"n_rows": n_rows, "n_customers": n_customers, "n_days": n_days, "last_day": last_day, "first_id": first_id}
+        )
+
+def _time_call(function: Callable[[], object], repeats: int, setup: Callable[[int], object]|None = None) -> list[float]:
+    timings: list[float] = []
+    for repeat in range(repeats):
+        if setup is not None:
+            setup(repeat)
+        start: float = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def _time_query(engine: Engine, query: str, repeats: int) -> list[float]:
+    def run_query() -> None:
+        with engine.connect() as connection:
+            connection.execute(text(query)).fetchall()
+    return _time_call(run_query, repeats)
+
+def _refresh_and_segment(engine: Engine, full_refresh: bool) -> None:
+    rfm.refresh_rfm_aggregates(engine, full_refresh=full_refresh)
+    rfm.get_rfm_segments(engine)
+
+def benchmark_rfm_query(
+        engine: Engine,
+        n_rows: int = 1_000_000,
+        n_customers: int = 5_000,
+        repeats: int = 3,
+        n_days: int = 365,
+        schema: str = "rfm_benchmark",
+        keep_schema: bool = False
+) -> pd.DataFrame:
+    """
+    Times the notebook RFM aggregation and the incremental `rfm_methods` path on a synthetic table.
+
+    The table is created with `create_synthetic_orders` in its own schema, so the
+    `rfm_methods` tables of the benchmark do not touch the real ones. Stages:
+        - "no_indexes": the notebook query without indexes (and without statistics),
+        - "indexed_and_analyzed": the same query after `schema_methods.ensure_indexes`,
+        - "rfm_full_refresh": `refresh_rfm_aggregates(full_refresh=True)` + `get_rfm_segments`,
+        - "rfm_incremental_refresh": one synthetic day appended (not timed), then
+          `refresh_rfm_aggregates` + `get_rfm_segments`, as after a nightly load.
+
+    Args:
+        engine (Engine): SQLAlchemy engine connected to PostgreSQL.
+        n_rows (int): Size of the synthetic table.
+        n_customers (int): Number of distinct customers.
+        repeats (int): Timed runs per stage.
+        n_days (int): Days covered by the synthetic table (one appended day has n_rows / n_days rows).
+        schema (str): Schema holding the synthetic and RFM tables.
+        keep_schema (bool): Keeps the schema after the benchmark.
+
+    Returns:
+        pd.DataFrame: One row per stage with n_rows, best, median and mean timings (seconds).
+    """
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE;"))
+        connection.execute(text(f"CREATE SCHEMA {schema};"))
+    schema_engine: Engine = create_engine(engine.url, connect_args={"options": f"-c search_path={schema}"})
+
+    table_name: str = rfm.ORDERS_TABLE
+    day_rows: int = max(1, n_rows // n_days)
+    query: str = NOTEBOOK_RFM_QUERY.format(table_name=table_name)
+
+    try:
+        create_synthetic_orders(schema_engine, table_name, n_rows, n_customers, n_days)
+        results: dict[str, list[float]] = {"no_indexes": _time_query(schema_engine, query, repeats)}
+        scm.ensure_indexes(schema_engine, table_name, dbm.ORDER_DETAILS_INDEXES, drop_indexes=[])
+        results["indexed_and_analyzed"] = _time_query(schema_engine, query, repeats)
+        results["rfm_full_refresh"] = _time_call(lambda: _refresh_and_segment(schema_engine, True), repeats)
+        results["rfm_incremental_refresh"] = _time_call(
+            lambda: _refresh_and_segment(schema_engine, False),
+            repeats,
+            setup=lambda repeat: append_synthetic_orders(schema_engine, table_name, day_rows, n_customers, 1, repeat + 1)
+        )
+    finally:
+        schema_engine.dispose()
+        if not keep_schema:
+            with engine.begin() as connection:
+                connection.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE;"))
+
+    return pd.DataFrame([
+        {
+            "stage": stage,
+            "n_rows": n_rows,
+            "best_seconds": min(timings),
+            "median_seconds": pd.Series(timings).median(),
+            "mean_seconds": sum(timings) / len(timings),
+        }
+        for stage, timings in results.items()
+    ])
@@ -0,0 +1,143 @@
+from collections.abc import Iterable, Iterator
+import os
+from groq import Groq
+import pandas as pd
+
+from src import ai_agent_methods as aiam
+
+def read_checkpoint(checkpoint_path: str) -> set[str]:
+    """
+    Reads the set of already completed customer ids from a checkpoint file.
+
+    Args:
+        checkpoint_path (str): Append-only text file with one customer id per line.
+
+    Returns:
+        set[str]: Completed customer ids (empty if the file does not exist yet).
+    """
+    if not os.path.exists(checkpoint_path):
+        return set()
+
+    with open(checkpoint_path, "r", encoding="utf-8") as file:
+        return {line.strip() for line in file if line.strip()}
+
+def append_checkpoint(checkpoint_path: str, customer_ids: Iterable[object]) -> None:
+    with open(checkpoint_path, "a", encoding="utf-8") as file:
+        file.writelines(f"{customer_id}\n" for customer_id in customer_ids)
+        file.flush()
+        os.fsync(file.fileno())
+
+def iter_email_drafts(
+        source: pd.DataFrame|Iterable[pd.DataFrame],
+        client: Groq,
+        prompt: dict[str, str],
+        completed_ids: set[str]|None = None,
+        batch_size: int = 100,
+        **kwargs
+) -> Iterator[pd.DataFrame]:
+    """
+    Lazily generates email drafts batch by batch, skipping completed customers.
+
+    `source` may be a whole segmented RFM DataFrame or any iterable of DataFrame
+    chunks (e.g. `pd.read_sql(..., chunksize=...)`), so only one batch is kept
+    in memory at a time. Each batch is generated concurrently with
+    `ai_agent_methods.generate_emails_batch`.
+
+    Args:
+        source (pd.DataFrame|Iterable[pd.DataFrame]): Rows with "customer_id" and "segmentation".
+        client (Groq): A `Groq` client or a compatible fake.
+        prompt (dict[str, str]): Segment name -> campaign instruction.
+        completed_ids (set[str]|None): Customer ids (as strings) to skip.
+        batch_size (int): Number of customers generated per batch.
+        **kwargs: Passed through to `generate_emails_batch`.
+
+    Yields:
+        pd.DataFrame: "customer_id" and "email_draft" columns for each finished batch.
+    """
+    completed_ids = completed_ids or set()
+
+    # One pair of buckets for the whole run, so every batch doesn't start with a full burst.
+    if "request_limiter" not in kwargs:
+        kwargs["request_limiter"] = aiam.TokenBucket(kwargs.get("requests_per_minute", 30))
+    if "token_limiter" not in kwargs and kwargs.get("tokens_per_minute"):
+        kwargs["token_limiter"] = aiam.TokenBucket(kwargs["tokens_per_minute"])
+
+    chunks: Iterable[pd.DataFrame] = [source] if isinstance(source, pd.DataFrame) else source
+
+    for chunk in chunks:
+        pending: pd.DataFrame = chunk[~chunk["customer_id"].astype(str).isin(completed_ids)]
+
+        for start in range(0, len(pending), batch_size):
+            batch: pd.DataFrame = pending.iloc[start:start + batch_size]
+            drafts: pd.Series = aiam.generate_emails_batch(batch, client, prompt, **kwargs)
+
+            yield pd.DataFrame({
+                "customer_id": batch["customer_id"].to_numpy(),
+                "email_draft": drafts.to_numpy()
+            })
+
+def write_campaign_drafts(
+        source: pd.DataFrame|Iterable[pd.DataFrame],
+        client: Groq,
+        prompt: dict[str, str],
+        output_path: str = os.path.join("..", "data", "processed", "marketing_campaign_drafts.csv"),
+        checkpoint_path: str|None = None,
+        file_format: str = "csv",
+        batch_size: int = 100,
+        **kwargs
+) -> int:
+    """
+    Streams generated email drafts to disk and checkpoints completed customers.
+
+    Every finished batch is appended to the output straight away (CSV rows, or one
+    Parquet part file per batch in the `output_path` directory) and only then its
+    customer ids are appended to the checkpoint file. On restart the checkpoint is
+    read back and completed customers are skipped, so a crash loses at most the
+    batch in flight. Failed drafts ("ERROR" or cache misses) are neither written
+    nor checkpointed, so a rerun retries them.
+
+    Args:
+        source (pd.DataFrame|Iterable[pd.DataFrame]): Rows with "customer_id" and "segmentation".
+        client (Groq): A `Groq` client or a compatible fake.
+        prompt (dict[str, str]): Segment name -> campaign instruction.
+        output_path (str): CSV file, or directory of Parquet parts for "parquet".
+        checkpoint_path (str|None): Checkpoint file (default: `output_path` + ".checkpoint").
+        file_format (str): "csv" or "parquet".
+        batch_size (int): Number of customers generated and written per batch.
+        **kwargs: Passed through to `generate_emails_batch`.
+
+    Returns:
+        int: Number of drafts written during this run.
+    """
+    if file_format not in ("csv", "parquet"):
+        raise ValueError(f"Unknown file_format '{file_format}'. Expected 'csv' or 'parquet'.")
+
+    checkpoint_path = checkpoint_path or f"{output_path.rstrip(os.sep)}.checkpoint"
+    completed_ids: set[str] = read_checkpoint(checkpoint_path)
+
+    if file_format == "parquet":
+        os.makedirs(output_path, exist_ok=True)
+        part_number: int = len([name for name in os.listdir(output_path) if name.endswith(".parquet")])
+    else:
+        directory: str = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    written: int = 0
+
+    for drafts in iter_email_drafts(source, client, prompt, completed_ids, batch_size, **kwargs):
+        drafts = drafts[drafts["email_draft"].notna() & (drafts["email_draft"] != "ERROR")]
+        if drafts.empty:
+            continue
+
+        if file_format == "parquet":
+            drafts.to_parquet(os.path.join(output_path, f"part-{part_number:05d}.parquet"), index=False)
+            part_number += 1
+        else:
+            write_header: bool = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+            drafts.to_csv(output_path, mode="a", header=write_header, index=False)
+
+        append_checkpoint(checkpoint_path, drafts["customer_id"])
+        written += len(drafts)
+
+    return written
@@ -1,25 +1,426 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 import csv
-from io import StringIO
+from decimal import Decimal
+from functools import cache
+from io import RawIOBase, StringIO
+import itertools
 import os
-from sqlalchemy import create_engine, Connection, Engine, Table
+import re
+import struct
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, text, Connection, Engine, Table
 from dotenv import load_dotenv
 
+ORDER_DETAILS_COLUMNS: dict[str, str] = {
+    "order_id": "VARCHAR(30)",
+    "date": "DATE",
+    "product_id": "VARCHAR(30)",
+    "product_name": "VARCHAR(50)",
+    "price": "NUMERIC(8, 2)",
+    "quantity": "INT",
+    "customer_id": "VARCHAR(30)",
+    "country": "VARCHAR(30)",
+}
+ORDER_DETAILS_INDEXES: dict[str, str] = {
+    "idx_order_details_customer_date": "(customer_id, date)",
+    "idx_order_details_date_brin": "USING BRIN (date)",
+}
 
-def get_db_engine() -> Engine:
-    
+_engines: dict[tuple, Engine] = {}
+_engines_lock = threading.Lock()
+
+@cache
+def _load_env() -> None:
     load_dotenv()
+
+def get_connection_string() -> str:
+    """
+    Builds the database URL from the environment (.env is read once per process).
+
+    `DB_URL` takes precedence (e.g. "sqlite:///local.db" for a local stand-in),
+    otherwise a PostgreSQL URL is assembled from DB_USER, DB_PASSWORD, DB_HOST,
+    DB_PORT and DB_NAME.
+    """
+    _load_env()
+    if os.getenv("DB_URL"):
+        return os.environ["DB_URL"]
+
     user = os.getenv("DB_USER")
     password = os.getenv("DB_PASSWORD")
     host = os.getenv("DB_HOST")
     port = os.getenv("DB_PORT")
     db_name = os.getenv("DB_NAME")
 
-    connection_string: str= f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db_name}"
+    return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db_name}"
+
+def get_db_engine(
+        connection_string: str|None = None,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_pre_ping: bool = True,
+        pool_recycle: int = 1800,
+        statement_timeout_ms: int|None = None
+) -> Engine:
+    """
+    Returns a process-wide cached SQLAlchemy engine.
+
+    Engines are cached per connection string and pool settings, so repeated calls
+    (e.g. from different notebook cells) reuse the same pool of warm connections
+    instead of opening new ones. Pool sizing options are ignored for SQLite,
+    which manages its own pool.
+
+    Args:
+        connection_string (str|None): Database URL (default: `get_connection_string()`).
+        pool_size (int): Number of connections kept open in the pool.
+        max_overflow (int): Extra connections allowed above `pool_size` under load.
+        pool_pre_ping (bool): Tests connections on checkout and replaces dead ones.
+        pool_recycle (int): Seconds after which a connection is reopened (-1 disables).
+        statement_timeout_ms (int|None): PostgreSQL `statement_timeout` for every session.
+
+    Returns:
+        Engine: The cached engine.
+    """
+    connection_string = connection_string or get_connection_string()
+    key: tuple = (connection_string, pool_size, max_overflow, pool_pre_ping, pool_recycle, statement_timeout_ms)
+
+    with _engines_lock:
+        engine: Engine|None = _engines.get(key)
+        if engine is not None:
+            return engine
+
+        options: dict = {"pool_pre_ping": pool_pre_ping, "pool_recycle": pool_recycle}
+
+        if connection_string.startswith("postgresql"):
+            options.update({"pool_size": pool_size, "max_overflow": max_overflow})
+            if statement_timeout_ms is not None:
+                options["connect_args"] = {"options": f"-c statement_timeout={int(statement_timeout_ms)}"}
+
+        engine = create_engine(connection_string, **options)
+        _engines[key] = engine
+
+        return engine
+
+def dispose_db_engines() -> None:
+    """Closes every pooled connection and empties the engine cache."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+def reset_db_engines_after_fork() -> None:
+    """
+    Drops pooled connections inherited from a parent process without closing them.
+
+    Call at the start of a child process (e.g. a multiprocessing worker) so it
+    opens its own connections instead of sharing the parent's sockets.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose(close=False)
+
+class IteratorFile(RawIOBase):
+    """
+    Read-only file object over an iterator of byte chunks.
+
+    Lets `cursor.copy_expert` pull COPY data lazily, so only the chunk currently
+    being sent is held in memory and formatting overlaps with network I/O.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._buffer: bytes = b""
+        self._position: int = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._position >= len(self._buffer):
+            try:
+                self._buffer, self._position = next(self._chunks), 0
+            except StopIteration:
+                return 0
+
+        size: int = min(len(buffer), len(self._buffer) - self._position)
+        buffer[:size] = self._buffer[self._position:self._position + size]
+        self._position += size
+        return size
+
+def iter_csv_chunks(rows: Iterable[tuple[object, ...]], rows_per_chunk: int = 1000) -> Iterator[bytes]:
+    """Formats rows as CSV, `rows_per_chunk` rows at a time."""
+    rows = iter(rows)
+    while True:
+        block: list[tuple[object, ...]] = list(itertools.islice(rows, rows_per_chunk))
+        if not block:
+            return
+        s_buf = StringIO()
+        csv.writer(s_buf).writerows(block)
+        yield s_buf.getvalue().encode("utf-8")
+
+def _decode_dictionaries(batch: pa.RecordBatch) -> pa.RecordBatch:
+    columns: list[pa.Array] = [
+        column.dictionary_decode() if pa.types.is_dictionary(column.type) else column
+        for column in batch.columns
+    ]
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+def iter_arrow_csv_chunks(batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+    """Formats Arrow record batches as header-less CSV (nulls as empty fields), one chunk per batch."""
+    write_options = pa_csv.WriteOptions(include_header=False)
+    for batch in batches:
+        sink = pa.BufferOutputStream()
+        pa_csv.write_csv(_decode_dictionaries(batch), sink, write_options=write_options)
+        yield sink.getvalue().to_pybytes()
+
+# SQL column type -> Arrow type its binary COPY representation is encoded from.
+_SQL_ARROW_TYPES: list[tuple[re.Pattern, object]] = [
+    (re.compile(r"(VARCHAR|CHARACTER VARYING|CHAR|CHARACTER)(\s*\(\s*\d+\s*\))?|TEXT"), pa.string()),
+    (re.compile(r"DATE"), pa.date32()),
+    (re.compile(r"TIMESTAMP( WITHOUT TIME ZONE)?"), pa.timestamp("us")),
+    (re.compile(r"TIMESTAMPTZ|TIMESTAMP WITH TIME ZONE"), pa.timestamp("us", tz="UTC")),
+    (re.compile(r"(NUMERIC|DECIMAL)\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)"), lambda match: pa.decimal128(int(match.group(2)), int(match.group(3)))),
+    (re.compile(r"SMALLINT|INT2"), pa.int16()),
+    (re.compile(r"INT|INTEGER|INT4"), pa.int32()),
+    (re.compile(r"BIGINT|INT8"), pa.int64()),
+    (re.compile(r"REAL|FLOAT4"), pa.float32()),
+    (re.compile(r"DOUBLE PRECISION|FLOAT8"), pa.float64()),
+    (re.compile(r"BOOLEAN|BOOL"), pa.bool_()),
+]
+
+def sql_type_to_arrow(sql_type: str) -> pa.DataType:
+    """
+    Returns the Arrow type matching a SQL column type for binary COPY (e.g. "NUMERIC(8, 2)" -> decimal128(8, 2)).
+
+    Raises:
+        TypeError: If the SQL type has no binary encoder (e.g. NUMERIC without a scale); use CSV COPY instead.
+    """
+    normalised: str = " ".join(sql_type.upper().split())
+    for pattern, arrow_type in _SQL_ARROW_TYPES:
+        match = pattern.fullmatch(normalised)
+        if match:
+            return arrow_type(match) if callable(arrow_type) else arrow_type
+    raise TypeError(f"Binary COPY does not support SQL type {sql_type}; use CSV COPY instead.")
+
+def cast_batch_to_sql_types(batch: pa.RecordBatch, column_types: dict[str, str]) -> pa.RecordBatch:
+    """
+    Casts every column of a batch to the Arrow type matching its SQL column type.
+
+    Timestamps become dates, numbers become text for VARCHAR columns, floats are
+    rounded to the scale of a NUMERIC column and dictionary columns are decoded.
+    VARCHAR lengths are checked, so bad data fails here instead of inside COPY.
+
+    Raises:
+        ValueError: If a column cannot be cast or does not fit its SQL type.
+    """
+    columns: list[pa.Array] = []
+    for name, column in zip(batch.schema.names, _decode_dictionaries(batch).columns):
+        if name not in column_types:
+            raise ValueError(f"Column {name} has no SQL type; pass it in `column_types`.")
+
+        sql_type: str = column_types[name]
+        target: pa.DataType = sql_type_to_arrow(sql_type)
+        try:
+            if pa.types.is_decimal(target) and pa.types.is_floating(column.type):
+                column = pc.round(column.cast(pa.float64()), target.scale)
+            column = column.cast(target, safe=not (pa.types.is_date32(target) and pa.types.is_timestamp(column.type)))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as error:
+            raise ValueError(f"Column {name} ({batch.schema.field(name).type}) cannot be cast to {sql_type}: {error}") from error
+
+        length = re.search(r"\((\d+)\)", sql_type) if pa.types.is_string(target) else None
+        if length and len(column) and (pc.max(pc.utf8_length(column)).as_py() or 0) > int(length.group(1)):
+            raise ValueError(f"Column {name} has values longer than {sql_type}.")
+
+        columns.append(column)
+
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+_PG_EPOCH_DAYS: int = 10957  # 2000-01-01 - 1970-01-01
+_PG_EPOCH_MICROSECONDS: int = _PG_EPOCH_DAYS * 86_400_000_000
+
+def _binary_field_encoder(data_type: pa.DataType):
+    if pa.types.is_boolean(data_type):
+        return lambda value: b"\x00\x00\x00\x01" + (b"\x01" if value else b"\x00")
+    if pa.types.is_int16(data_type):
+        return struct.Struct(">ih").pack, 2
+    if pa.types.is_int32(data_type):
+        return struct.Struct(">ii").pack, 4
+    if pa.types.is_int64(data_type):
+        return struct.Struct(">iq").pack, 8
+    if pa.types.is_float32(data_type):
+        return struct.Struct(">if").pack, 4
+    if pa.types.is_float64(data_type):
+        return struct.Struct(">id").pack, 8
+    if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+        def encode_text(value: str) -> bytes:
+            encoded: bytes = value.encode("utf-8")
+            return struct.pack(">i", len(encoded)) + encoded
+        return encode_text
+    raise TypeError(f"Binary COPY does not support Arrow type {data_type}; use CSV COPY instead.")
+
+def _encode_numeric(value: Decimal, scale: int) -> bytes:
+    # PostgreSQL NUMERIC: base-10000 digit groups around the decimal point, weight of the first group.
+    integer_part, _, fraction_part = format(abs(value), f".{scale}f").partition(".")
+    integer_part = integer_part.lstrip("0")
+    integer_part = integer_part.zfill(-(-len(integer_part) // 4) * 4)
+    fraction_part = fraction_part.ljust(-(-len(fraction_part) // 4) * 4, "0")
+
+    digits: list[int] = [int(integer_part[i:i + 4]) for i in range(0, len(integer_part), 4)]
+    weight: int = len(digits) - 1
+    digits += [int(fraction_part[i:i + 4]) for i in range(0, len(fraction_part), 4)]
+
+    while digits and digits[0] == 0:
+        digits.pop(0)
+        weight -= 1
+    while digits and digits[-1] == 0:
+        digits.pop()
+    if not digits:
+        weight = 0
+
+    sign: int = 0x4000 if value < 0 and digits else 0x0000
+    body: bytes = struct.pack(f">hhHH{len(digits)}H", len(digits), weight, sign, scale, *digits)
+    return struct.pack(">i", len(body)) + body
+
+def _binary_column_fields(column: pa.Array) -> list[bytes]:
+    null_field: bytes = struct.pack(">i", -1)
 
-    engine: Engine = create_engine(connection_string)
+    if pa.types.is_decimal(column.type):
+        scale: int = column.type.scale
+        return [null_field if v is None else _encode_numeric(v, scale) for v in column.to_pylist()]
 
-    return engine
+    if pa.types.is_date32(column.type):
+        column = column.cast(pa.int32())
+        values = [None if v is None else v - _PG_EPOCH_DAYS for v in column.to_pylist()]
+        pack = struct.Struct(">ii").pack
+        return [null_field if v is None else pack(4, v) for v in values]
+
+    if pa.types.is_timestamp(column.type):
+        column = column.cast(pa.timestamp("us", tz=column.type.tz)).cast(pa.int64())
+        values = [None if v is None else v - _PG_EPOCH_MICROSECONDS for v in column.to_pylist()]
+        pack = struct.Struct(">iq").pack
+        return [null_field if v is None else pack(8, v) for v in values]
+
+    encoder = _binary_field_encoder(column.type)
+    values: list = column.to_pylist()
+
+    if isinstance(encoder, tuple):
+        pack, size = encoder
+        return [null_field if v is None else pack(size, v) for v in values]
+    return [null_field if v is None else encoder(v) for v in values]
+
+def iter_arrow_binary_chunks(batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+    """
+    Encodes Arrow record batches in PostgreSQL binary COPY format.
+
+    Supported Arrow types: bool, int16/32/64, float32/64, decimal128, string,
+    date32 and timestamps. Binary COPY does no type coercion, so the target
+    columns must match exactly (e.g. int32 -> INTEGER, decimal128 -> NUMERIC,
+    string -> TEXT/VARCHAR); `copy_record_batches` casts the batches with
+    `cast_batch_to_sql_types` first.
+    """
+    yield b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+
+    for batch in batches:
+        batch = _decode_dictionaries(batch)
+        tuple_header: bytes = struct.pack(">h", batch.num_columns)
+        columns: list[list[bytes]] = [_binary_column_fields(column) for column in batch.columns]
+        yield b"".join(tuple_header + b"".join(fields) for fields in zip(*columns))
+
+    yield struct.pack(">h", -1)
+
+def copy_record_batches(
+        dbapi_conn,
+        batches: Iterable[pa.RecordBatch],
+        table_name: str,
+        columns: list[str],
+        binary: bool = False,
+        column_types: dict[str, str]|None = None
+) -> int:
+    """
+    Streams Arrow record batches into a table with COPY FROM STDIN.
+
+    In binary mode every batch is cast to `column_types` first. The SQL types are
+    checked and the first batch is cast before COPY starts, so a mismatch raises
+    a clear error instead of failing inside the COPY stream.
+
+    Args:
+        dbapi_conn: psycopg2 connection (e.g. `engine.raw_connection()` or `connection.connection`).
+        batches (Iterable[pa.RecordBatch]): Batches whose columns are in `columns` order.
+        table_name (str): Target table, optionally schema-qualified.
+        columns (list[str]): Target column names.
+        binary (bool): Uses binary COPY format instead of CSV.
+        column_types (dict[str, str]|None): Column name -> SQL type of the target table, required for binary COPY.
+
+    Returns:
+        int: Number of loaded rows.
+    """
+    copy_format: str = "BINARY" if binary else "CSV"
+
+    if binary:
+        if column_types is None or any(name not in column_types for name in columns):
+            raise ValueError("Binary COPY needs the SQL type of every column in `column_types`.")
+        column_types = {name: column_types[name] for name in columns}
+        for sql_type in column_types.values():
+            sql_type_to_arrow(sql_type)
+
+        batches = (cast_batch_to_sql_types(batch, column_types) for batch in batches)
+        first_batch: pa.RecordBatch|None = next(batches, None)
+        batches = itertools.chain([] if first_batch is None else [first_batch], batches)
+
+    chunks: Iterator[bytes] = iter_arrow_binary_chunks(batches) if binary else iter_arrow_csv_chunks(batches)
+
+    with dbapi_conn.cursor() as cur:
+        sql: str = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH {copy_format}"
+        cur.copy_expert(sql=sql, file=IteratorFile(chunks), size=1 << 20)
+        return cur.rowcount
+
+def copy_parquet_to_table(
+        engine: Engine,
+        parquet_path: str,
+        table_name: str = "e_commerce_order_details",
+        columns: list[str]|None = None,
+        batch_size: int = 65_536,
+        binary: bool = False,
+        column_types: dict[str, str] = ORDER_DETAILS_COLUMNS
+) -> int:
+    """
+    Bulk loads a Parquet file into an existing table with constant memory.
+
+    Record batches are read lazily from the Parquet file and fed straight into
+    COPY, so only one batch is resident at a time regardless of the file size.
+
+    Args:
+        engine (Engine): SQLAlchemy engine connected to PostgreSQL.
+        parquet_path (str): Source file (e.g. "../data/processed/e_commerce_order_details.parquet").
+        table_name (str): Existing target table.
+        columns (list[str]|None): Columns to load (default: every column in the file).
+        batch_size (int): Rows per record batch.
+        binary (bool): Uses binary COPY format (see `iter_arrow_binary_chunks`).
+        column_types (dict[str, str]): Column name -> SQL type of the table, used to cast for binary COPY.
+
+    Returns:
+        int: Number of loaded rows.
+    """
+    parquet_file = pq.ParquetFile(parquet_path)
+    columns = columns or parquet_file.schema_arrow.names
+    batches = parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+
+    dbapi_conn = engine.raw_connection()
+    try:
+        rowcount: int = copy_record_batches(dbapi_conn, batches, table_name, columns, binary, column_types)
+        dbapi_conn.commit()
+    except Exception:
+        dbapi_conn.rollback()
+        raise
+    finally:
+        dbapi_conn.close()
+
+    return rowcount
 
 def psql_insert_copy(
         table: Table, 
@@ -28,14 +429,140 @@ def psql_insert_copy(
         data_iter: Iterable[tuple[object,...]]
 ) -> int|None :
 
-    s_buf = StringIO()
-    writer = csv.writer(s_buf)
-    writer.writerows(data_iter)
-    s_buf.seek(0)
-
     dbapi_conn = connect.connection
     with dbapi_conn.cursor() as cur:
         schema_prefix: str = f"{table.schema}." if table.schema else ""
         sql: str = f"COPY {schema_prefix}{table.name} ({', '.join(keys)}) FROM STDIN WITH CSV"
-        cur.copy_expert(sql=sql, file=s_buf)
-        return cur.rowcount
\ No newline at end of file
+        cur.copy_expert(sql=sql, file=IteratorFile(iter_csv_chunks(data_iter)))
+        return cur.rowcount
+
+def _partition_batches(
+        source: pd.DataFrame|str,
+        columns: list[str],
+        partition_column: str,
+        n_partitions: int,
+        batch_size: int
+) -> list[Iterable[pa.RecordBatch]]:
+    if isinstance(source, str):
+        # Parquet input: consecutive `batch_size` row ranges are handed to whichever partition asks
+        # next, so every stream gets work even when the file has a single row group.
+        shared_batches: Iterator[pa.RecordBatch] = pq.ParquetFile(source).iter_batches(batch_size=batch_size, columns=columns)
+        lock = threading.Lock()
+
+        def next_batches() -> Iterator[pa.RecordBatch]:
+            while True:
+                with lock:
+                    batch: pa.RecordBatch|None = next(shared_batches, None)
+                if batch is None:
+                    return
+                yield batch
+
+        return [next_batches() for _ in range(n_partitions)]
+
+    dataframe: pd.DataFrame = source
+    if partition_column not in dataframe.columns or any(col not in dataframe.columns for col in columns):
+        dataframe = dataframe.reset_index()
+
+    partition_ids = pd.util.hash_array(dataframe[partition_column].to_numpy()) % n_partitions
+    return [
+        pa.Table.from_pandas(dataframe.loc[partition_ids == i, columns], preserve_index=False).to_batches(batch_size)
+        for i in range(n_partitions)
+    ]
+
+def create_staging_table(engine: Engine, table_name: str, column_types: dict[str, str] = ORDER_DETAILS_COLUMNS) -> str:
+    """Drops and recreates the UNLOGGED staging table of `table_name` and returns its name."""
+    staging_table: str = f"{table_name}_staging"
+    column_definitions: str = ", ".join(f"{name} {sql_type}" for name, sql_type in column_types.items())
+
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {staging_table};"))
+        connection.execute(text(f"CREATE UNLOGGED TABLE {staging_table} ({column_definitions});"))
+
+    return staging_table
+
+def swap_in_staging_table(engine: Engine, staging_table: str, table_name: str, indexes: dict[str, str] = ORDER_DETAILS_INDEXES) -> None:
+    """
+    Makes a loaded staging table durable, indexes and analyzes it, and renames it over
+    `table_name` in one transaction. On failure the staging table is dropped and the target is left untouched.
+    """
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {staging_table} SET LOGGED;"))
+            for index_name, index_columns in indexes.items():
+                connection.execute(text(f"CREATE INDEX {index_name}_staging ON {staging_table} {index_columns};"))
+            connection.execute(text(f"ANALYZE {staging_table};"))
+    except Exception:
+        drop_staging_table(engine, staging_table)
+        raise
+
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {table_name};"))
+        connection.execute(text(f"ALTER TABLE {staging_table} RENAME TO {table_name};"))
+        for index_name in indexes:
+            connection.execute(text(f"ALTER INDEX {index_name}_staging RENAME TO {index_name};"))
+
+def drop_staging_table(engine: Engine, staging_table: str) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {staging_table};"))
+
+def parallel_bulk_load(
+        engine: Engine,
+        source: pd.DataFrame|str,
+        table_name: str = "e_commerce_order_details",
+        column_types: dict[str, str] = ORDER_DETAILS_COLUMNS,
+        indexes: dict[str, str] = ORDER_DETAILS_INDEXES,
+        partition_column: str = "order_id",
+        n_partitions: int = 4,
+        batch_size: int = 65_536
+) -> int:
+    """
+    Replaces a table by loading partitions concurrently into a staging table and swapping it in.
+
+    The input is split into `n_partitions` (hash of `partition_column` for a
+    DataFrame, `batch_size` row ranges pulled on demand from a single Parquet
+    reader for a file path) and each partition
+    is COPYed over its own pooled connection into an UNLOGGED staging table. The
+    staging table is then made durable, indexed and analyzed, and finally renamed
+    over the target in a single transaction, so readers see either the old or the
+    complete new table. On failure the staging table is dropped and the target is
+    left untouched. The engine pool should allow at least `n_partitions` connections.
+
+    Args:
+        engine (Engine): SQLAlchemy engine connected to PostgreSQL.
+        source (pd.DataFrame|str): DataFrame (a named index is loaded as a column) or Parquet file path.
+        table_name (str): Target table to replace.
+        column_types (dict[str, str]): Column name -> SQL type of the target table.
+        indexes (dict[str, str]): Index name -> definition, e.g. {"idx_order_details_date_brin": "USING BRIN (date)"}.
+        partition_column (str): Column hashed to split a DataFrame.
+        n_partitions (int): Number of concurrent COPY streams.
+        batch_size (int): Rows per Arrow record batch.
+
+    Returns:
+        int: Number of loaded rows.
+    """
+    columns: list[str] = list(column_types)
+    staging_table: str = create_staging_table(engine, table_name, column_types)
+
+    def load_partition(batches: Iterable[pa.RecordBatch]) -> int:
+        dbapi_conn = engine.raw_connection()
+        try:
+            rowcount: int = copy_record_batches(dbapi_conn, batches, staging_table, columns)
+            dbapi_conn.commit()
+            return rowcount
+        except Exception:
+            dbapi_conn.rollback()
+            raise
+        finally:
+            dbapi_conn.close()
+
+    try:
+        partitions = _partition_batches(source, columns, partition_column, n_partitions, batch_size)
+        with ThreadPoolExecutor(max_workers=n_partitions) as executor:
+            loaded_rows: int = sum(executor.map(load_partition, partitions))
+    except Exception:
+        drop_staging_table(engine, staging_table)
+        raise
+
+    swap_in_staging_table(engine, staging_table, table_name, indexes)
+
+    return loaded_rows
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_MODES: tuple[str, ...] = ("use", "refresh", "cache_only")
+
+def make_cache_key(formatted_prompt: str, model: str, temperature: float) -> str:
+    """
+    Builds a content-addressed cache key for a single completion.
+
+    The key is the SHA-256 of the fully formatted prompt and the model parameters,
+    so any change in the template, segment instruction, customer, model or
+    temperature produces a new key.
+
+    Args:
+        formatted_prompt (str): The exact prompt sent to the LLM.
+        model (str): Model name.
+        temperature (float): Sampling temperature.
+
+    Returns:
+        str: Hex digest used as the cache key.
+    """
+    payload: str = json.dumps(
+        {"prompt": formatted_prompt, "model": model, "temperature": temperature},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def check_cache_mode(cache_mode: str) -> None:
+    if cache_mode not in CACHE_MODES:
+        raise ValueError(f"Unknown cache_mode '{cache_mode}'. Expected one of: {', '.join(CACHE_MODES)}")
+
+
+class EmailCache:
+    """
+    Persistent SQLite cache of generated emails keyed by `make_cache_key`.
+
+    Entries older than `max_age_seconds` are treated as missing and removed on
+    eviction. When `max_entries` or `max_bytes` is exceeded, the least recently
+    used entries are evicted first. The connection is shared between threads and
+    guarded by a lock, so the cache can be used from the async batch engine.
+
+    Args:
+        path (str): SQLite database file (created with its directory if missing).
+        max_entries (int|None): Maximum number of cached emails.
+        max_bytes (int|None): Maximum total size of cached email texts.
+        max_age_seconds (float|None): Time-to-live of a cached email.
+    """
+
+    def __init__(
+            self,
+            path: str = os.path.join("..", "data", "cache", "email_cache.sqlite"),
+            max_entries: int|None = None,
+            max_bytes: int|None = None,
+            max_age_seconds: float|None = None
+    ) -> None:
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path: str = path
+        self.max_entries: int|None = max_entries
+        self.max_bytes: int|None = max_bytes
+        self.max_age_seconds: float|None = max_age_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS emails (
+                key TEXT PRIMARY KEY,
+                email TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_emails_last_used ON emails (last_used_at)")
+        self._connection.commit()
+
+    def __enter__(self) -> "EmailCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM emails").fetchone()[0]
+
+    def get(self, key: str) -> str|None:
+        """Returns the cached email for `key`, or None if missing or expired."""
+        now: float = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT email, created_at FROM emails WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            email, created_at = row
+            if self.max_age_seconds is not None and now - created_at > self.max_age_seconds:
+                self._connection.execute("DELETE FROM emails WHERE key = ?", (key,))
+                self._connection.commit()
+                return None
+            self._connection.execute("UPDATE emails SET last_used_at = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            return email
+
+    def put(self, key: str, email: str) -> None:
+        """Stores `email` under `key` and applies the eviction policy."""
+        now: float = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO emails (key, email, size, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, email, len(email.encode("utf-8")), now, now)
+            )
+            self._evict(now)
+            self._connection.commit()
+
+    def evict(self) -> None:
+        """Removes expired entries and trims the cache to its size limits."""
+        with self._lock:
+            self._evict(time.time())
+            self._connection.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.max_age_seconds is not None:
+            self._connection.execute("DELETE FROM emails WHERE created_at < ?", (now - self.max_age_seconds,))
+
+        if self.max_entries is not None:
+            self._connection.execute(
+                """
+                DELETE FROM emails WHERE key IN (
+                    SELECT key FROM emails ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+
+        if self.max_bytes is not None:
+            self._connection.execute(
+                """
+                DELETE FROM emails WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY last_used_at DESC, key) AS running_size
+                        FROM emails
+                    ) WHERE running_size > ?
+                )
+                """,
+                (self.max_bytes,)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM emails")
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,145 @@
+from collections.abc import Iterator
+import os
+import re
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import Engine
+
+from src import database_methods as dbm
+
+RAW_SALES_COLUMN_TYPES: dict[str, pa.DataType] = {
+    "TransactionNo": pa.string(),
+    "Date": pa.timestamp("s"),
+    "ProductNo": pa.string(),
+    "ProductName": pa.string(),
+    "Price": pa.float32(),
+    "Quantity": pa.int32(),
+    "CustomerNo": pa.int32(),
+    "Country": pa.string(),
+}
+
+def rename_sales_column(column_name: str) -> str:
+    """
+    Converts a raw column name to the snake_case name used in the database.
+
+    Same rule as notebook 01 ("CustomerNo" -> "customer_id"), with the
+    transaction number becoming "order_id".
+    """
+    if column_name == "TransactionNo":
+        return "order_id"
+    return re.sub(r"([a-z])([A-Z])", r"\1_\2", column_name).lower().replace("_no", "_id")
+
+def clean_sales_batch(batch: pa.RecordBatch) -> pa.RecordBatch:
+    """
+    Applies the notebook 01 cleaning rules to one chunk of the raw sales CSV.
+
+    Rows with any missing value are dropped (a missing customer makes the order
+    useless), returns (negative quantity) are removed, columns are renamed and
+    the order date is stored as a DATE. The output columns follow
+    `database_methods.ORDER_DETAILS_COLUMNS`.
+    """
+    table: pa.Table = pa.Table.from_batches([batch]).drop_null()
+    table = table.filter(pc.greater_equal(table["Quantity"], 0))
+    table = table.rename_columns([rename_sales_column(name) for name in table.column_names])
+    table = table.set_column(table.schema.get_field_index("date"), "date", table["date"].cast(pa.date32()))
+    table = table.select(list(dbm.ORDER_DETAILS_COLUMNS))
+
+    return table.combine_chunks().to_batches()[0] if table.num_rows else pa.RecordBatch.from_pylist([], schema=table.schema)
+
+def stream_sales_csv(csv_path: str, block_size: int = 64 << 20) -> Iterator[pa.RecordBatch]:
+    """
+    Streams the raw sales CSV in cleaned, typed record batches.
+
+    The pyarrow streaming CSV reader parses roughly `block_size` bytes at a time,
+    so peak memory is bounded by the block size instead of the file size.
+
+    Args:
+        csv_path (str): Path to "Sales Transaction v.4a.csv".
+        block_size (int): Bytes parsed per chunk.
+
+    Yields:
+        pa.RecordBatch: Cleaned rows in `database_methods.ORDER_DETAILS_COLUMNS` order.
+    """
+    reader = pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=RAW_SALES_COLUMN_TYPES,
+            timestamp_parsers=["%m/%d/%Y"],
+        ),
+    )
+
+    for batch in reader:
+        cleaned: pa.RecordBatch = clean_sales_batch(batch)
+        if cleaned.num_rows:
+            yield cleaned
+
+def ingest_sales_csv(
+        csv_path: str = os.path.join("..", "data", "raw", "Sales Transaction v.4a.csv"),
+        parquet_dir: str|None = os.path.join("..", "data", "processed", "e_commerce_order_details"),
+        engine: Engine|None = None,
+        table_name: str = "e_commerce_order_details",
+        block_size: int = 64 << 20,
+        binary: bool = False,
+        indexes: dict[str, str] = dbm.ORDER_DETAILS_INDEXES
+) -> int:
+    """
+    Ingests the raw sales CSV chunk by chunk into Parquet and/or PostgreSQL in one pass.
+
+    Every cleaned chunk is written as its own Parquet part file in `parquet_dir`
+    (a directory readable as one dataset by `pd.read_parquet`) and, when `engine`
+    is given, streamed with COPY while the file is still being read into a staging
+    table that then replaces `table_name` (as in `database_methods.parallel_bulk_load`),
+    so rerunning the ingestion replaces the orders instead of appending them again.
+
+    Args:
+        csv_path (str): Path to the raw CSV.
+        parquet_dir (str|None): Output directory for Parquet parts, None to skip.
+        engine (Engine|None): Target database, None to skip loading.
+        table_name (str): Target table.
+        block_size (int): Bytes parsed per chunk.
+        binary (bool): Uses binary COPY, batches cast to `ORDER_DETAILS_COLUMNS` (see `database_methods.copy_record_batches`).
+        indexes (dict[str, str]): Indexes created on the new table, see `database_methods.ORDER_DETAILS_INDEXES`.
+
+    Returns:
+        int: Number of ingested rows.
+    """
+    if parquet_dir is not None:
+        os.makedirs(parquet_dir, exist_ok=True)
+        for name in os.listdir(parquet_dir):
+            if name.startswith("part-") and name.endswith(".parquet"):
+                os.remove(os.path.join(parquet_dir, name))
+
+    row_count: int = 0
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        nonlocal row_count
+        for part_number, batch in enumerate(stream_sales_csv(csv_path, block_size)):
+            if parquet_dir is not None:
+                pq.write_table(pa.Table.from_batches([batch]), os.path.join(parquet_dir, f"part-{part_number:05d}.parquet"))
+            row_count += batch.num_rows
+            yield batch
+
+    if engine is None:
+        for _ in batches():
+            pass
+        return row_count
+
+    staging_table: str = dbm.create_staging_table(engine, table_name, dbm.ORDER_DETAILS_COLUMNS)
+
+    dbapi_conn = engine.raw_connection()
+    try:
+        dbm.copy_record_batches(dbapi_conn, batches(), staging_table, list(dbm.ORDER_DETAILS_COLUMNS), binary, dbm.ORDER_DETAILS_COLUMNS)
+        dbapi_conn.commit()
+    except Exception:
+        dbapi_conn.rollback()
+        dbm.drop_staging_table(engine, staging_table)
+        raise
+    finally:
+        dbapi_conn.close()
+
+    dbm.swap_in_staging_table(engine, staging_table, table_name, indexes)
+
+    return row_count
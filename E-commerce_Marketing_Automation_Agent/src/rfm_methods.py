@@ -0,0 +1,196 @@
+import pandas as pd
+from sqlalchemy import Engine, text
+
+ORDERS_TABLE: str = "e_commerce_order_details"
+AGGREGATES_TABLE: str = "customer_rfm_aggregates"
+STATE_TABLE: str = "rfm_refresh_state"
+BOUNDARY_TABLE: str = "customer_rfm_watermark_day"
+
+def create_rfm_tables(engine: Engine) -> None:
+    """
+    Creates the materialized per-customer aggregate table and its watermark tables.
+
+    `customer_rfm_aggregates` keeps running totals per customer (monetary value,
+    distinct order count, last order date), `rfm_refresh_state` keeps the latest
+    order date already folded into those totals and `customer_rfm_watermark_day`
+    the per-customer share of that date, so the date can be folded in again.
+    """
+    with engine.begin() as connection:
+        connection.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {AGGREGATES_TABLE} (
+                customer_id VARCHAR(30) PRIMARY KEY,
+                monetary NUMERIC(14, 2) NOT NULL,
+                frequency INTEGER NOT NULL,
+                last_order_date DATE NOT NULL
+            );
+        """))
+        connection.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+                source_table VARCHAR(63) PRIMARY KEY,
+                watermark DATE,
+                refreshed_at TIMESTAMP NOT NULL DEFAULT NOW()
+            );
+        """))
+        connection.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {BOUNDARY_TABLE} (
+                customer_id VARCHAR(30) PRIMARY KEY,
+                monetary NUMERIC(14, 2) NOT NULL,
+                frequency INTEGER NOT NULL
+            );
+        """))
+
+def refresh_rfm_aggregates(engine: Engine, full_refresh: bool = False) -> int:
+    """
+    Folds orders loaded since the last refresh into the per-customer aggregates.
+
+    Only orders from the stored watermark date on (up to the newest date present
+    when the refresh starts) are aggregated and upserted, so a nightly refresh
+    touches only the newest rows. The watermark date itself is aggregated again,
+    because `date` has no time of day and orders of that date can still arrive
+    after a refresh; its previous contribution, kept in `customer_rfm_watermark_day`,
+    is subtracted so nothing is counted twice. The refresh runs in one REPEATABLE
+    READ snapshot. Orders backfilled with a date before the watermark date still
+    require `full_refresh=True`.
+
+    Args:
+        engine (Engine): SQLAlchemy engine connected to the PostgreSQL database.
+        full_refresh (bool): Rebuilds the aggregates from the whole order history.
+
+    Returns:
+        int: Number of customers inserted or updated.
+    """
+    create_rfm_tables(engine)
+
+    with engine.connect().execution_options(isolation_level="REPEATABLE READ") as connection, connection.begin():
+        if full_refresh:
+            connection.execute(text(f"TRUNCATE {AGGREGATES_TABLE}, {BOUNDARY_TABLE};"))
+            connection.execute(text(f"DELETE FROM {STATE_TABLE} WHERE source_table = :source_table;"), {"source_table": ORDERS_TABLE})
+
+        lower_bound = connection.execute(
+            text(f"SELECT watermark FROM {STATE_TABLE} WHERE source_table = :source_table FOR UPDATE;"),
+            {"source_table": ORDERS_TABLE}
+        ).scalar()
+        upper_bound = connection.execute(text(f"SELECT MAX(date) FROM {ORDERS_TABLE};")).scalar()
+
+        if upper_bound is None or (lower_bound is not None and upper_bound < lower_bound):
+            return 0
+
+        date_filter: str = "date <= :upper_bound" if lower_bound is None else "date >= :lower_bound AND date <= :upper_bound"
+
+        result = connection.execute(
+            text(f"""
+                INSERT INTO {AGGREGATES_TABLE} (customer_id, monetary, frequency, last_order_date)
+                SELECT
+                    n.customer_id,
+                    n.monetary - COALESCE(b.monetary, 0),
+                    n.frequency - COALESCE(b.frequency, 0),
+                    n.last_order_date
+                FROM (
+                    SELECT
+                        customer_id,
+                        SUM(quantity * price) AS monetary,
+                        COUNT(DISTINCT order_id) AS frequency,
+                        MAX(date) AS last_order_date
+                    FROM
+                        {ORDERS_TABLE}
+                    WHERE
+                        {date_filter}
+                    GROUP BY
+                        customer_id
+                ) n
+                LEFT JOIN {BOUNDARY_TABLE} b ON b.customer_id = n.customer_id
+                ON CONFLICT (customer_id) DO UPDATE SET
+                    monetary = {AGGREGATES_TABLE}.monetary + EXCLUDED.monetary,
+                    frequency = {AGGREGATES_TABLE}.frequency + EXCLUDED.frequency,
+                    last_order_date = GREATEST({AGGREGATES_TABLE}.last_order_date, EXCLUDED.last_order_date);
+            """),
+            {"lower_bound": lower_bound, "upper_bound": upper_bound}
+        )
+
+        connection.execute(text(f"TRUNCATE {BOUNDARY_TABLE};"))
+        connection.execute(
+            text(f"""
+                INSERT INTO {BOUNDARY_TABLE} (customer_id, monetary, frequency)
+                SELECT customer_id, SUM(quantity * price), COUNT(DISTINCT order_id)
+                FROM {ORDERS_TABLE}
+                WHERE date = :upper_bound
+                GROUP BY customer_id;
+            """),
+            {"upper_bound": upper_bound}
+        )
+
+        connection.execute(
+            text(f"""
+                INSERT INTO {STATE_TABLE} (source_table, watermark, refreshed_at)
+                VALUES (:source_table, :watermark, NOW())
+                ON CONFLICT (source_table) DO UPDATE SET
+                    watermark = EXCLUDED.watermark,
+                    refreshed_at = EXCLUDED.refreshed_at;
+            """),
+            {"source_table": ORDERS_TABLE, "watermark": upper_bound}
+        )
+
+        return result.rowcount
+
+def get_rfm_segments(engine: Engine, quantile: float = 0.80, churn_days: int = 90) -> pd.DataFrame:
+    """
+    Returns the RFM table with segments computed entirely in SQL.
+
+    Recency is measured against the newest order date, the monetary, frequency
+    and average order value thresholds are `percentile_cont(quantile)` over all
+    customers (rounded to 2 decimals, as in notebook 02), and the segmentation
+    follows the same rules as the notebook's `np.select`:
+        - "churn_recovery": no order for `churn_days` days or more,
+        - "vip_loyalty": any of the three metrics at or above its threshold,
+        - "standard_promo": everyone else.
+
+    Args:
+        engine (Engine): SQLAlchemy engine connected to the PostgreSQL database.
+        quantile (float): Quantile used for the VIP thresholds.
+        churn_days (int): Recency (in days) from which a customer counts as churned.
+
+    Returns:
+        pd.DataFrame: customer_id, monetary, frequency, recency, average_order_value,
+            churn, email and segmentation columns.
+    """
+    query: str = f"""
+    WITH reference AS (
+        SELECT MAX(last_order_date) AS max_date FROM {AGGREGATES_TABLE}
+    ),
+    rfm AS (
+        SELECT
+            a.customer_id,
+            a.monetary,
+            a.frequency,
+            (r.max_date - a.last_order_date) AS recency,
+            ROUND(a.monetary / a.frequency, 2) AS average_order_value,
+            CASE WHEN (r.max_date - a.last_order_date) >= :churn_days THEN 1 ELSE 0 END AS churn,
+            CONCAT('customer_', a.customer_id, '@mail.com') AS email
+        FROM
+            {AGGREGATES_TABLE} a
+            CROSS JOIN reference r
+    ),
+    thresholds AS (
+        SELECT
+            ROUND(CAST(percentile_cont(:quantile) WITHIN GROUP (ORDER BY monetary) AS NUMERIC), 2) AS monetary,
+            ROUND(CAST(percentile_cont(:quantile) WITHIN GROUP (ORDER BY frequency) AS NUMERIC), 2) AS frequency,
+            ROUND(CAST(percentile_cont(:quantile) WITHIN GROUP (ORDER BY average_order_value) AS NUMERIC), 2) AS average_order_value
+        FROM
+            rfm
+    )
+    SELECT
+        rfm.*,
+        CASE
+            WHEN rfm.churn = 1 THEN 'churn_recovery'
+            WHEN rfm.monetary >= t.monetary
+                OR rfm.frequency >= t.frequency
+                OR rfm.average_order_value >= t.average_order_value
+            THEN 'vip_loyalty'
+            ELSE 'standard_promo'
+        END AS segmentation
+    FROM
+        rfm
+        CROSS JOIN thresholds t;
+    """
+
+    return pd.read_sql(text(query), engine, params={"quantile": quantile, "churn_days": churn_days})
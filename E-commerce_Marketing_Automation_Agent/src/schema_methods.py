@@ -0,0 +1,99 @@
+import pandas as pd
+from sqlalchemy import Engine, text
+
+from src import database_methods as dbm
+
+# Superseded by the (customer_id, date) index, which serves the same lookups.
+REDUNDANT_INDEXES: list[str] = ["idx_customer_lookup"]
+
+def ensure_indexes(
+        engine: Engine,
+        table_name: str = "e_commerce_order_details",
+        indexes: dict[str, str] = dbm.ORDER_DETAILS_INDEXES,
+        drop_indexes: list[str] = REDUNDANT_INDEXES
+) -> None:
+    """
+    Creates the indexes used by the RFM and campaign queries and refreshes statistics.
+
+    By default this builds a B-tree on (customer_id, date), which serves the
+    per-customer GROUP BY and recency lookups, and a BRIN index on date, which
+    makes date-range scans (e.g. the incremental RFM refresh) cheap on tables
+    loaded in date order. Existing indexes are kept, superseded ones dropped,
+    and the table is analyzed afterwards.
+
+    Args:
+        engine (Engine): SQLAlchemy engine connected to PostgreSQL.
+        table_name (str): Indexed table.
+        indexes (dict[str, str]): Index name -> definition, e.g. {"idx_order_details_date_brin": "USING BRIN (date)"}.
+        drop_indexes (list[str]): Index names to drop if present.
+    """
+    with engine.begin() as connection:
+        for index_name in drop_indexes:
+            connection.execute(text(f"DROP INDEX IF EXISTS {index_name};"))
+        for index_name, definition in indexes.items():
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} {definition};"))
+
+    analyze_table(engine, table_name)
+
+def analyze_table(engine: Engine, table_name: str = "e_commerce_order_details") -> None:
+    """Refreshes planner statistics (and row estimates) after a load."""
+    with engine.begin() as connection:
+        connection.execute(text(f"ANALYZE {table_name};"))
+
+def count_rows(engine: Engine, table_name: str = "e_commerce_order_details", exact: bool = False) -> int:
+    """
+    Returns the number of rows in a table.
+
+    With `exact=False` the planner estimate from `pg_class.reltuples` is returned
+    without scanning the table; it is accurate right after `analyze_table`.
+    """
+    with engine.connect() as connection:
+        if exact:
+            return connection.execute(text(f"SELECT COUNT(*) FROM {table_name};")).scalar()
+        estimate = connection.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table_name AS regclass);"),
+            {"table_name": table_name}
+        ).scalar()
+        return max(int(estimate or 0), 0)
+
+def sample_rows(
+        engine: Engine,
+        table_name: str = "e_commerce_order_details",
+        n_rows: int = 1,
+        percent: float = 0.1,
+        method: str = "SYSTEM"
+) -> pd.DataFrame:
+    """
+    Returns random rows using TABLESAMPLE instead of `ORDER BY RANDOM()` on the whole table.
+
+    `ORDER BY RANDOM()` reads and sorts the whole table; TABLESAMPLE reads only
+    the sampled pages (SYSTEM) or rows (BERNOULLI), and only that sample is
+    shuffled before `n_rows` are taken, so SYSTEM does not return the first
+    rows of the first sampled page (neighbours in load order). If the sample is too small,
+    the percentage is increased until `n_rows` rows are found or the whole table
+    has been sampled.
+
+    Args:
+        engine (Engine): SQLAlchemy engine connected to PostgreSQL.
+        table_name (str): Sampled table.
+        n_rows (int): Number of rows to return.
+        percent (float): Initial sampling percentage (0-100].
+        method (str): "SYSTEM" (page-level, fastest) or "BERNOULLI" (row-level, more uniform).
+
+    Returns:
+        pd.DataFrame: Up to `n_rows` sampled rows.
+    """
+    if method.upper() not in ("SYSTEM", "BERNOULLI"):
+        raise ValueError(f"Unknown TABLESAMPLE method '{method}'. Expected 'SYSTEM' or 'BERNOULLI'.")
+    if not 0 < percent <= 100:
+        raise ValueError(f"percent must be in (0, 100], got {percent}.")
+
+    while True:
+        sample: pd.DataFrame = pd.read_sql(
+            text(f"SELECT * FROM {table_name} TABLESAMPLE {method.upper()} (:percent) ORDER BY RANDOM() LIMIT :n_rows;"),
+            engine,
+            params={"percent": percent, "n_rows": n_rows}
+        )
+        if len(sample) >= n_rows or percent >= 100:
+            return sample
+        percent = min(100.0, percent * 10)
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import pmdarima as pm
+import joblib
+
+
+class ArimaCache:
+    """
+    Persistent cache of fitted ARIMA models and selected orders.
+
+    Two levels are kept on disk:
+        - models: the fitted model, keyed on a hash of the exact input series, the
+          search settings and the pmdarima version. A hit skips fitting entirely.
+        - orders: the (p, d, q) order and intercept last selected for a named series
+          (e.g. "forecast/0201/gdp_per_capita") under given settings. When the series
+          changed (new year of data), the model is refitted with this order only,
+          skipping the stepwise order search.
+
+    Invalidation policy: any change of the series or settings misses the model level;
+    a pmdarima upgrade misses both levels; entries older than `max_age_days` are
+    ignored (forcing a full order search again) and deleted by `prune`; `invalidate`/`clear`
+    remove entries explicitly. Writes are atomic, so the cache can be shared by worker processes.
+
+    Args:
+        cache_dir (str): Directory of the cache (created if missing).
+        max_age_days (float|None): Age after which entries are ignored, None to keep forever.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join("..", "Data", "Cache", "arima"), max_age_days: float|None = 30) -> None:
+        self.cache_dir = cache_dir
+        self.max_age_days = max_age_days
+        os.makedirs(os.path.join(cache_dir, "models"), exist_ok= True)
+        os.makedirs(os.path.join(cache_dir, "orders"), exist_ok= True)
+
+    @staticmethod
+    def _hash(*parts: bytes) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _settings_bytes(settings: dict) -> bytes:
+        return json.dumps({"settings": settings, "pmdarima": pm.__version__}, sort_keys= True, default= str).encode("utf-8")
+
+    def _model_path(self, values: np.ndarray, settings: dict) -> str:
+        key = self._hash(np.ascontiguousarray(values, dtype= np.float64).tobytes(), self._settings_bytes(settings))
+        return os.path.join(self.cache_dir, "models", f"{key}.joblib")
+
+    def _order_path(self, series_name: str, settings: dict) -> str:
+        key = self._hash(series_name.encode("utf-8"), self._settings_bytes(settings))
+        return os.path.join(self.cache_dir, "orders", f"{key}.json")
+
+    def _is_fresh(self, path: str, created_at: float|None = None) -> bool:
+        # Orders carry their creation time: reusing an order does not rewrite it, but the age must
+        # not depend on the file mtime either.
+        if not os.path.exists(path):
+            return False
+        created_at = os.path.getmtime(path) if created_at is None else created_at
+        return self.max_age_days is None or time.time() - created_at <= self.max_age_days * 86400
+
+    @staticmethod
+    def _atomic_write(path: str, write) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def get_model(self, values: np.ndarray, settings: dict):
+        path = self._model_path(values, settings)
+        if not self._is_fresh(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception:
+            return None
+
+    def get_order(self, series_name: str, settings: dict) -> dict|None:
+        path = self._order_path(series_name, settings)
+        try:
+            with open(path, "r", encoding= "utf-8") as file:
+                order = json.load(file)
+        except FileNotFoundError:
+            return None
+        return order if self._is_fresh(path, order.get("created_at")) else None
+
+    def put(self, values: np.ndarray, settings: dict, model, series_name: str|None = None, store_order: bool = True) -> None:
+        """
+        Stores a fitted model and, with `series_name` and `store_order`, its order. An order reused by
+        `fit_arima_cached` is not stored again, so it still expires `max_age_days` after its search.
+        """
+        self._atomic_write(self._model_path(values, settings), lambda path: joblib.dump(model, path))
+
+        if series_name is not None and store_order:
+            order = {"order": list(model.order), "with_intercept": bool(model.with_intercept), "created_at": time.time()}
+
+            def write_order(path: str) -> None:
+                with open(path, "w", encoding= "utf-8") as file:
+                    json.dump(order, file)
+
+            self._atomic_write(self._order_path(series_name, settings), write_order)
+
+    def invalidate(self, series_name: str, settings: dict) -> None:
+        """Forgets the cached order of one series, forcing a full order search next time."""
+        path = self._order_path(series_name, settings)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def prune(self) -> int:
+        """
+        Deletes the entries older than `max_age_days` (models, orders and leftover temporary files)
+        and returns how many files were removed. Nothing expires with `max_age_days=None`.
+        Fresh files are left alone, so other processes can keep using the cache meanwhile.
+        """
+        if self.max_age_days is None:
+            return 0
+
+        removed = 0
+        for sub_dir in ("models", "orders"):
+            directory = os.path.join(self.cache_dir, sub_dir)
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                created_at = None
+                if name.endswith(".json"):
+                    try:
+                        with open(path, "r", encoding= "utf-8") as file:
+                            created_at = json.load(file).get("created_at")
+                    except (OSError, ValueError):
+                        pass
+                if not self._is_fresh(path, created_at):
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
+
+    def clear(self) -> None:
+        for sub_dir in ("models", "orders"):
+            directory = os.path.join(self.cache_dir, sub_dir)
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+
+
+def fit_arima_cached(values: np.ndarray, settings: dict, cache: ArimaCache|None = None, series_name: str|None = None, refit_cached_order: bool = True):
+    """
+    Returns a fitted ARIMA model for `values`, reusing cached work when possible.
+
+    Lookup order:
+        1. the exact same series and settings were fitted before -> cached model,
+        2. `series_name` has a cached order and `refit_cached_order` is True
+           -> `pm.ARIMA` fitted with that order only (no stepwise search),
+        3. otherwise a full `pm.auto_arima(values, **settings)` search.
+    The model of 2. and 3. is stored in the cache; the order only after a full search
+    (3.), so a reused order keeps its original age.
+
+    Args:
+        values (np.ndarray): Observed values sorted chronologically, without NaNs.
+        settings (dict): Keyword arguments for `pm.auto_arima`.
+        cache (ArimaCache|None): Cache to use, None to always run the full search.
+        series_name (str|None): Stable name of the series used for the order fast path.
+        refit_cached_order (bool): Enables the "refit with cached order only" fast path.
+
+    Returns:
+        The fitted pmdarima ARIMA model.
+    """
+    if cache is None:
+        return pm.auto_arima(values, **settings)
+
+    model = cache.get_model(values, settings)
+    if model is not None:
+        return model
+
+    cached_order = cache.get_order(series_name, settings) if (series_name and refit_cached_order) else None
+
+    if cached_order is not None:
+        try:
+            model = pm.ARIMA(
+                order= tuple(cached_order["order"]),
+                with_intercept= cached_order["with_intercept"],
+                method= settings.get("method", "lbfgs"),
+                maxiter= settings.get("maxiter", 50),
+                suppress_warnings= True
+            ).fit(values)
+        except Exception:
+            model = None
+
+    order_reused = model is not None
+    if model is None:
+        model = pm.auto_arima(values, **settings)
+
+    cache.put(values, settings, model, series_name, store_order= not order_reused)
+
+    return model
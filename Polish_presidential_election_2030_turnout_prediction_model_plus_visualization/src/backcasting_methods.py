@@ -0,0 +1,191 @@
+import time
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.arima_cache_methods import ArimaCache
+from src.data_cleaning_methods import backcasting_arima, fit_linear_trends, pivot_county_years
+
+BACKCASTING_METHODS: tuple = ("drift", "linear", "ses", "holt", "arima")
+
+# Methods:
+
+def _reversed_history(wide_df: pd.DataFrame) -> np.ndarray:
+    """Returns the (county x year) values newest year first, so the past becomes the "future"."""
+    return wide_df.to_numpy(dtype= float)[:, ::-1]
+
+def _drift_backcast(reversed_values: np.ndarray, periods: int) -> np.ndarray:
+    observed = ~np.isnan(reversed_values)
+    n = observed.sum(axis= 1)
+    rows = np.arange(len(reversed_values))
+
+    newest = reversed_values[rows, observed.argmax(axis= 1)]
+    oldest_position = reversed_values.shape[1] - 1 - observed[:, ::-1].argmax(axis= 1)
+    oldest = reversed_values[rows, oldest_position]
+
+    with np.errstate(divide= "ignore", invalid= "ignore"):
+        drift = (oldest - newest) / (n - 1)
+
+    return oldest[:, None] + drift[:, None] * np.arange(1, periods + 1)
+
+def _exponential_smoothing_backcast(reversed_values: np.ndarray, periods: int, alpha: float, beta: float|None) -> np.ndarray:
+    # Recursions run over the (short) time axis; every step is vectorized across counties.
+    n_counties = len(reversed_values)
+    level = np.full(n_counties, np.nan)
+    trend = np.zeros(n_counties)
+    seen = np.zeros(n_counties, dtype= int)
+
+    for step in range(reversed_values.shape[1]):
+        y = reversed_values[:, step]
+        observed = ~np.isnan(y)
+
+        first = observed & (seen == 0)
+        if beta is None:
+            update = observed & (seen >= 1)
+            new_level = alpha * y + (1 - alpha) * level
+        else:
+            # Holt: the second observation initialises the trend, later ones smooth it.
+            second = observed & (seen == 1)
+            update = observed & (seen >= 2)
+            new_level = alpha * y + (1 - alpha) * (level + trend)
+            trend = np.where(second, y - level, trend)
+            trend = np.where(update, beta * (new_level - level) + (1 - beta) * trend, trend)
+            new_level = np.where(second, y, new_level)
+            update = update | second
+
+        level = np.where(first, y, np.where(update, new_level, level))
+        seen += observed
+
+    return level[:, None] + trend[:, None] * np.arange(1, periods + 1)
+
+def backcast_counties(
+        dataframe: pd.DataFrame,
+        column_name: str,
+        nearest_year: int,
+        periods: int,
+        method: str = "drift",
+        alpha: float = 0.5,
+        beta: float = 0.3,
+        decimals: int = 0,
+        n_jobs: int = -1,
+        cache: ArimaCache|None = None
+) -> list:
+    """
+    Backcasts `periods` years before `nearest_year + 1` for every county with a selectable model.
+
+    Available methods:
+        - "drift": straight line through the newest and oldest observation (random walk with drift),
+        - "linear": least-squares trend over all observed years (`fit_linear_trends`),
+        - "ses": simple exponential smoothing of the reversed series (flat backcast),
+        - "holt": Holt's linear exponential smoothing of the reversed series,
+        - "arima": `backcasting_arima` per county on a process pool (the accurate, slow mode).
+    All methods except "arima" are evaluated for all counties at once as NumPy arrays.
+
+    Args:
+        dataframe (pd.DataFrame): Long data with "terc_code" (or "county"), "year" and `column_name`.
+        column_name (str): The column to backcast.
+        nearest_year (int): The most recent year to fill; data after it is used for fitting.
+        periods (int): Number of years to backcast (nearest_year, nearest_year - 1, ...).
+        method (str): One of `BACKCASTING_METHODS`.
+        alpha (float): Level smoothing factor for "ses" and "holt".
+        beta (float): Trend smoothing factor for "holt".
+        decimals (int): Rounding of the backcasted values (every method).
+        n_jobs (int): Worker processes for "arima".
+        cache (ArimaCache|None): Optional ARIMA cache for "arima".
+
+    Returns:
+        list: (county, predictions) tuples keyed by TERC code when the frame has "terc_code"
+            (county names are not unique), predictions ordered from `nearest_year` backwards,
+            ready for `update_df_after_arima_backcasting` (with `key_column="terc_code"`).
+            Counties without enough data are skipped.
+    """
+    if method not in BACKCASTING_METHODS:
+        raise ValueError(f"Unknown backcasting method '{method}'. Expected one of: {', '.join(BACKCASTING_METHODS)}")
+
+    history = dataframe[dataframe["year"] > nearest_year]
+    wide_df = pivot_county_years(history, column_name).sort_index(axis= 1)
+
+    if method == "arima":
+        results = Parallel(n_jobs= n_jobs)(
+            delayed(backcasting_arima)(county, row[~np.isnan(row)], periods, cache, f"backcast/{column_name}/{county}", decimals)
+            for county, row in zip(wide_df.index, wide_df.to_numpy(dtype= float))
+        )
+        return [result for result in results if result is not None]
+
+    if method == "linear":
+        slope, intercept = fit_linear_trends(wide_df)
+        target_years = nearest_year - np.arange(periods)
+        predictions = slope[:, None] * target_years + intercept[:, None]
+    elif method == "drift":
+        predictions = _drift_backcast(_reversed_history(wide_df), periods)
+    else:
+        predictions = _exponential_smoothing_backcast(_reversed_history(wide_df), periods, alpha, beta if method == "holt" else None)
+
+    # Same minimum history as backcasting_arima.
+    enough_data = wide_df.notna().sum(axis= 1).to_numpy() >= 3
+    predictions = np.round(predictions, decimals)
+
+    return [
+        (county, values)
+        for county, values, valid in zip(wide_df.index, predictions, enough_data)
+        if valid and not np.isnan(values).any()
+    ]
+
+def compare_backcasting_methods(
+        dataframe: pd.DataFrame,
+        column_name: str,
+        holdout_years: int = 3,
+        methods: tuple = BACKCASTING_METHODS,
+        **kwargs
+) -> pd.DataFrame:
+    """
+    Compares the backcasting methods on held-out historical years.
+
+    The `holdout_years` earliest observed years are hidden, backcasted from the
+    remaining years with every method, and compared with the real values.
+
+    Args:
+        dataframe (pd.DataFrame): Long data with "terc_code" (or "county"), "year" and `column_name`.
+        column_name (str): The column to evaluate.
+        holdout_years (int): Number of earliest observed years to hold out.
+        methods (tuple): Methods to compare.
+        **kwargs: Passed through to `backcast_counties` (e.g. alpha, beta, n_jobs).
+
+    Returns:
+        pd.DataFrame: One row per method with MAE, RMSE, MAPE (%), number of
+            evaluated counties and wall time (seconds), sorted by MAE.
+    """
+    observed = dataframe.dropna(subset= [column_name])
+    first_year = int(observed["year"].min())
+    nearest_year = first_year + holdout_years - 1
+
+    actual = pivot_county_years(observed[observed["year"] <= nearest_year], column_name).sort_index(axis= 1, ascending= False)
+    training = observed[observed["year"] > nearest_year]
+
+    report = []
+
+    for method in methods:
+        start = time.perf_counter()
+        results = backcast_counties(training, column_name, nearest_year, holdout_years, method, decimals= 6, **kwargs)
+        wall_time = time.perf_counter() - start
+
+        predicted = pd.DataFrame(
+            [values for _, values in results],
+            index= [county for county, _ in results],
+            columns= range(nearest_year, nearest_year - holdout_years, -1)
+        )
+        common = predicted.index.intersection(actual.index)
+        errors = predicted.loc[common].to_numpy() - actual.loc[common, predicted.columns].to_numpy()
+        real = actual.loc[common, predicted.columns].to_numpy()
+
+        with np.errstate(divide= "ignore", invalid= "ignore"):
+            report.append({
+                "method": method,
+                "mae": np.nanmean(np.abs(errors)),
+                "rmse": np.sqrt(np.nanmean(errors ** 2)),
+                "mape": np.nanmean(np.abs(errors / real)) * 100,
+                "counties": len(common),
+                "wall_time_s": wall_time,
+            })
+
+    return pd.DataFrame(report).sort_values("mae").reset_index(drop= True)
@@ -6,6 +6,24 @@ import pmdarima as pm
 from joblib import Parallel, delayed
 from functools import reduce
 
+from src.arima_cache_methods import ArimaCache, fit_arima_cached
+from src.panel_methods import IndicatorPanel
+
+ARIMA_BACKCAST_SETTINGS: dict = {
+    "start_p": 0,
+    "start_q": 0,
+    "max_p": 3,
+    "max_q": 3,
+    "m": 1,
+    "d": None,
+    "seasonal": False,
+    "stepwise": True,
+    "suppress_warnings": True,
+    "error_action": "ignore",
+    "maxiter": 15,
+    "n_jobs": 1
+}
+
 # Methods:
 
 def get_row_by_county_as_df(dataframe: pd.DataFrame, county_name: str) -> pd.DataFrame:
@@ -209,7 +227,159 @@ def extrapolate_missing_2000_2001(dataframe: pd.DataFrame, column_name: str) ->
             else:
                 dataframe.loc[mask, column_name] = round(forecast, 1)
 
-def backcasting_arima(county_id: str, values: np.ndarray, periods: int) -> tuple:
+def fit_linear_trends(wide_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fits a least-squares line through every row of a (county x year) array at once.
+
+    Rows are grouped by their pattern of missing years (usually a single group)
+    and each group is fitted with one `np.polyfit` call on a 2-D value array. This
+    runs the same arithmetic as `np.polyfit(years, values, 1)` per county, so the
+    coefficients are bit-identical to the per-county functions, and forecasts
+    rounded at .x5 ties agree with them as well.
+
+    Args:
+        wide_df (pd.DataFrame): Values with one row per county and one column per year.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Slopes and intercepts, one per row 
+            (NaN where a row has fewer than two observations).
+    """
+    years = wide_df.columns.to_numpy(dtype= float)
+    values = wide_df.to_numpy(dtype= float)
+
+    slope = np.full(len(values), np.nan)
+    intercept = np.full(len(values), np.nan)
+
+    if len(values) == 0:
+        return slope, intercept
+
+    patterns, pattern_ids = np.unique(~np.isnan(values), axis= 0, return_inverse= True)
+    pattern_ids = pattern_ids.ravel()
+
+    for k, pattern in enumerate(patterns):
+        if pattern.sum() < 2:
+            continue
+        rows = pattern_ids == k
+        slope[rows], intercept[rows] = np.polyfit(years[pattern], values[np.ix_(rows, pattern)].T, 1)
+
+    return slope, intercept
+
+def _county_key(dataframe: pd.DataFrame) -> str:
+    # County names repeat across voivodeships ("grodziski"), so rows are keyed by TERC code when there is one.
+    return "terc_code" if "terc_code" in dataframe.columns else "county"
+
+def pivot_county_years(dataframe: pd.DataFrame, column_name: str) -> pd.DataFrame:
+    """
+    Returns a (county x year) DataFrame of one column, indexed by "terc_code" when the
+    frame has it (county names are not unique) and by "county" otherwise.
+
+    Raises:
+        ValueError: If a county has more than one row for a year.
+    """
+    key = _county_key(dataframe)
+    duplicated = dataframe.duplicated([key, "year"], keep= False)
+    if duplicated.any():
+        examples = dataframe.loc[duplicated, [key, "year"]].drop_duplicates().head(5).to_records(index= False).tolist()
+        raise ValueError(f"Duplicate ({key}, year) rows, e.g. {examples}. Each county must have one row per year.")
+
+    return dataframe.pivot(index= key, columns= "year", values= column_name)
+
+def _assign_county_year_values(dataframe: pd.DataFrame, column_name: str, forecasts: pd.DataFrame) -> None:
+    row_keys = pd.MultiIndex.from_arrays([dataframe[_county_key(dataframe)], dataframe["year"]])
+    new_values = forecasts.stack().reindex(row_keys).to_numpy()
+    mask = ~np.isnan(new_values)
+
+    dataframe.loc[mask, column_name] = new_values[mask]
+
+def _assign_panel_values(panel: IndicatorPanel, column_name: str, forecasts: pd.DataFrame) -> None:
+    county_positions = np.array([panel.county_position(code) for code in forecasts.index], dtype= int)
+    years = forecasts.columns.to_numpy(dtype= int)
+    in_range = (years >= panel.years[0]) & (years <= panel.years[-1])
+    year_positions = years[in_range] - int(panel.years[0])
+
+    new_values = forecasts.to_numpy(dtype= float)[:, in_range]
+    mask = ~np.isnan(new_values) & panel.present[np.ix_(county_positions, year_positions)]
+
+    rows, cols = np.nonzero(mask)
+    panel.indicator(column_name)[county_positions[rows], year_positions[cols]] = new_values[rows, cols]
+
+def extrapolate_missing_2000_2001_batch(dataframe: pd.DataFrame|IndicatorPanel, column_name: str) -> None:
+    """
+    Vectorized version of `extrapolate_missing_2000_2001` for all counties at once.
+
+    The frame is pivoted once to a (county x year) array (keyed by "terc_code" when
+    the frame has it, county names are not unique), the 2002-2004 trends 
+    of every county are fitted with `fit_linear_trends`, and the 2000/2001 
+    forecasts are written back with a single aligned assignment (in-place). 
+    The fallback rule is kept: a non-positive forecast is replaced with the 
+    county's 2002 value. Values are rounded to one decimal, and only existing 
+    2000/2001 rows are updated.
+
+    Args:
+        dataframe (pd.DataFrame|IndicatorPanel): The input DataFrame containing 'county' (or 'terc_code'), 'year' 
+            and the target column, or an IndicatorPanel (updated in-place, keyed by TERC code).
+        column_name (str): The name of the column to populate with extrapolated values.
+    """
+    if isinstance(dataframe, IndicatorPanel):
+        wide_df = dataframe.to_wide(column_name)
+    else:
+        wide_df = pivot_county_years(dataframe, column_name)
+
+    slope, intercept = fit_linear_trends(wide_df[[2002, 2003, 2004]])
+    target_years = np.array([2000, 2001], dtype= float)
+
+    forecast = slope[:, None] * target_years + intercept[:, None]
+    fallback = wide_df[2002].to_numpy(dtype= float)[:, None]
+    forecast = np.where(forecast <= 0, fallback, forecast)
+
+    forecasts = pd.DataFrame(np.round(forecast, 1), index= wide_df.index, columns= [2000, 2001])
+    if isinstance(dataframe, IndicatorPanel):
+        _assign_panel_values(dataframe, column_name, forecasts)
+    else:
+        _assign_county_year_values(dataframe, column_name, forecasts)
+
+def extrapolate_backwards_batch(dataframe: pd.DataFrame|IndicatorPanel, column_name: str, year_x: int, year_y: int, counties: list|None = None, last_year: int = 2024) -> None:
+    """
+    Vectorized version of `extrapolate_backwards_one_county` for many counties at once.
+
+    Every selected county gets a linear trend fitted on years `year_y + 1` to 
+    `last_year` (one closed-form computation over the pivoted array) and the years 
+    `year_x` to `year_y` are filled in-place with the rounded forecasts using a 
+    single aligned assignment.
+
+    Args:
+        dataframe (pd.DataFrame|IndicatorPanel): The dataset containing 'county' (or 'terc_code'), 'year' and 
+            the column, or an IndicatorPanel (updated in-place).
+        column_name (str): The name of the column to update.
+        year_x (int): The first year to extrapolate.
+        year_y (int): The last year to extrapolate.
+        counties (list|None): Counties to update (default: all counties), as names or TERC codes;
+            TERC codes for a panel. A name selects every county of that name.
+        last_year (int): The last year used for fitting the trend.
+    """
+    if isinstance(dataframe, IndicatorPanel):
+        wide_df = dataframe.to_wide(column_name)
+    else:
+        wide_df = pivot_county_years(dataframe, column_name)
+    if counties is not None:
+        selected = set(counties)
+        if not isinstance(dataframe, IndicatorPanel) and _county_key(dataframe) == "terc_code":
+            selected |= set(dataframe.loc[dataframe["county"].isin(counties), "terc_code"])
+        wide_df = wide_df.loc[wide_df.index.isin(selected)]
+
+    train_years = [year for year in wide_df.columns if year_y + 1 <= year <= last_year]
+    slope, intercept = fit_linear_trends(wide_df[train_years])
+
+    target_years = np.arange(year_x, year_y + 1)
+    forecast = slope[:, None] * target_years + intercept[:, None]
+
+    forecasts = pd.DataFrame(np.round(forecast, 1), index= wide_df.index, columns= target_years)
+    if isinstance(dataframe, IndicatorPanel):
+        _assign_panel_values(dataframe, column_name, forecasts)
+    else:
+        _assign_county_year_values(dataframe, column_name, forecasts)
+
+def backcasting_arima(county_id: str, values: np.ndarray, periods: int, cache: ArimaCache|None = None, series_name: str|None = None, decimals: int = 0) -> tuple:
     """
     Performs backcasting using an ARIMA model to estimate historical values for a specific county.
 
@@ -222,57 +392,58 @@ def backcasting_arima(county_id: str, values: np.ndarray, periods: int) -> tuple
         county_id (str): The unique identifier for the county.
         values (np.ndarray): A numpy array of observed values, sorted chronologically.
         periods (int): The number of historical periods (years) to backcast.
+        cache (ArimaCache|None): Optional cache of fitted models and selected orders.
+        series_name (str|None): Stable name of the series for the cache's order fast path
+            (e.g. "backcast/population_70_plus/<county>"). Required with `cache`, since the
+            county alone does not tell the indicators apart.
+        decimals (int): Rounding of the predicted values (default: nearest integer).
 
     Returns:
         tuple | None: A tuple containing (county_id, predicted_values) where predicted_values
-        are rounded to the nearest integer, or None if the input series is too short
+        are rounded to `decimals`, or None if the input series is too short
         or model fitting fails.
 
     First use -> Population 70 plus data
     """
 
+    if cache is not None and series_name is None:
+        raise ValueError("series_name is required when a cache is used (e.g. \"backcast/<indicator>/<county>\").")
+
     if len(values) < 3: 
         return None
 
     try:
         training_data = values[::-1]
 
-        model = pm.auto_arima(
+        model = fit_arima_cached(
             training_data, 
-            start_p= 0, 
-            start_q= 0,
-            max_p= 3, 
-            max_q= 3,
-            m= 1,              
-            d= None,           
-            seasonal= False,   
-            stepwise= True,    
-            suppress_warnings= True,
-            error_action= "ignore",
-            maxiter= 15,       
-            n_jobs= 1          
+            ARIMA_BACKCAST_SETTINGS, 
+            cache, 
+            series_name
         )
 
         prediction = model.predict(n_periods= periods)
         
-        return (county_id, prediction.round(0))
+        return (county_id, prediction.round(decimals))
         
     except Exception:
         return None
 
-def update_df_after_arima_backcasting(dataframe: pd.DataFrame, valid_results: tuple, column_name: str, nearest_year: int) -> pd.DataFrame:
+def update_df_after_arima_backcasting(dataframe: pd.DataFrame, valid_results: tuple, column_name: str, nearest_year: int, key_column: str = "county") -> pd.DataFrame:
     """
     Updates the target DataFrame with backcasted values derived from ARIMA predictions.
 
     This function iterates through the prediction results, maps them to the correct
     historical years starting backwards from `nearest_year`, and performs an update operation
-    on the main DataFrame based on a composite index of 'county' and 'year'.
+    on the main DataFrame based on a composite index of `key_column` and 'year'.
 
     Args:
         dataframe (pd.DataFrame): The target DataFrame containing 'county' and 'year' columns.
         valid_results (tuple): A collection of tuples (county_id, predictions) returned by the backcasting function.
         column_name (str): The name of the column where the backcasted values should be inserted.
         nearest_year (int): The most recent historical year to fill (e.g., if data exists from 2002, this might be 2001).
+        key_column (str): The column the result ids refer to ("terc_code" for `backcasting_methods.backcast_counties`
+            results of frames with TERC codes).
 
     Returns:
         pd.DataFrame: The DataFrame with updated values in the specified column and a reset index.
@@ -290,13 +461,13 @@ def update_df_after_arima_backcasting(dataframe: pd.DataFrame, valid_results: tu
             values.append(val)
         
     updates_df = pd.DataFrame({
-        "county": counties,
+        key_column: counties,
         "year": years,
         column_name: values
     })
 
-    dataframe = dataframe.set_index(["county", "year"])
-    updates_df = updates_df.set_index(["county", "year"])
+    dataframe = dataframe.set_index([key_column, "year"])
+    updates_df = updates_df.set_index([key_column, "year"])
 
     dataframe.update(updates_df)
     
@@ -308,6 +479,21 @@ def update_df_after_arima_backcasting(dataframe: pd.DataFrame, valid_results: tu
 
     return dataframe
 
+def load_terc_reference(path: str) -> pd.DataFrame:
+    """
+    Returns the powiat rows of the TERC register ("territory_codes.csv") as "county", "terc_code",
+    the reference DataFrame expected by `update_terc_codes`.
+
+    First use -> Data pipeline
+    """
+    territory_df = pd.read_csv(path, sep= ";", dtype= str, encoding= "utf-8-sig")
+    counties = territory_df[territory_df["POW"].notna() & territory_df["GMI"].isna()]
+
+    return pd.DataFrame({
+        "county": counties["NAZWA"].to_numpy(),
+        "terc_code": (counties["WOJ"] + counties["POW"]).to_numpy(),
+    })
+
 def merge_df_by_voivodeship(main_df: pd.DataFrame, sec_df: pd.DataFrame, value_column: str) -> pd.DataFrame:
     """
     Merges a county-level DataFrame with a voivodeship-level DataFrame based on 
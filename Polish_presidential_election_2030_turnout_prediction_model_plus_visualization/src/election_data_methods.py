@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import re
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.terc_methods import TercResolver, get_terc_resolver
+
+ELECTION_DATA_DIR: str = os.path.join("..", "Data", "Raw_data", "Election_data")
+ELECTION_CACHE_DIR: str = os.path.join("..", "Data", "Cache", "elections")
+
+ELECTION_COLUMNS: list = ["year", "round", "gmina_code", "terc_code", "county", "gmina", "authorized_voters", "votes_cast", "turnout_percentage"]
+
+# Raw header (whitespace collapsed to single spaces) -> normalised column.
+ELECTION_COLUMN_MAP: dict = {
+    "Kod gminy": "gmina_code",
+    "TERYT": "gmina_code",
+    "Kod gm.": "gmina_code",
+    "Kod TERYT": "gmina_code",
+    "Gmina": "gmina",
+    "Powiat": "county",
+    "Uprawnieni": "authorized_voters",
+    "Uprawnieni do głosowania": "authorized_voters",
+    "Liczba wyborców uprawnionych do głosowania": "authorized_voters",
+    "Głosy oddane": "votes_cast",
+    "Karty wyjęte (głosy oddane)": "votes_cast",
+    "Liczba wyborców, którym wydano karty do głosowania": "votes_cast",
+    "Frekwencja": "turnout_percentage",
+}
+
+# Gminas that belonged to another county in some elections -> their current county code.
+# Wałbrzych was part of powiat wałbrzyski (gmina code 022109) from 2003 until it became a city county again in 2013.
+GMINA_COUNTY_CHANGES: dict = {
+    "022109": "0265",
+}
+
+ELECTION_FILE_PATTERN: re.Pattern = re.compile(r"election_(\d{4})(?:_(\d)\w*_round)?$")
+
+# Methods:
+
+def parse_election_file_name(path: str) -> tuple[int, int]:
+    """
+    Returns (year, round) encoded in a file name like "election_2005_2nd_round.xls" ("election_2000.xls" is round 1).
+    """
+    match = ELECTION_FILE_PATTERN.match(os.path.splitext(os.path.basename(path))[0])
+    if match is None:
+        raise ValueError(f"Unexpected election file name: {path}")
+
+    return int(match.group(1)), int(match.group(2) or 1)
+
+def _read_raw_election_file(path: str) -> pd.DataFrame:
+    if path.endswith(".csv"):
+        return pd.read_csv(path, sep= ";", encoding= "cp1250", dtype= str)
+    return pd.read_excel(path, sheet_name= 0, dtype= str)
+
+def _to_number(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series.astype(str).str.replace(",", ".").str.replace(r"\s", "", regex= True), errors= "coerce")
+
+def normalise_election_file(path: str, column_map: dict = ELECTION_COLUMN_MAP) -> pd.DataFrame:
+    """
+    Parses one round file (xls, xlsx or cp1250 ";"-separated csv) into the common gmina-level schema.
+
+    Headers are matched through `column_map` after collapsing whitespace (some
+    Excel headers contain line breaks). Rows without a numeric gmina code (second
+    header rows, totals) are dropped. Turnout is votes cast / authorized voters
+    when both counts exist, otherwise the published percentage ("Frekwencja").
+
+    Args:
+        path (str): Path of the round file.
+        column_map (dict): Raw header -> one of `ELECTION_COLUMNS`.
+
+    Returns:
+        pd.DataFrame: `ELECTION_COLUMNS`, "terc_code" being the first 4 digits of the
+            gmina code, not yet checked against the TERC register.
+    """
+    year, round_number = parse_election_file_name(path)
+
+    raw_df = _read_raw_election_file(path)
+    raw_df.columns = [" ".join(str(col).split()) for col in raw_df.columns]
+
+    selected = {}
+    for raw_name, name in column_map.items():
+        if raw_name in raw_df.columns and name not in selected:
+            selected[name] = raw_df[raw_name]
+    df = pd.DataFrame(selected)
+
+    gmina_codes = _to_number(df["gmina_code"])
+    df = df[gmina_codes.notna()].copy()
+    df["gmina_code"] = gmina_codes[gmina_codes.notna()].astype("int64").astype(str).str.zfill(6)
+    df["terc_code"] = df["gmina_code"].str[:4]
+
+    for col in ["authorized_voters", "votes_cast", "turnout_percentage"]:
+        df[col] = _to_number(df[col]) if col in df.columns else np.nan
+
+    has_counts = df["authorized_voters"].notna() & df["votes_cast"].notna()
+    df.loc[has_counts, "turnout_percentage"] = df.loc[has_counts, "votes_cast"] / df.loc[has_counts, "authorized_voters"] * 100
+
+    # "m. Wrocław", "m. st. Warszawa" -> the register names "Wrocław", "Warszawa".
+    df["county"] = df["county"].astype(str).str.strip().str.replace(r"^m\.\s+(st\.\s+)?", "", regex= True)
+    df["gmina"] = df["gmina"].astype(str).str.strip()
+    df["year"] = year
+    df["round"] = round_number
+
+    return df[ELECTION_COLUMNS].reset_index(drop= True)
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _settings_hash(column_map: dict) -> str:
+    return hashlib.sha256(json.dumps({"columns": ELECTION_COLUMNS, "map": column_map}, sort_keys= True).encode("utf-8")).hexdigest()
+
+def _meta_path(path: str, cache_dir: str) -> str:
+    # Keyed on the absolute path, so equally named files of different directories do not share an entry.
+    path_hash = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(path)}-{path_hash}.json")
+
+def _load_cached_file(path: str, cache_dir: str, settings_hash: str) -> pd.DataFrame|None:
+    """
+    Returns the cached parse of `path` or None. An unchanged mtime and size skip hashing;
+    a touched but identical file is recognised by its hash and its metadata refreshed.
+    """
+    meta_path = _meta_path(path, cache_dir)
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path, "r", encoding= "utf-8") as file:
+        meta = json.load(file)
+
+    parquet_path = os.path.join(cache_dir, meta["parquet"])
+    if meta["settings"] != settings_hash or not os.path.exists(parquet_path):
+        return None
+
+    stat = os.stat(path)
+    if (meta["mtime_ns"], meta["size"]) != (stat.st_mtime_ns, stat.st_size):
+        if meta["sha256"] != _hash_file(path):
+            return None
+        _write_meta(meta_path, {**meta, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+
+    return pd.read_parquet(parquet_path)
+
+def _write_meta(meta_path: str, meta: dict) -> None:
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding= "utf-8") as file:
+        json.dump(meta, file)
+    os.replace(tmp_path, meta_path)
+
+def _parse_and_cache_file(path: str, column_map: dict, cache_dir: str, settings_hash: str) -> pd.DataFrame:
+    # Runs in a worker process: the file is parsed and cached where it was read.
+    stat = os.stat(path)
+    file_hash = _hash_file(path)
+    df = normalise_election_file(path, column_map)
+
+    parquet_name = f"{os.path.splitext(os.path.basename(path))[0]}-{file_hash[:16]}.parquet"
+    tmp_path = os.path.join(cache_dir, f"{parquet_name}.{os.getpid()}.tmp")
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, os.path.join(cache_dir, parquet_name))
+
+    _write_meta(_meta_path(path, cache_dir), {
+        "parquet": parquet_name,
+        "sha256": file_hash,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "settings": settings_hash,
+    })
+
+    return df
+
+def fix_election_terc_codes(election_df: pd.DataFrame, resolver: TercResolver, gmina_changes: dict = GMINA_COUNTY_CHANGES, return_unmatched: bool = False) -> pd.DataFrame|tuple[pd.DataFrame, list[str]]:
+    """
+    Sets county TERC codes with `resolver` (by county name, the gmina code prefix
+    breaking ties). Counties renamed since the election ("jeleniogórski" -> "karkonoski")
+    keep their gmina code prefix when it is a current code, and gminas listed in
+    `gmina_changes` are moved to their current county; every resolved row gets the
+    register name of its code. Other unmatched rows (voting abroad, ships, abolished
+    counties) are dropped.
+    With `return_unmatched`, the sorted county names that matched neither way are returned too.
+    """
+    original_codes = election_df["terc_code"]
+    fixed_df = resolver.resolve_frame(election_df)
+
+    current_names = pd.Series(resolver.county_names)
+    renamed = fixed_df["terc_code"].isna() & original_codes.isin(current_names.index)
+    fixed_df.loc[renamed, "terc_code"] = original_codes[renamed]
+
+    moved = fixed_df["gmina_code"].isin(list(gmina_changes))
+    fixed_df.loc[moved, "terc_code"] = fixed_df.loc[moved, "gmina_code"].map(gmina_changes)
+
+    unmatched = fixed_df["terc_code"].isna()
+    fixed_df.loc[~unmatched, "county"] = fixed_df.loc[~unmatched, "terc_code"].map(current_names)
+
+    if return_unmatched:
+        return fixed_df[~unmatched], sorted(fixed_df.loc[unmatched, "county"].astype(str).unique())
+    return fixed_df[~unmatched]
+
+def ingest_election_files(
+        data_dir: str = ELECTION_DATA_DIR,
+        resolver: TercResolver|None = None,
+        column_map: dict = ELECTION_COLUMN_MAP,
+        cache_dir: str = ELECTION_CACHE_DIR,
+        n_jobs: int = -1,
+        refresh: bool = False
+) -> pd.DataFrame:
+    """
+    Parses every round file of `data_dir` into one gmina-level DataFrame.
+
+    Files with a valid cache entry (same mtime and size, or same content hash, and
+    the same column map) are read from Parquet; the remaining ones are parsed
+    concurrently in a process pool and cached, so a rerun with unchanged sources
+    does no Excel parsing at all. County TERC codes are then fixed in one pass
+    against the TERC register (`fix_election_terc_codes`).
+
+    Args:
+        data_dir (str): Directory with the "election_*" xls/xlsx/csv files.
+        resolver (TercResolver|None): TERC name index, by default `get_terc_resolver()`.
+        column_map (dict): Raw header -> normalised column, see `ELECTION_COLUMN_MAP`.
+        cache_dir (str): Directory of the parsed Parquet files (created if missing).
+        n_jobs (int): Worker processes for the files that have to be parsed.
+        refresh (bool): Ignores the cache and parses everything again.
+
+    Returns:
+        pd.DataFrame: `ELECTION_COLUMNS` sorted by year, round and gmina code.
+    """
+    os.makedirs(cache_dir, exist_ok= True)
+    settings_hash = _settings_hash(column_map)
+
+    paths = sorted(
+        os.path.join(data_dir, name) for name in os.listdir(data_dir)
+        if name.endswith((".xls", ".xlsx", ".csv")) and ELECTION_FILE_PATTERN.match(os.path.splitext(name)[0])
+    )
+
+    frames = {}
+    for path in paths:
+        cached = None if refresh else _load_cached_file(path, cache_dir, settings_hash)
+        if cached is not None:
+            frames[path] = cached
+
+    missing = [path for path in paths if path not in frames]
+    if missing:
+        parsed = Parallel(n_jobs= n_jobs, prefer= "processes")(
+            delayed(_parse_and_cache_file)(path, column_map, cache_dir, settings_hash) for path in missing
+        )
+        frames.update(zip(missing, parsed))
+
+    election_df = pd.concat([frames[path] for path in paths], ignore_index= True)
+
+    election_df = fix_election_terc_codes(election_df, resolver or get_terc_resolver())
+
+    return election_df.sort_values(["year", "round", "gmina_code"]).reset_index(drop= True)
+
+def aggregate_county_turnout(election_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates gmina rows to the county turnout table ("presidential_election.parquet" layout).
+
+    Turnout is the sum of votes cast over the sum of authorized voters when the
+    round publishes counts, otherwise the mean of the gmina percentages.
+
+    Returns:
+        pd.DataFrame: "county", "terc_code", "turnout_percentage", "year", "round".
+    """
+    grouped = election_df.groupby(["terc_code", "year", "round"], sort= True)
+
+    county_df = grouped.agg(
+        county= ("county", "first"),
+        authorized_voters= ("authorized_voters", lambda values: values.sum(min_count= 1)),
+        votes_cast= ("votes_cast", lambda values: values.sum(min_count= 1)),
+        mean_turnout= ("turnout_percentage", "mean"),
+    ).reset_index()
+
+    county_df["turnout_percentage"] = np.where(
+        county_df["authorized_voters"].notna() & county_df["votes_cast"].notna(),
+        (county_df["votes_cast"] / county_df["authorized_voters"] * 100).round(2),
+        county_df["mean_turnout"]
+    )
+
+    return (
+        county_df[["county", "terc_code", "turnout_percentage", "year", "round"]]
+        .sort_values(["terc_code", "year", "round"])
+        .reset_index(drop= True)
+    )
@@ -1,9 +1,33 @@
 import pandas as pd
 import numpy as np
 import pmdarima as pm
+from joblib import Parallel, delayed, parallel_config
 
+from src.arima_cache_methods import ArimaCache, fit_arima_cached
+from src.panel_methods import IndicatorPanel
 
-def extrapolate_1999_data(dataframe: pd.DataFrame, indicators_list: list) -> pd.DataFrame:
+ARIMA_FORECAST_SETTINGS: dict = {
+    "start_p": 0,
+    "start_q": 0,
+    "max_p": 2,
+    "max_q": 2,
+    "max_order": 3,
+    "d": None,
+    "test": "kpss",
+    "seasonal": False,
+    "stepwise": True,
+    "maxiter": 15,
+    "method": "nm",
+    "error_action": "ignore",
+    "suppress_warnings": True,
+    "trace": False,
+    "n_jobs": 1
+}
+
+ROLLING_STATISTICS: tuple = ("mean", "sum", "std", "min", "max")
+
+
+def extrapolate_1999_data(dataframe: pd.DataFrame|IndicatorPanel, indicators_list: list) -> pd.DataFrame|IndicatorPanel:
     """
     Generates data for the year 1999 using linear extrapolation based on data 
     from 2000 and 2001.
@@ -17,15 +41,19 @@ def extrapolate_1999_data(dataframe: pd.DataFrame, indicators_list: list) -> pd.
     values for 1999 are clipped to a minimum of 0 to prevent unrealistic negative results.
 
     Args:
-        dataframe (pd.DataFrame): The input DataFrame containing indicator data. 
-            Must include "terc_code" and "year" columns.
+        dataframe (pd.DataFrame|IndicatorPanel): The input DataFrame containing indicator data. 
+            Must include "terc_code" and "year" columns. An `IndicatorPanel` is 
+            extrapolated with array slices and returned as a panel.
         indicators_list (list): A list of column names (strings) representing 
             the numeric indicators to be extrapolated.
 
     Returns:
-        pd.DataFrame: A new DataFrame containing the original data augmented with 
+        pd.DataFrame|IndicatorPanel: A new DataFrame containing the original data augmented with 
             the generated rows for 1999, sorted by "terc_code" and "year".
     """
+    if isinstance(dataframe, IndicatorPanel):
+        return _extrapolate_1999_panel(dataframe, indicators_list)
+
     
     df_out = dataframe.copy()
     
@@ -58,36 +86,183 @@ def extrapolate_1999_data(dataframe: pd.DataFrame, indicators_list: list) -> pd.
     
     return df_final
 
-import pandas as pd
-import numpy as np
+def _extrapolate_1999_panel(panel: IndicatorPanel, indicators_list: list) -> IndicatorPanel:
+    panel = panel.with_years(1999, int(panel.years[-1]))
+    p1999, p2000, p2001 = (panel.year_position(year) for year in (1999, 2000, 2001))
+
+    common = panel.present[:, p2000] & panel.present[:, p2001]
+    new_rows = common & ~panel.present[:, p1999]
+
+    # Like the DataFrame version, new 1999 rows start as a copy of 2000.
+    panel.values[:, new_rows, p1999] = panel.values[:, new_rows, p2000]
+
+    for col in indicators_list:
+        if col not in panel.indicators:
+            continue
+        values = panel.indicator(col)
+        val_1999 = 2 * values[common, p2000] - values[common, p2001]
+
+        observed = values[panel.present]
+        if (observed >= 0).all():
+            val_1999 = np.clip(val_1999, 0, None)
+
+        values[common, p1999] = val_1999
+
+    panel.present[:, p1999] |= common
+
+    return panel
+
+def _delta_name(col: str, periods: int) -> str:
+    return f"{col}_delta_{periods}_year" if periods == 1 else f"{col}_delta_{periods}_years"
+
+def generate_time_features(
+        dataframe: pd.DataFrame,
+        indicators_list: list,
+        lags: tuple = (),
+        deltas: tuple = (1, 5),
+        rolling_windows: tuple = (),
+        rolling_statistics: tuple = ("mean",),
+        group_column: str = "terc_code",
+        time_column: str = "year"
+) -> pd.DataFrame:
+    """
+    Computes lags, deltas and rolling-window statistics of all indicators in one grouped pass.
+
+    The rows are ordered by (group, time) once and the indicators are taken as a single
+    (row, indicator) float array. Every feature is then plain array arithmetic on that
+    array: a shift by k rows is valid where the row k positions earlier belongs to the
+    same group, and a rolling window is valid where the whole window lies inside the
+    group. Additional lags or windows add arithmetic only, not further groupby scans.
+    Shifts are by rows, exactly like `groupby(group_column)[col].diff(k)`, and rolling
+    windows follow `groupby(...).rolling(window).agg()` (NaN until the window is full,
+    NaN whenever the window holds a NaN, sample std).
+
+    Args:
+        dataframe (pd.DataFrame): Long data with `group_column`, `time_column` and the indicators.
+        indicators_list (list): Indicator columns to derive features from.
+        lags (tuple): Row lags, named "{col}_lag_{k}".
+        deltas (tuple): Differences, named "{col}_delta_1_year" / "{col}_delta_{k}_years".
+        rolling_windows (tuple): Window lengths, named "{col}_rolling_{stat}_{w}".
+        rolling_statistics (tuple): Statistics from `ROLLING_STATISTICS` computed for each window.
+        group_column (str): Column identifying the regional unit.
+        time_column (str): Column used to order rows inside a group.
 
-def prepare_lagged_features(dataframe: pd.DataFrame, indicators_list: list) -> pd.DataFrame:
+    Returns:
+        pd.DataFrame: One contiguous float block of features (indicator-major column
+            order) aligned with `dataframe.index`.
+    """
+    unknown = set(rolling_statistics) - set(ROLLING_STATISTICS)
+    if unknown:
+        raise ValueError(f"Unknown rolling statistics: {', '.join(sorted(unknown))}. Expected: {', '.join(ROLLING_STATISTICS)}")
+
+    order = np.lexsort((dataframe[time_column].to_numpy(), dataframe[group_column].to_numpy()))
+    values = dataframe[indicators_list].to_numpy(dtype= float)[order]
+    groups = dataframe[group_column].to_numpy()[order]
+
+    n_rows, n_indicators = values.shape
+    group_start = np.r_[True, groups[1:] != groups[:-1]] if n_rows else np.zeros(0, dtype= bool)
+    start_rows = np.flatnonzero(group_start)
+    position_in_group = np.arange(n_rows) - start_rows[np.cumsum(group_start) - 1]
+
+    specs = (
+        [("lag", k, None) for k in lags]
+        + [("delta", k, None) for k in deltas]
+        + [("rolling", w, stat) for w in rolling_windows for stat in rolling_statistics]
+    )
+    columns = []
+    for col in indicators_list:
+        for kind, k, stat in specs:
+            if kind == "lag":
+                columns.append(f"{col}_lag_{k}")
+            elif kind == "delta":
+                columns.append(_delta_name(col, k))
+            else:
+                columns.append(f"{col}_rolling_{stat}_{k}")
+
+    # Indicator-major layout: the column of (indicator i, spec j) is i * len(specs) + j.
+    block = np.full((n_rows, n_indicators * len(specs)), np.nan)
+    spec_columns = np.arange(n_indicators) * len(specs)
+
+    for j, (kind, k, stat) in enumerate(specs):
+        result = np.full((n_rows, n_indicators), np.nan)
+
+        if kind in ("lag", "delta") and 0 < k < n_rows:
+            valid = position_in_group[k:] >= k
+            shifted = values[:-k][valid]
+            result[k:][valid] = shifted if kind == "lag" else values[k:][valid] - shifted
+        elif kind == "rolling" and 0 < k <= n_rows:
+            valid = position_in_group[k - 1:] >= k - 1
+            windows = np.lib.stride_tricks.sliding_window_view(values, k, axis= 0)[valid]
+            if stat == "std":
+                aggregated = windows.std(axis= -1, ddof= 1) if k > 1 else np.full(windows.shape[:2], np.nan)
+            else:
+                aggregated = getattr(windows, stat)(axis= -1)
+            result[k - 1:][valid] = aggregated
+
+        block[:, spec_columns + j] = result
+
+    features = np.empty_like(block)
+    features[order] = block
+
+    return pd.DataFrame(features, index= dataframe.index, columns= columns, copy= False)
+
+def _panel_row_deltas(panel: IndicatorPanel, col: str, periods: int) -> np.ndarray:
+    # Differences between rows of a county, like `groupby("terc_code")[col].diff(periods)` on the
+    # long format: a county with a missing year is compared with its previous existing row.
+    county_positions, year_positions = np.nonzero(panel.present)
+    values = panel.indicator(col)[county_positions, year_positions]
+
+    group_start = np.r_[True, county_positions[1:] != county_positions[:-1]] if len(values) else np.zeros(0, dtype= bool)
+    start_rows = np.flatnonzero(group_start)
+    position_in_group = np.arange(len(values)) - start_rows[np.cumsum(group_start) - 1]
+
+    row_deltas = np.full(len(values), np.nan)
+    if 0 < periods < len(values):
+        valid = position_in_group[periods:] >= periods
+        row_deltas[periods:][valid] = values[periods:][valid] - values[:-periods][valid]
+
+    delta = np.full(panel.present.shape, np.nan)
+    delta[county_positions, year_positions] = row_deltas
+
+    return delta
+
+def prepare_lagged_features(dataframe: pd.DataFrame|IndicatorPanel, indicators_list: list) -> pd.DataFrame|IndicatorPanel:
     """
     Applies a one-year lag to the dataset and calculates annual and five-year indicator deltas.
 
     This function increments the "year" column by 1 to align socio-economic indicators 
     with the corresponding election year. It computes the 1-year and 5-year differences 
-    for each specified indicator, grouped by regional unit (terc_code). Missing values 
-    (NaN) are preserved for periods where sufficient historical data is unavailable.
+    for each specified indicator, grouped by regional unit (terc_code), in one pass of 
+    `generate_time_features`. Missing values (NaN) are preserved for periods where 
+    sufficient historical data is unavailable.
 
     Args:
-        dataframe (pd.DataFrame): Input DataFrame containing "terc_code", "year", and indicators.
+        dataframe (pd.DataFrame|IndicatorPanel): Input DataFrame containing "terc_code", "year", 
+            and indicators, or an `IndicatorPanel`. Both compute deltas between existing rows of
+            a county (not calendar years), so they agree when a county has a missing year.
         indicators_list (list): List of column names for which deltas should be calculated.
 
     Returns:
-        pd.DataFrame: A DataFrame with the shifted timeline and additional columns 
+        pd.DataFrame|IndicatorPanel: A DataFrame with the shifted timeline and additional columns 
             for 1-year and 5-year deltas.
     """
+    if isinstance(dataframe, IndicatorPanel):
+        deltas = {
+            _delta_name(col, periods): _panel_row_deltas(dataframe, col, periods)
+            for col in indicators_list
+            for periods in (1, 5)
+        }
+
+        return dataframe.shift_years(1).with_indicators(deltas)
+
     df = dataframe.copy()
     
     df["year"] = df["year"] + 1
     df = df.sort_values(by=["terc_code", "year"])
     
-    for col in indicators_list:
-        df[f"{col}_delta_1_year"] = df.groupby("terc_code")[col].diff(1)
-        df[f"{col}_delta_5_years"] = df.groupby("terc_code")[col].diff(5)
+    features = generate_time_features(df, indicators_list, deltas= (1, 5))
         
-    return df
+    return pd.concat([df, features], axis= 1)
 
 def merge_election_data(df_election: pd.DataFrame, df_features: pd.DataFrame, target_years: list) -> pd.DataFrame:
     """
@@ -125,7 +300,7 @@ def merge_election_data(df_election: pd.DataFrame, df_features: pd.DataFrame, ta
     return df_final
 
 
-def forecast_arima_to_2030(terc_code: str, dataframe: pd.DataFrame, indicators_list: list, years_list: list) -> list:
+def forecast_arima_to_2030(terc_code: str, dataframe: pd.DataFrame|IndicatorPanel, indicators_list: list, years_list: list, cache: ArimaCache|None = None) -> list:
     """
     Generates forecasts for specified economic indicators up to the year 2030 using ARIMA models.
 
@@ -135,21 +310,33 @@ def forecast_arima_to_2030(terc_code: str, dataframe: pd.DataFrame, indicators_l
 
     Args:
         terc_code (str): The unique TERC identification code for the county.
-        dataframe (pd.DataFrame): The input DataFrame containing historical data. 
-            Must include "terc_code", "county", "year", and the indicator columns.
+        dataframe (pd.DataFrame|IndicatorPanel): The input DataFrame containing historical data. 
+            Must include "terc_code", "county", "year", and the indicator columns. With an
+            `IndicatorPanel` the county's series are read by array indexing.
         indicators_list (list): A list of strings representing the column names of the 
             economic indicators to be forecasted (e.g., ["gdp_per_capita", "average_gross_salary"]).
         target_years (list): A list of integers representing the future years for which 
             forecasts should be generated.
+        cache (ArimaCache|None): Optional cache of fitted models and selected orders 
+            (see `arima_cache_methods.fit_arima_cached`).
 
     Returns:
         list[dict]: A list of dictionaries, where each dictionary contains the forecasted 
             data for a specific year. Each dictionary includes keys for "terc_code", "county", 
             "year", and the predicted values for each indicator in `indicators_list`.
     """
-    county_data = dataframe[dataframe["terc_code"] == terc_code].sort_values("year")
+    if isinstance(dataframe, IndicatorPanel):
+        position = dataframe.county_position(terc_code)
+        county_name = dataframe.county_names[position]
+        series = {col: dataframe.indicator(col)[position] for col in indicators_list}
+    else:
+        # Skip the full-frame filter when the caller already passed this county's group.
+        codes = dataframe["terc_code"].to_numpy()
+        county_data = dataframe if (codes == terc_code).all() else dataframe[codes == terc_code]
+        county_data = county_data.sort_values("year")
 
-    county_name = county_data["county"].iloc[0]
+        county_name = county_data["county"].iloc[0]
+        series = {col: county_data[col].to_numpy(dtype= float) for col in indicators_list}
     
     forecasts_by_year = {
         year: {
@@ -161,29 +348,12 @@ def forecast_arima_to_2030(terc_code: str, dataframe: pd.DataFrame, indicators_l
     
     for col in indicators_list:
 
-        ts = county_data.set_index("year")[col].dropna()
+        ts = series[col][~np.isnan(series[col])]
 
         predictions = []
     
 
-        model = pm.auto_arima(
-            ts,
-            start_p= 0, 
-            start_q= 0,
-            max_p= 2, 
-            max_q= 2, 
-            max_order= 3, 
-            d= None, 
-            test= "kpss", 
-            seasonal= False,         
-            stepwise= True, 
-            maxiter= 15, 
-            method= "nm",  
-            error_action= "ignore",
-            suppress_warnings= True,
-            trace= False, 
-            n_jobs= 1
-        )
+        model = fit_arima_cached(ts, ARIMA_FORECAST_SETTINGS, cache, f"forecast/{terc_code}/{col}")
         
         predictions = model.predict(n_periods=len(years_list))
              
@@ -194,3 +364,134 @@ def forecast_arima_to_2030(terc_code: str, dataframe: pd.DataFrame, indicators_l
 
     return list(forecasts_by_year.values())
 
+def forecast_series_arima(values: np.ndarray, periods: int, cache: ArimaCache|None = None, series_name: str|None = None) -> np.ndarray:
+    """
+    Fits `auto_arima` (with `ARIMA_FORECAST_SETTINGS`) to one series and forecasts `periods` steps.
+
+    Args:
+        values (np.ndarray): Observed values sorted by year, without NaNs.
+        periods (int): Number of future years to forecast.
+        cache (ArimaCache|None): Optional cache of fitted models and selected orders.
+        series_name (str|None): Stable series name used by the cache's order fast path.
+
+    Returns:
+        np.ndarray: The point forecasts.
+    """
+    model = fit_arima_cached(values, ARIMA_FORECAST_SETTINGS, cache, series_name)
+    return np.asarray(model.predict(n_periods= periods), dtype= float)
+
+def simulate_series_arima(values: np.ndarray, periods: int, n_draws: int, seed: int|list = 0, cache: ArimaCache|None = None, series_name: str|None = None) -> np.ndarray:
+    """
+    Draws `n_draws` future sample paths of one series from its fitted ARIMA model.
+
+    Paths are simulated from the end of the observed series by the model's state space
+    representation, so shocks accumulate over the horizon as in the forecast intervals
+    and the mean path converges to the point forecast of `forecast_series_arima`.
+
+    Args:
+        values (np.ndarray): Observed values sorted by year, without NaNs.
+        periods (int): Number of future years to simulate.
+        n_draws (int): Number of sample paths.
+        seed (int|list): Seed of the random generator (reproducible per series).
+        cache (ArimaCache|None): Optional cache of fitted models and selected orders.
+        series_name (str|None): Stable series name used by the cache's order fast path.
+
+    Returns:
+        np.ndarray: float32 array of shape (periods, n_draws).
+    """
+    model = fit_arima_cached(values, ARIMA_FORECAST_SETTINGS, cache, series_name)
+    rng = np.random.default_rng(seed)
+
+    try:
+        paths = model.arima_res_.simulate(nsimulations= periods, repetitions= n_draws, anchor= "end", rng= rng)
+    except TypeError:
+        # statsmodels < 0.15 names the generator argument `random_state`.
+        paths = model.arima_res_.simulate(nsimulations= periods, repetitions= n_draws, anchor= "end", random_state= rng)
+
+    return np.asarray(paths, dtype= np.float32).reshape(periods, n_draws)
+
+def _forecast_task_batch(tasks: list[tuple[str, str, np.ndarray]], periods: int, cache: ArimaCache|None = None) -> list[tuple[str, str, np.ndarray, str|None]]:
+    results = []
+
+    for terc_code, col, values in tasks:
+        try:
+            predictions = forecast_series_arima(values, periods, cache, f"forecast/{terc_code}/{col}")
+            results.append((terc_code, col, predictions, None))
+        except Exception as e:
+            results.append((terc_code, col, np.full(periods, np.nan), f"{type(e).__name__}: {e}"))
+
+    return results
+
+def forecast_indicators_parallel(dataframe: pd.DataFrame|IndicatorPanel, indicators_list: list, years_list: list, n_jobs: int = -1, batch_size: int = 16, verbose: int = 10, cache: ArimaCache|None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Forecasts every (county, indicator) series with ARIMA on a process pool.
+
+    The DataFrame is sorted and grouped once in the parent process; each worker 
+    only receives compact NumPy arrays, in batches of `batch_size` tasks to keep 
+    scheduling overhead low. Worker processes are limited to one BLAS thread each, 
+    so fits scale with the number of cores instead of contending for the GIL. 
+    A failing fit does not stop the run: its forecasts are NaN and the error is 
+    reported in the failures table. Progress is printed by joblib (`verbose`).
+
+    Args:
+        dataframe (pd.DataFrame|IndicatorPanel): Historical data with "terc_code", "county", 
+            "year" and the indicator columns, or an `IndicatorPanel`.
+        indicators_list (list): Indicator columns to forecast.
+        years_list (list): Future years to forecast, in order (e.g. [2025, ..., 2029]).
+        n_jobs (int): Number of worker processes (-1 uses all cores).
+        batch_size (int): Number of (county, indicator) fits sent to a worker at once.
+        verbose (int): joblib verbosity level used for progress reporting.
+        cache (ArimaCache|None): Optional cache of fitted models and selected orders, 
+            shared by all workers through the file system (expired entries are pruned first).
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: 
+            - forecasts: "terc_code", "county", "year" and one column per indicator 
+              (the same layout as the flattened `forecast_arima_to_2030` results).
+            - failures: "terc_code", "indicator", "error" for every failed fit.
+    """
+    tasks = []
+
+    if isinstance(dataframe, IndicatorPanel):
+        county_names = pd.Series(dataframe.county_names, index= dataframe.terc_codes)
+        for col in indicators_list:
+            for terc_code, values in zip(dataframe.terc_codes, dataframe.indicator(col)):
+                tasks.append((terc_code, col, values[~np.isnan(values)]))
+    else:
+        data = dataframe.sort_values(["terc_code", "year"])
+        county_names = data.groupby("terc_code", sort= True)["county"].first()
+        for terc_code, group in data.groupby("terc_code", sort= True):
+            for col in indicators_list:
+                values = group[col].to_numpy(dtype= float)
+                tasks.append((terc_code, col, values[~np.isnan(values)]))
+
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+    periods = len(years_list)
+
+    if cache is not None:
+        cache.prune()
+
+    with parallel_config(backend= "loky", inner_max_num_threads= 1):
+        results_nested = Parallel(n_jobs= n_jobs, verbose= verbose)(
+            delayed(_forecast_task_batch)(batch, periods, cache) for batch in batches
+        )
+
+    county_position = {terc_code: i for i, terc_code in enumerate(county_names.index)}
+    indicator_position = {col: i for i, col in enumerate(indicators_list)}
+    values = np.full((len(county_names), periods, len(indicators_list)), np.nan)
+    failures = []
+
+    for batch_results in results_nested:
+        for terc_code, col, predictions, error in batch_results:
+            values[county_position[terc_code], :, indicator_position[col]] = predictions
+            if error is not None:
+                failures.append({"terc_code": terc_code, "indicator": col, "error": error})
+
+    forecasts = pd.DataFrame({
+        "terc_code": np.repeat(county_names.index.to_numpy(), periods),
+        "county": np.repeat(county_names.to_numpy(), periods),
+        "year": np.tile(years_list, len(county_names)),
+    })
+    forecasts[indicators_list] = values.reshape(-1, len(indicators_list))
+
+    return forecasts, pd.DataFrame(failures, columns= ["terc_code", "indicator", "error"])
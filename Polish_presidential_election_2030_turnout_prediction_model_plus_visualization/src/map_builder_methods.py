@@ -0,0 +1,427 @@
+import hashlib
+import json
+import os
+import pandas as pd
+import numpy as np
+import shapely
+import geopandas as gpd
+import folium
+import branca.colormap as cm
+from branca.element import MacroElement
+from folium.utilities import JsCode
+from jinja2 import Template
+from joblib import Parallel, delayed
+
+from src.folium_visualization_methods import style_function, highlight_function
+
+COUNTY_BORDERS_PATH: str = os.path.join("..", "Data", "Raw_data", "Geo_spacial", "county_borders.shp")
+PREDICTIONS_PATH: str = os.path.join("..", "Data", "Proccesed_data", "final_predictions_to_visualize.parquet")
+MAP_CACHE_DIR: str = os.path.join("..", "Data", "Cache", "maps")
+
+# Shapefile attribute -> column.
+COUNTY_BORDERS_COLUMNS: dict = {"JPT_KOD_JE": "terc_code", "JPT_NAZWA_": "county_name"}
+
+TURNOUT_COLORS: list = ["#fff5eb", "#fdbe85", "#fd8d3c", "#d94701", "#7f2704"]
+MISSING_COLOR: str = "#d9d9d9"
+
+# Methods:
+
+def simplify_coverage(geometries: np.ndarray, tolerance: float, decimals: int) -> np.ndarray:
+    """
+    Simplifies county polygons without opening gaps between neighbours and snaps them to a grid.
+
+    `shapely.coverage_simplify` simplifies every shared border once, so both
+    neighbouring counties keep the same edge; when the input is not a valid coverage
+    (or GEOS is older than 3.12) each polygon is simplified on its own with
+    `preserve_topology=True`. Coordinates are then snapped to `decimals` decimal
+    places (`set_precision` keeps the polygons valid) and rounded so that they
+    serialise to short JSON numbers.
+    """
+    try:
+        simplified = shapely.coverage_simplify(geometries, tolerance)
+    except (AttributeError, shapely.errors.GEOSException, shapely.errors.UnsupportedGEOSVersionError):
+        simplified = shapely.simplify(geometries, tolerance, preserve_topology= True)
+
+    quantized = shapely.set_precision(simplified, 10 ** -decimals)
+
+    return shapely.transform(quantized, lambda coords: np.round(coords, decimals))
+
+def _geometry_cache_key(path: str, tolerance: float, decimals: int) -> str:
+    digest = hashlib.sha256()
+    stem = os.path.splitext(path)[0]
+
+    for extension in (".shp", ".shx", ".dbf", ".prj"):
+        if os.path.exists(stem + extension):
+            stat = os.stat(stem + extension)
+            digest.update(f"{extension}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+
+    digest.update(json.dumps({"tolerance": tolerance, "decimals": decimals, "shapely": shapely.__version__}).encode("utf-8"))
+    return digest.hexdigest()
+
+def load_county_geometry(
+        path: str = COUNTY_BORDERS_PATH,
+        tolerance: float = 0.002,
+        decimals: int = 4,
+        cache_dir: str = MAP_CACHE_DIR,
+        refresh: bool = False
+) -> gpd.GeoDataFrame:
+    """
+    Returns the county borders in WGS84 (EPSG:4326), simplified and quantized, from a cache when possible.
+
+    The shapefile is read, reprojected and simplified (`simplify_coverage`) once;
+    the result is stored as GeoParquet keyed on the size and mtime of the shapefile
+    parts and the settings, so later maps skip the shapefile entirely.
+
+    Args:
+        path (str): The "county_borders.shp" file.
+        tolerance (float): Simplification tolerance in degrees (0.002 is about 150-200 m).
+        decimals (int): Decimal places kept in the coordinates (4 is about 10 m).
+        cache_dir (str): Directory of the cached geometry (created if missing).
+        refresh (bool): Ignores the cache.
+
+    Returns:
+        gpd.GeoDataFrame: "terc_code", "county_name" and "geometry", sorted by terc_code.
+    """
+    os.makedirs(cache_dir, exist_ok= True)
+    cache_path = os.path.join(cache_dir, f"county_borders-{_geometry_cache_key(path, tolerance, decimals)[:16]}.parquet")
+
+    if not refresh and os.path.exists(cache_path):
+        return gpd.read_parquet(cache_path)
+
+    counties_gdf = gpd.read_file(path, columns= list(COUNTY_BORDERS_COLUMNS)).rename(columns= COUNTY_BORDERS_COLUMNS)
+    counties_gdf = counties_gdf.to_crs(epsg= 4326)
+    counties_gdf["terc_code"] = counties_gdf["terc_code"].astype(str).str.strip().str[:4]
+    counties_gdf["geometry"] = simplify_coverage(counties_gdf.geometry.to_numpy(), tolerance, decimals)
+    counties_gdf = counties_gdf.sort_values("terc_code").reset_index(drop= True)
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    counties_gdf.to_parquet(tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    return counties_gdf
+
+def pivot_map_values(values_df: pd.DataFrame, value_columns: list = ["turnout_percentage"], by: tuple = ("year", "round")) -> pd.DataFrame:
+    """
+    Turns long per-county results into one row per county with a column per value and (year, round),
+    e.g. "turnout_percentage_2030_round_1".
+
+    Returns:
+        pd.DataFrame: Indexed by terc_code.
+    """
+    wide_df = values_df.pivot_table(index= "terc_code", columns= list(by), values= value_columns, aggfunc= "first")
+
+    names = []
+    for key in wide_df.columns:
+        value, *labels = key
+        names.append("_".join([value] + [f"{column}_{label}" if column != "year" else str(label) for column, label in zip(by, labels)]))
+    wide_df.columns = names
+
+    return wide_df
+
+def interpolate_colors(values: np.ndarray, colors: list = TURNOUT_COLORS, vmin: float|None = None, vmax: float|None = None, missing_color: str = MISSING_COLOR) -> np.ndarray:
+    """
+    Maps values linearly onto a palette (like `branca.colormap.LinearColormap`) in one vectorised step.
+
+    Returns:
+        np.ndarray: Hex colors, `missing_color` where the value is NaN.
+    """
+    values = np.asarray(values, dtype= float)
+    vmin = np.nanmin(values) if vmin is None else vmin
+    vmax = np.nanmax(values) if vmax is None else vmax
+
+    rgb = np.array([[int(color[i:i + 2], 16) for i in (1, 3, 5)] for color in colors], dtype= float)
+    stops = np.linspace(0, 1, len(colors))
+    scaled = np.clip((values - vmin) / ((vmax - vmin) or 1), 0, 1)
+
+    channels = np.stack([np.interp(scaled, stops, rgb[:, i]) for i in range(3)], axis= -1).round().astype(int)
+    hex_colors = np.array([f"#{r:02x}{g:02x}{b:02x}" for r, g, b in channels.reshape(-1, 3)], dtype= object).reshape(values.shape)
+    hex_colors[np.isnan(values)] = missing_color
+
+    return hex_colors
+
+def precompute_styles(fill_colors: np.ndarray, fill_opacity: float = 0.75) -> list[dict]:
+    """
+    Returns the Leaflet style of every feature: the borders of `style_function` with the given fill.
+    """
+    base_style = style_function(None)
+    return [{**base_style, "fillColor": color, "fillOpacity": fill_opacity} for color in fill_colors]
+
+def _feature_collection(map_gdf: pd.DataFrame, property_columns: list, styles: list[dict]|None = None) -> dict:
+    # Only the listed properties are embedded; NaN is not valid JSON, so missing values become null.
+    properties = map_gdf[property_columns].astype(object).where(map_gdf[property_columns].notna(), None).to_dict("records")
+    geometries = shapely.to_geojson(map_gdf.geometry.to_numpy())
+
+    features = []
+    for i, (props, geometry) in enumerate(zip(properties, geometries)):
+        if styles is not None:
+            props["style"] = styles[i]
+        features.append({"type": "Feature", "properties": props, "geometry": json.loads(geometry)})
+
+    return {"type": "FeatureCollection", "features": features}
+
+def _map_frame(counties_gdf: gpd.GeoDataFrame|None, values_df: pd.DataFrame|None) -> gpd.GeoDataFrame:
+    # Every numeric column of the long results (except year and round) becomes one column per (year, round).
+    counties_gdf = load_county_geometry() if counties_gdf is None else counties_gdf
+    values_df = pd.read_parquet(PREDICTIONS_PATH) if values_df is None else values_df
+    value_columns = [col for col in values_df.select_dtypes("number").columns if col not in ("year", "round")]
+
+    return counties_gdf.merge(pivot_map_values(values_df, value_columns), how= "left", left_on= "terc_code", right_index= True)
+
+def _check_layers(map_gdf: gpd.GeoDataFrame, layers: list) -> None:
+    unknown = [layer for layer in layers if layer not in map_gdf.columns]
+    if unknown:
+        available = [col for col in map_gdf.columns if col not in ("terc_code", "county_name", "geometry")]
+        raise KeyError(f"Unknown value columns {unknown}. Available: {', '.join(available)}")
+
+def _styled_geojson(feature_collection: dict, tooltip_columns: list, name: str, style_expression: str = "feature.properties.style") -> folium.GeoJson:
+    # The style is read from the feature in JavaScript instead of a Python style_function per feature,
+    # and set as the layer style so that resetStyle after a highlight restores it.
+    return folium.GeoJson(
+        feature_collection,
+        highlight_function= highlight_function,
+        tooltip= folium.GeoJsonTooltip(fields= tooltip_columns),
+        name= name,
+        style= JsCode(f"function(feature) {{ return {style_expression}; }}")
+    )
+
+def build_choropleth_map(
+        value_column: str = "turnout_percentage_2030_round_1",
+        counties_gdf: gpd.GeoDataFrame|None = None,
+        values_df: pd.DataFrame|None = None,
+        output_path: str|None = None,
+        output_format: str = "geojson",
+        colors: list = TURNOUT_COLORS,
+        vmin: float|None = None,
+        vmax: float|None = None,
+        tooltip_columns: list|None = None,
+        caption: str|None = None,
+        location: list = [52.1, 19.4],
+        zoom_start: int = 6,
+        tiles: str = "cartodbpositron"
+) -> folium.Map:
+    """
+    Builds a county choropleth of one value column with styles computed up front.
+
+    Geometry comes from `load_county_geometry` (simplified, quantized and cached) and
+    the values from `final_predictions_to_visualize.parquet` pivoted by `pivot_map_values`,
+    joined on terc_code. Each feature carries its final Leaflet style in
+    `properties.style`, so folium does not call a Python style function per feature
+    and only the tooltip columns and the style are embedded; hovering uses the
+    existing `highlight_function`.
+
+    With `output_format="topojson"` the counties are embedded as TopoJSON (shared
+    borders stored once as delta-encoded integer arcs), which makes the HTML smaller
+    again; it needs the optional `topojson` package and has no hover highlight.
+
+    Args:
+        value_column (str): Column to color by (see `pivot_map_values` for the names).
+        counties_gdf (gpd.GeoDataFrame|None): Geometry, `load_county_geometry()` by default.
+        values_df (pd.DataFrame|None): Long results ("terc_code", "year", "round", values),
+            `final_predictions_to_visualize.parquet` by default.
+        output_path (str|None): HTML file the map is saved to.
+        output_format (str): "geojson" or "topojson".
+        colors (list): Palette from low to high values.
+        vmin (float|None): Value of the first color, the minimum by default.
+        vmax (float|None): Value of the last color, the maximum by default.
+        tooltip_columns (list|None): Columns shown on hover, county name and `value_column` by default.
+        caption (str|None): Legend caption, `value_column` by default.
+        location (list): Initial map center.
+        zoom_start (int): Initial zoom.
+        tiles (str): Folium tiles.
+
+    Returns:
+        folium.Map: The map (also saved when `output_path` is given).
+    """
+    if output_format not in ("geojson", "topojson"):
+        raise ValueError(f"Unknown output format '{output_format}'. Expected 'geojson' or 'topojson'.")
+
+    map_gdf = _map_frame(counties_gdf, values_df)
+    _check_layers(map_gdf, [value_column])
+
+    values = map_gdf[value_column].to_numpy(dtype= float)
+    vmin = np.nanmin(values) if vmin is None else vmin
+    vmax = np.nanmax(values) if vmax is None else vmax
+
+    styles = precompute_styles(interpolate_colors(values, colors, vmin, vmax))
+    tooltip_columns = tooltip_columns or ["county_name", value_column]
+
+    folium_map = folium.Map(location= location, zoom_start= zoom_start, tiles= tiles)
+
+    if output_format == "geojson":
+        _styled_geojson(_feature_collection(map_gdf, tooltip_columns, styles), tooltip_columns, value_column).add_to(folium_map)
+    else:
+        import topojson
+
+        topo_gdf = map_gdf[tooltip_columns + ["geometry"]].copy()
+        topo_gdf["style"] = styles
+        topology = topojson.Topology(topo_gdf, prequantize= True).to_dict()
+        folium.TopoJson(
+            topology, "objects.data",
+            tooltip= folium.GeoJsonTooltip(fields= tooltip_columns),
+            name= value_column
+        ).add_to(folium_map)
+
+    cm.LinearColormap(colors, vmin= vmin, vmax= vmax, caption= caption or value_column).add_to(folium_map)
+
+    if output_path is not None:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok= True)
+        folium_map.save(output_path)
+
+    return folium_map
+
+
+class LayerSwitcher(MacroElement):
+    """
+    Leaflet control with a drop-down that recolors one `GeoJson` layer from per-layer fill colors
+    stored in its features (`properties.fill`), so the geometry is embedded once for all layers.
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        window.{{ this.get_name() }}_active = 0;
+        var {{ this.get_name() }} = L.control({position: "topright"});
+        {{ this.get_name() }}.onAdd = function() {
+            var div = L.DomUtil.create("div", "leaflet-bar");
+            div.style.background = "white";
+            div.style.padding = "4px";
+            var select = L.DomUtil.create("select", "", div);
+            {{ this.labels|tojson }}.forEach(function(label, i) {
+                select.add(new Option(label, i));
+            });
+            L.DomEvent.disableClickPropagation(div);
+            L.DomEvent.on(select, "change", function() {
+                window.{{ this.get_name() }}_active = Number(select.value);
+                {{ this.geojson.get_name() }}.resetStyle();
+            });
+            return div;
+        };
+        {{ this.get_name() }}.addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, labels: list) -> None:
+        super().__init__()
+        self._name = "LayerSwitcher"
+        self.labels = labels
+        self.geojson = None
+
+    def style_expression(self) -> str:
+        """JavaScript style of a feature for the selected layer."""
+        return f"Object.assign({{}}, feature.properties.style, {{fillColor: feature.properties.fill[window.{self.get_name()}_active || 0]}})"
+
+def build_layered_map(
+        layers: list|None = None,
+        counties_gdf: gpd.GeoDataFrame|None = None,
+        values_df: pd.DataFrame|None = None,
+        labels: dict|None = None,
+        output_path: str|None = None,
+        colors: list = TURNOUT_COLORS,
+        vmin: float|None = None,
+        vmax: float|None = None,
+        tooltip_columns: list|None = None,
+        caption: str = "turnout_percentage",
+        location: list = [52.1, 19.4],
+        zoom_start: int = 6,
+        tiles: str = "cartodbpositron"
+) -> folium.Map:
+    """
+    Builds one map with a drop-down switching between many value columns (years, rounds, scenarios, intervals).
+
+    The counties are embedded once; every value column is attached to the same
+    features as a data property together with its precomputed fill color, and the
+    switcher recolors the layer in the browser (`LayerSwitcher`). All layers share
+    one color scale so years stay comparable, so 20 layers cost about as much as
+    one. Borders and hover follow `style_function` and `highlight_function`.
+
+    Args:
+        layers (list|None): Value columns to switch between (see `pivot_map_values`), all by default.
+        counties_gdf (gpd.GeoDataFrame|None): Geometry, `load_county_geometry()` by default.
+        values_df (pd.DataFrame|None): Long results ("terc_code", "year", "round" and value
+            columns, e.g. the election history concatenated with the 2030 predictions and
+            `simulation_methods.simulate_turnout` intervals), `final_predictions_to_visualize.parquet` by default.
+        labels (dict|None): Drop-down label per layer, the column names by default.
+        output_path (str|None): HTML file the map is saved to.
+        colors (list): Palette from low to high values.
+        vmin (float|None): Value of the first color, the minimum over all layers by default.
+        vmax (float|None): Value of the last color, the maximum over all layers by default.
+        tooltip_columns (list|None): Columns shown on hover, county name and all layers by default.
+        caption (str): Legend caption.
+        location (list): Initial map center.
+        zoom_start (int): Initial zoom.
+        tiles (str): Folium tiles.
+
+    Returns:
+        folium.Map: The map (also saved when `output_path` is given).
+    """
+    map_gdf = _map_frame(counties_gdf, values_df)
+    layers = layers or [col for col in map_gdf.columns if col not in ("terc_code", "county_name", "geometry")]
+    _check_layers(map_gdf, layers)
+
+    values = map_gdf[layers].to_numpy(dtype= float)
+    vmin = np.nanmin(values) if vmin is None else vmin
+    vmax = np.nanmax(values) if vmax is None else vmax
+
+    fill_colors = interpolate_colors(values, colors, vmin, vmax)
+    tooltip_columns = tooltip_columns or ["county_name"] + layers
+
+    map_gdf[layers] = map_gdf[layers].round(2)
+    feature_collection = _feature_collection(map_gdf, tooltip_columns, precompute_styles(fill_colors[:, 0]))
+    for feature, feature_fill in zip(feature_collection["features"], fill_colors.tolist()):
+        feature["properties"]["fill"] = feature_fill
+
+    folium_map = folium.Map(location= location, zoom_start= zoom_start, tiles= tiles)
+
+    switcher = LayerSwitcher([(labels or {}).get(layer, layer) for layer in layers])
+    switcher.geojson = _styled_geojson(feature_collection, tooltip_columns, caption, switcher.style_expression())
+    switcher.geojson.add_to(folium_map)
+    switcher.add_to(folium_map)
+
+    cm.LinearColormap(colors, vmin= vmin, vmax= vmax, caption= caption).add_to(folium_map)
+
+    if output_path is not None:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok= True)
+        folium_map.save(output_path)
+
+    return folium_map
+
+def _export_map(value_column: str, output_path: str, counties_gdf: gpd.GeoDataFrame, values_df: pd.DataFrame, map_kwargs: dict) -> str:
+    build_choropleth_map(value_column, counties_gdf, values_df, output_path, **map_kwargs)
+    return output_path
+
+def export_maps(
+        output_dir: str,
+        layers: list|None = None,
+        counties_gdf: gpd.GeoDataFrame|None = None,
+        values_df: pd.DataFrame|None = None,
+        n_jobs: int = -1,
+        **map_kwargs
+) -> list[str]:
+    """
+    Saves one `build_choropleth_map` HTML per value column, built in parallel worker processes.
+
+    The geometry and values are loaded once here and shared by all maps, so no
+    worker reads the shapefile.
+
+    Args:
+        output_dir (str): Directory of the "{value column}.html" files (created if missing).
+        layers (list|None): Value columns to export, all by default.
+        counties_gdf (gpd.GeoDataFrame|None): Geometry, `load_county_geometry()` by default.
+        values_df (pd.DataFrame|None): Long results, `final_predictions_to_visualize.parquet` by default.
+        n_jobs (int): Worker processes.
+        **map_kwargs: Passed to `build_choropleth_map` (colors, vmin, vmax, output_format, ...).
+
+    Returns:
+        list[str]: Paths of the saved maps, in the order of `layers`.
+    """
+    counties_gdf = load_county_geometry() if counties_gdf is None else counties_gdf
+    values_df = pd.read_parquet(PREDICTIONS_PATH) if values_df is None else values_df
+
+    if layers is None:
+        map_gdf = _map_frame(counties_gdf, values_df)
+        layers = [col for col in map_gdf.columns if col not in ("terc_code", "county_name", "geometry")]
+
+    os.makedirs(output_dir, exist_ok= True)
+
+    return Parallel(n_jobs= n_jobs)(
+        delayed(_export_map)(layer, os.path.join(output_dir, f"{layer}.html"), counties_gdf, values_df, map_kwargs)
+        for layer in layers
+    )
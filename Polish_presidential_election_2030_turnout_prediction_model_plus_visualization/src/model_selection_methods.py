@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import warnings
+import pandas as pd
+import numpy as np
+import joblib
+from joblib import parallel_config
+from threadpoolctl import threadpool_limits
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+
+MODEL_SELECTION_DIR: str = os.path.join("..", "Data", "Cache", "model_selection")
+
+# Same grids as notebook 03.
+PARAMETER_GRIDS: dict = {
+    "xgboost": {
+        "n_estimators": [100, 200, 300],
+        "learning_rate": [0.01, 0.05, 0.1],
+        "max_depth": [3, 5, 7],
+        "subsample": [0.8, 1.0]
+    },
+    "random_forest": {
+        "n_estimators": [100, 200, 300],
+        "max_depth": [5, 10, 15, None],
+        "min_samples_split": [2, 5, 10],
+        "min_samples_leaf": [1, 2, 4]
+    },
+    "hist_gradient_boosting": {
+        "max_iter": [100, 200, 300],
+        "learning_rate": [0.01, 0.05, 0.1],
+        "max_depth": [3, 5, 7],
+        "l2_regularization": [0, 0.1, 1.0]
+    },
+}
+
+# Methods:
+
+def make_estimator(model_name: str, params: dict|None = None, n_jobs: int = 1):
+    """
+    Returns an unfitted regressor of `model_name` ("xgboost", "random_forest", "hist_gradient_boosting").
+
+    Estimators are single-threaded by default so that parallelism stays at the
+    search level; pass `n_jobs=-1` for a final refit outside the search.
+    """
+    params = params or {}
+
+    if model_name == "xgboost":
+        from xgboost import XGBRegressor
+        return XGBRegressor(random_state= 42, n_jobs= n_jobs, **params)
+    if model_name == "random_forest":
+        return RandomForestRegressor(random_state= 42, n_jobs= n_jobs, **params)
+    if model_name == "hist_gradient_boosting":
+        return HistGradientBoostingRegressor(random_state= 42, **params)
+
+    raise ValueError(f"Unknown model '{model_name}'. Expected one of: {', '.join(PARAMETER_GRIDS)}")
+
+def _data_fingerprint(X: np.ndarray, y: np.ndarray, features: list, param_grid: dict) -> str:
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    digest.update(json.dumps({"features": features, "grid": param_grid}, sort_keys= True, default= str).encode("utf-8"))
+    return digest.hexdigest()
+
+def best_params_path(model_name: str, target: str, params_dir: str = MODEL_SELECTION_DIR, dataset: str = "default") -> str:
+    """Returns the JSON file holding the best parameters of `model_name` for `target` and the `dataset` tag."""
+    return os.path.join(params_dir, f"{model_name}_{target}_{dataset}.json")
+
+def load_best_params(model_name: str, target: str, params_dir: str = MODEL_SELECTION_DIR, fingerprint: str|None = None, dataset: str = "default") -> dict|None:
+    """
+    Returns the persisted best parameters of `model_name` for the `dataset` tag, or None when
+    missing or (with `fingerprint`) found for different data, features or grid.
+    """
+    path = best_params_path(model_name, target, params_dir, dataset)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r", encoding= "utf-8") as file:
+        record = json.load(file)
+
+    if fingerprint is not None and record["fingerprint"] != fingerprint:
+        return None
+
+    return record["params"]
+
+def _save_best_params(model_name: str, target: str, params_dir: str, record: dict) -> None:
+    os.makedirs(params_dir, exist_ok= True)
+    path = best_params_path(model_name, target, params_dir, record["dataset"])
+
+    if os.path.exists(path):
+        with open(path, "r", encoding= "utf-8") as file:
+            previous_fingerprint = json.load(file).get("fingerprint")
+        if previous_fingerprint != record["fingerprint"]:
+            warnings.warn(
+                f"Overwriting the best parameters in {path} that were searched on different data, features or grid; "
+                f"pass a distinct `dataset` tag to keep both.",
+                stacklevel= 3
+            )
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding= "utf-8") as file:
+        json.dump(record, file, indent= 2, default= str)
+    os.replace(tmp_path, path)
+
+def memmap_features(X: np.ndarray, folder: str) -> np.ndarray:
+    """
+    Dumps `X` to `folder` and returns it as a read-only memory map: loky workers map
+    the same pages instead of each receiving a pickled copy.
+    """
+    path = os.path.join(folder, "features.joblib")
+    joblib.dump(X, path)
+    return joblib.load(path, mmap_mode= "r")
+
+def halving_search(
+        train_dataframe: pd.DataFrame,
+        features: list,
+        target_column: str,
+        model_name: str,
+        param_grid: dict|None = None,
+        cv: int = 3,
+        factor: int = 3,
+        min_resources: int|str = "exhaust",
+        n_jobs: int = -1,
+        params_dir: str = MODEL_SELECTION_DIR,
+        dataset: str = "default",
+        reuse: bool = True,
+        refit: bool = True,
+        verbose: int = 0
+) -> tuple:
+    """
+    Tunes one model with successive halving (`HalvingGridSearchCV`) and persists the best parameters.
+
+    All candidates are first scored on a small subsample of the training rows; only
+    the best 1/`factor` of them advance to the next round with `factor` times more
+    rows, so most of the grid never sees the full data. The feature matrix is dumped
+    once to a memory-mapped file shared by the worker processes, estimators run
+    single-threaded inside the search and worker BLAS/OpenMP pools are limited to
+    one thread, so `n_jobs` processes never oversubscribe the CPU.
+
+    The best parameters are saved as JSON under the `dataset` tag (e.g. "eval_2025"
+    for the evaluation split, "final_2030" for the full model set) together with a
+    fingerprint of the data, features and grid; with `reuse=True` a later call on the
+    same inputs skips the search and only refits. Overwriting a tag's parameters
+    found on different inputs raises a warning.
+
+    Args:
+        train_dataframe (pd.DataFrame): Training rows (e.g. from `prepare_train_and_test_data`).
+        features (list): Feature columns.
+        target_column (str): Target column.
+        model_name (str): Key of `PARAMETER_GRIDS`.
+        param_grid (dict|None): Grid to search, `PARAMETER_GRIDS[model_name]` by default.
+        cv (int): Cross-validation folds.
+        factor (int): Halving factor (share of candidates kept and resource growth per round).
+        min_resources (int|str): Rows used in the first round ("exhaust" or "smallest", see scikit-learn).
+        n_jobs (int): Worker processes of the search.
+        params_dir (str): Directory of the persisted best parameters.
+        dataset (str): Tag of the training set, part of the file name and of the record.
+        reuse (bool): Skips the search when parameters for the same inputs were persisted.
+        refit (bool): Fits the best model on the whole training set (with all threads).
+        verbose (int): Verbosity of the search.
+
+    Returns:
+        tuple: (fitted best estimator or None, best params, cv_results DataFrame or None
+            when the search was skipped).
+    """
+    param_grid = param_grid or PARAMETER_GRIDS[model_name]
+
+    X = train_dataframe[features].to_numpy(dtype= np.float64)
+    y = train_dataframe[target_column].to_numpy(dtype= np.float64)
+    fingerprint = _data_fingerprint(X, y, features, param_grid)
+
+    best_params = load_best_params(model_name, target_column, params_dir, fingerprint, dataset) if reuse else None
+    cv_results = None
+
+    if best_params is None:
+        start = time.perf_counter()
+
+        with tempfile.TemporaryDirectory() as folder:
+            X_shared = memmap_features(X, folder)
+
+            search = HalvingGridSearchCV(
+                estimator= make_estimator(model_name),
+                param_grid= param_grid,
+                factor= factor,
+                min_resources= min_resources,
+                scoring= "neg_mean_absolute_error",
+                cv= cv,
+                refit= False,
+                random_state= 42,
+                n_jobs= n_jobs,
+                verbose= verbose
+            )
+
+            with parallel_config(backend= "loky", inner_max_num_threads= 1), threadpool_limits(limits= 1):
+                search.fit(X_shared, y)
+
+        best_params = search.best_params_
+        cv_results = pd.DataFrame(search.cv_results_)
+
+        _save_best_params(model_name, target_column, params_dir, {
+            "model": model_name,
+            "target": target_column,
+            "dataset": dataset,
+            "features": features,
+            "params": best_params,
+            "mae": -search.best_score_,
+            "candidates": int(sum(search.n_candidates_)),
+            "search_seconds": round(time.perf_counter() - start, 3),
+            "fingerprint": fingerprint,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+    best_model = make_estimator(model_name, best_params, n_jobs= -1).fit(X, y) if refit else None
+
+    return best_model, best_params, cv_results
+
+def compare_models(
+        train_dataframe: pd.DataFrame,
+        features: list,
+        target_column: str,
+        model_names: tuple = tuple(PARAMETER_GRIDS),
+        **kwargs
+) -> pd.DataFrame:
+    """
+    Runs `halving_search` for every model and returns their persisted results side by side.
+
+    Args:
+        train_dataframe (pd.DataFrame): Training rows.
+        features (list): Feature columns.
+        target_column (str): Target column.
+        model_names (tuple): Keys of `PARAMETER_GRIDS` to compare.
+        **kwargs: Passed through to `halving_search` (cv, factor, n_jobs, reuse, ...).
+
+    Returns:
+        pd.DataFrame: model, cross-validated MAE, params, evaluated candidates and
+            search time (seconds), sorted by MAE.
+    """
+    params_dir = kwargs.get("params_dir", MODEL_SELECTION_DIR)
+    dataset = kwargs.get("dataset", "default")
+    report = []
+
+    for model_name in model_names:
+        halving_search(train_dataframe, features, target_column, model_name, refit= False, **kwargs)
+
+        with open(best_params_path(model_name, target_column, params_dir, dataset), "r", encoding= "utf-8") as file:
+            record = json.load(file)
+
+        report.append({
+            "model": model_name,
+            "mae": record["mae"],
+            "params": record["params"],
+            "candidates": record["candidates"],
+            "search_seconds": record["search_seconds"],
+        })
+
+    return pd.DataFrame(report).sort_values("mae").reset_index(drop= True)
@@ -1,5 +1,16 @@
+import itertools
+import os
+import tempfile
+import time
+import warnings
+from functools import lru_cache
 import pandas as pd
 import numpy as np
+import joblib
+from joblib import Parallel, delayed, parallel_config
+from sklearn.base import clone
+
+MODELS_DIR: str = os.path.join("..", "Data", "Models")
 
 # Methods: 
 
@@ -27,4 +38,289 @@ def prepare_train_and_test_data(model_set_dataframe: pd.DataFrame, target_column
     train_dataframe = model_set_dataframe[model_set_dataframe["year"] != year].copy()
     train_dataframe = train_dataframe.dropna(subset=[target_column])
 
-    return train_dataframe, test_dataframe
\ No newline at end of file
+    return train_dataframe, test_dataframe
+
+def year_split_indices(model_set_dataframe: pd.DataFrame, target_column: str, test_years: list, rolling_origin: bool = True) -> list[tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Builds year-based train/test splits as positional index arrays (no frame copies).
+
+    With `rolling_origin=True` every fold trains on the years before its test year
+    only (the forecasting setting); with False it trains on all other years, like
+    `prepare_train_and_test_data`. Rows with a missing target are left out of both sides.
+
+    Returns:
+        list[tuple[int, np.ndarray, np.ndarray]]: (test year, train positions, test positions) per fold.
+    """
+    years = model_set_dataframe["year"].to_numpy()
+    has_target = model_set_dataframe[target_column].notna().to_numpy()
+
+    splits = []
+    for year in test_years:
+        train_mask = (years < year) if rolling_origin else (years != year)
+        splits.append((year, np.flatnonzero(train_mask & has_target), np.flatnonzero((years == year) & has_target)))
+
+    return splits
+
+def _allows_nan(estimator) -> bool:
+    # scikit-learn >= 1.6 exposes tags through `get_tags`, older versions through `_get_tags`.
+    try:
+        from sklearn.utils import get_tags
+        return bool(get_tags(estimator).input_tags.allow_nan)
+    except ImportError:
+        return bool(estimator._get_tags().get("allow_nan", False))
+
+def _fit_fold(estimator, X: np.ndarray, y: np.ndarray, train_index: np.ndarray, test_index: np.ndarray, columns: np.ndarray) -> tuple[np.ndarray, float, float]:
+    start = time.perf_counter()
+    model = clone(estimator).fit(X[np.ix_(train_index, columns)], y[train_index])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = model.predict(X[np.ix_(test_index, columns)])
+
+    return predictions, fit_seconds, time.perf_counter() - start
+
+def backtest_model(
+        model_set_dataframe: pd.DataFrame,
+        features: list,
+        target_column: str,
+        model= "hist_gradient_boosting",
+        params: dict|None = None,
+        test_years: list|None = None,
+        rolling_origin: bool = True,
+        n_jobs: int = -1
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Evaluates one model on every election year in a single call (rolling-origin backtest).
+
+    The features and target are converted to one array, memory-mapped for the
+    worker processes, and each fold only carries its index arrays. Folds are fitted
+    in parallel with single-threaded estimators.
+
+    Args:
+        model_set_dataframe (pd.DataFrame): The model set ("terc_code", "county", "year", features, target).
+        features (list): Feature columns.
+        target_column (str): Target column.
+        model: A key of `model_selection_methods.PARAMETER_GRIDS` or an unfitted scikit-learn estimator.
+        params (dict|None): Parameters of a named model (e.g. persisted by `halving_search`).
+        test_years (list|None): Years to hold out, by default every year with a known target.
+            A feature missing in all training rows of a fold carries no information; estimators
+            that accept NaN are fitted on that fold without it, others skip the year. Years
+            without training or test rows are skipped too; both cases raise a warning.
+        rolling_origin (bool): Trains on past years only (see `year_split_indices`).
+        n_jobs (int): Worker processes.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]:
+            - year_report: year, n_train, n_test, n_features, mae, rmse, fit_seconds, predict_seconds,
+            - county_report: terc_code, county, year, n_test, mae, rmse (over the rounds of the year).
+    """
+    from src.model_selection_methods import make_estimator, memmap_features
+
+    estimator = make_estimator(model, params) if isinstance(model, str) else model
+
+    if test_years is None:
+        test_years = np.sort(model_set_dataframe.loc[model_set_dataframe[target_column].notna(), "year"].unique()).tolist()
+
+    X = model_set_dataframe[features].to_numpy(dtype= np.float64)
+    y = model_set_dataframe[target_column].to_numpy(dtype= np.float64)
+
+    # A feature can be missing in all training rows (the delta features of 2000 when 2005 is
+    # tested with a rolling origin): dropped for estimators that accept NaN, fold skipped otherwise.
+    allow_nan = _allows_nan(estimator)
+    splits = []
+    skipped = {}
+    reduced = {}
+
+    for year, train_index, test_index in year_split_indices(model_set_dataframe, target_column, test_years, rolling_origin):
+        if not len(train_index) or not len(test_index):
+            skipped[year] = "no training or test rows"
+            continue
+
+        missing = np.isnan(X[train_index]).all(axis= 0)
+        if missing.all() or (missing.any() and not allow_nan):
+            skipped[year] = "missing in all training rows: " + ", ".join(np.asarray(features)[missing])
+            continue
+
+        if missing.any():
+            reduced[year] = ", ".join(np.asarray(features)[missing])
+        splits.append((year, train_index, test_index, np.flatnonzero(~missing)))
+
+    if skipped:
+        warnings.warn("backtest_model skipped years: " + "; ".join(f"{year} ({reason})" for year, reason in skipped.items()), stacklevel= 2)
+    if reduced:
+        warnings.warn("backtest_model fitted without features missing in all training rows: " + "; ".join(f"{year} ({names})" for year, names in reduced.items()), stacklevel= 2)
+    if not splits:
+        raise ValueError(f"None of the test years {list(test_years)} can be backtested.")
+
+    with tempfile.TemporaryDirectory() as folder:
+        X_shared = memmap_features(X, folder)
+
+        with parallel_config(backend= "loky", inner_max_num_threads= 1):
+            results = Parallel(n_jobs= n_jobs)(
+                delayed(_fit_fold)(estimator, X_shared, y, train_index, test_index, columns)
+                for _, train_index, test_index, columns in splits
+            )
+
+    year_report = []
+    fold_errors = []
+
+    for (year, train_index, test_index, columns), (predictions, fit_seconds, predict_seconds) in zip(splits, results):
+        errors = predictions - y[test_index]
+        year_report.append({
+            "year": year,
+            "n_train": len(train_index),
+            "n_test": len(test_index),
+            "n_features": len(columns),
+            "mae": np.abs(errors).mean(),
+            "rmse": np.sqrt((errors ** 2).mean()),
+            "fit_seconds": fit_seconds,
+            "predict_seconds": predict_seconds,
+        })
+        fold_errors.append(pd.DataFrame({"position": test_index, "year": year, "error": errors}))
+
+    errors_df = pd.concat(fold_errors, ignore_index= True)
+    errors_df["terc_code"] = model_set_dataframe["terc_code"].to_numpy()[errors_df["position"]]
+    errors_df["county"] = model_set_dataframe["county"].to_numpy()[errors_df["position"]]
+    errors_df["absolute_error"] = errors_df["error"].abs()
+    errors_df["squared_error"] = errors_df["error"] ** 2
+
+    county_report = (
+        errors_df
+        .groupby(["terc_code", "county", "year"], as_index= False, sort= True)
+        .agg(n_test= ("error", "size"), mae= ("absolute_error", "mean"), mse= ("squared_error", "mean"))
+    )
+    county_report["rmse"] = np.sqrt(county_report.pop("mse"))
+
+    return pd.DataFrame(year_report), county_report
+
+def save_model(model, features: list, path: str, target_column: str = "turnout_percentage", metadata: dict|None = None) -> None:
+    """
+    Serialises a fitted model together with its feature list (in training order) for `predict`.
+
+    Args:
+        model: Fitted regressor with a `predict` method.
+        features (list): Feature columns the model was fitted on.
+        path (str): Output ".joblib" file (directories are created).
+        target_column (str): Name of the predicted column.
+        metadata (dict|None): Extra information stored with the model (params, training years, ...).
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok= True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump({
+        "model": model,
+        "features": list(features),
+        "target": target_column,
+        "metadata": metadata or {},
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }, tmp_path)
+    os.replace(tmp_path, path)
+
+@lru_cache(maxsize= 8)
+def _load_model_record(path: str, mtime_ns: int) -> dict:
+    return joblib.load(path)
+
+def load_model(path: str) -> dict:
+    """
+    Loads a record written by `save_model` ("model", "features", "target", "metadata", "created_at").
+    The last few loaded records are kept in memory until their file changes, so repeated
+    scoring does not unpickle them again.
+    """
+    return _load_model_record(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+def scenario_grid(**feature_values: list) -> pd.DataFrame:
+    """
+    Returns every combination of the given feature adjustments, one scenario per row.
+
+    Example:
+        scenario_grid(gdp_per_capita_delta_5_years= [0.9, 1.0, 1.1], average_gross_salary= [0.95, 1.0, 1.05])
+        -> 9 scenarios indexed 0..8 (index named "scenario").
+    """
+    scenarios_df = pd.DataFrame(list(itertools.product(*feature_values.values())), columns= list(feature_values))
+    scenarios_df.index.name = "scenario"
+    return scenarios_df
+
+def predict_array(model, X: np.ndarray, features: list) -> np.ndarray:
+    """
+    Calls `model.predict` on a plain (row, feature) array. Models fitted on DataFrames
+    check the column names, so the array is wrapped (without copying) for them.
+    """
+    if hasattr(model, "feature_names_in_"):
+        X = pd.DataFrame(X, columns= features, copy= False)
+    return model.predict(X)
+
+def predict(
+        model_path: str,
+        feature_rows: pd.DataFrame,
+        scenarios: pd.DataFrame|None = None,
+        mode: str = "multiply",
+        output_path: str|None = None,
+        id_columns: list = ["terc_code", "county", "year", "round"],
+        decimals: int|None = 2
+) -> pd.DataFrame:
+    """
+    Scores county feature rows (and what-if variants of them) with a persisted model, without retraining.
+
+    Each scenario is one row of `scenarios` whose columns are features and whose values
+    multiply (`mode="multiply"`) or are added to (`mode="add"`) those features of every
+    county row; features without a column are left as they are. All variants are built
+    by broadcasting into one (scenario x row, feature) array and scored in a single
+    `predict` call.
+
+    Args:
+        model_path (str): File written by `save_model`.
+        feature_rows (pd.DataFrame): Rows with the model features (e.g. the 2030 rows of "model_set_2030.parquet").
+        scenarios (pd.DataFrame|None): Feature adjustments per scenario (see `scenario_grid`),
+            None to score the rows as they are.
+        mode (str): "multiply" or "add".
+        output_path (str|None): Parquet file the predictions are written to.
+        id_columns (list): Columns of `feature_rows` copied to the output when present.
+        decimals (int|None): Rounding of the predictions (2 as in notebook 03), None to keep them.
+
+    Returns:
+        pd.DataFrame: "scenario" (when `scenarios` is given), the id columns and the target
+            column, scenario-major in the order of `feature_rows`.
+    """
+    if mode not in ("multiply", "add"):
+        raise ValueError(f"Unknown mode '{mode}'. Expected 'multiply' or 'add'.")
+
+    record = load_model(model_path)
+    features, target_column = record["features"], record["target"]
+
+    missing = [feature for feature in features if feature not in feature_rows.columns]
+    if missing:
+        raise KeyError(f"Feature rows are missing the model features: {missing}")
+
+    X = feature_rows[features].to_numpy(dtype= np.float64)
+
+    if scenarios is None:
+        X_all = X
+    else:
+        unknown = [col for col in scenarios.columns if col not in features]
+        if unknown:
+            raise KeyError(f"Scenario columns are not model features: {unknown}")
+
+        neutral = 1.0 if mode == "multiply" else 0.0
+        adjustments = np.full((len(scenarios), 1, len(features)), neutral)
+        positions = [features.index(col) for col in scenarios.columns]
+        adjustments[:, 0, positions] = scenarios.to_numpy(dtype= np.float64)
+
+        X_all = (X[None] * adjustments if mode == "multiply" else X[None] + adjustments).reshape(-1, len(features))
+
+    predictions = predict_array(record["model"], X_all, features)
+    if decimals is not None:
+        predictions = np.round(predictions, decimals)
+
+    n_scenarios = 1 if scenarios is None else len(scenarios)
+    result_df = pd.DataFrame({
+        col: np.tile(feature_rows[col].to_numpy(), n_scenarios)
+        for col in id_columns if col in feature_rows.columns
+    })
+    if scenarios is not None:
+        result_df.insert(0, "scenario", np.repeat(scenarios.index.to_numpy(), len(feature_rows)))
+    result_df[target_column] = predictions
+
+    if output_path is not None:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok= True)
+        result_df.to_parquet(output_path, index= False)
+
+    return result_df
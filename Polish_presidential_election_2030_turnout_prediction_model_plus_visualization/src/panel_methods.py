@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+import pandas as pd
+import numpy as np
+
+
+@dataclass
+class IndicatorPanel:
+    """
+    Dense county x year panel of indicators.
+
+    Values are stored in one float array of shape (indicator, county, year) with
+    integer positions for counties and years, so a lookup is plain array indexing
+    and whole-indicator operations (extrapolation, lags, deltas) are NumPy slices
+    instead of filtered, copied and merged DataFrames. Years are contiguous and
+    ascending; `present` marks the (county, year) cells that exist as rows in the
+    long format, so round trips keep the original rows.
+
+    Accepted by `extrapolate_1999_data`, `prepare_lagged_features`,
+    `forecast_arima_to_2030` and `forecast_indicators_parallel` (feature engineering)
+    and by the batch extrapolations of `data_cleaning_methods`, with counties
+    keyed by TERC code. The per-county cleaning functions
+    (`extrapolate_backwards_one_county`, `extrapolate_missing_2000_2001`,
+    `backcasting_arima`) stay DataFrame-only: they key counties by name, which is
+    not unique before TERC codes are assigned, and the batch versions replace them.
+
+    Attributes:
+        values (np.ndarray): Float array of shape (indicator, county, year), NaN for missing.
+        indicators (list[str]): Indicator names (first axis).
+        terc_codes (np.ndarray): TERC codes of the counties (second axis).
+        county_names (np.ndarray): County names aligned with `terc_codes`.
+        years (np.ndarray): Contiguous ascending years (third axis).
+        present (np.ndarray): Bool array of shape (county, year) of existing rows.
+    """
+    values: np.ndarray
+    indicators: list[str]
+    terc_codes: np.ndarray
+    county_names: np.ndarray
+    years: np.ndarray
+    present: np.ndarray
+    _indicator_index: dict = field(init= False, repr= False)
+    _county_index: dict = field(init= False, repr= False)
+
+    def __post_init__(self) -> None:
+        self._indicator_index = {name: i for i, name in enumerate(self.indicators)}
+        self._county_index = {code: i for i, code in enumerate(self.terc_codes)}
+
+    @classmethod
+    def from_long(cls, dataframe: pd.DataFrame, indicators_list: list) -> "IndicatorPanel":
+        """
+        Builds a panel from a long DataFrame with "terc_code", "county", "year" and indicator columns.
+
+        Raises:
+            ValueError: If a (terc_code, year) pair appears more than once.
+        """
+        duplicated = dataframe.duplicated(["terc_code", "year"], keep= False)
+        if duplicated.any():
+            duplicate_keys = dataframe.loc[duplicated, ["terc_code", "year"]].drop_duplicates()
+            raise ValueError(
+                f"{len(duplicate_keys)} duplicated (terc_code, year) pairs, e.g. "
+                f"{list(duplicate_keys.head(10).itertuples(index= False, name= None))}."
+            )
+
+        terc_codes, county_positions = np.unique(dataframe["terc_code"].to_numpy(), return_inverse= True)
+        first_year, last_year = int(dataframe["year"].min()), int(dataframe["year"].max())
+        years = np.arange(first_year, last_year + 1)
+        year_positions = dataframe["year"].to_numpy(dtype= int) - first_year
+
+        values = np.full((len(indicators_list), len(terc_codes), len(years)), np.nan)
+        values[:, county_positions, year_positions] = dataframe[indicators_list].to_numpy(dtype= float).T
+
+        present = np.zeros((len(terc_codes), len(years)), dtype= bool)
+        present[county_positions, year_positions] = True
+
+        county_names = np.empty(len(terc_codes), dtype= object)
+        county_names[county_positions] = dataframe["county"].to_numpy()
+
+        return cls(values, list(indicators_list), terc_codes, county_names, years, present)
+
+    def to_long(self) -> pd.DataFrame:
+        """Returns the long DataFrame ("terc_code", "county", "year", indicators), sorted by terc_code and year."""
+        county_positions, year_positions = np.nonzero(self.present)
+
+        long_df = pd.DataFrame({
+            "terc_code": self.terc_codes[county_positions],
+            "county": self.county_names[county_positions],
+            "year": self.years[year_positions],
+        })
+        long_df[self.indicators] = self.values[:, county_positions, year_positions].T
+
+        return long_df
+
+    def to_wide(self, indicator: str) -> pd.DataFrame:
+        """Returns a (terc_code x year) DataFrame view of one indicator."""
+        return pd.DataFrame(
+            self.values[self._indicator_index[indicator]],
+            index= pd.Index(self.terc_codes, name= "terc_code"),
+            columns= pd.Index(self.years, name= "year"),
+            copy= False
+        )
+
+    def indicator(self, indicator: str) -> np.ndarray:
+        """Returns the (county, year) array of one indicator (a view)."""
+        return self.values[self._indicator_index[indicator]]
+
+    def year_position(self, year: int) -> int:
+        return int(year - self.years[0])
+
+    def county_position(self, terc_code: str) -> int:
+        return self._county_index[terc_code]
+
+    def get(self, indicator: str, terc_code: str, year: int) -> float:
+        """O(1) lookup of a single value."""
+        return self.values[self._indicator_index[indicator], self._county_index[terc_code], self.year_position(year)]
+
+    def with_years(self, first_year: int, last_year: int) -> "IndicatorPanel":
+        """Returns a panel whose year axis is extended (with NaNs, rows not present) to cover the range."""
+        first_year, last_year = min(first_year, int(self.years[0])), max(last_year, int(self.years[-1]))
+        years = np.arange(first_year, last_year + 1)
+        offset = int(self.years[0]) - first_year
+
+        values = np.full((len(self.indicators), len(self.terc_codes), len(years)), np.nan)
+        values[:, :, offset:offset + len(self.years)] = self.values
+        present = np.zeros((len(self.terc_codes), len(years)), dtype= bool)
+        present[:, offset:offset + len(self.years)] = self.present
+
+        return IndicatorPanel(values, self.indicators, self.terc_codes, self.county_names, years, present)
+
+    def with_indicators(self, new_values: dict[str, np.ndarray]) -> "IndicatorPanel":
+        """Returns a panel with extra (county, year) indicator arrays appended."""
+        if not new_values:
+            return self
+        values = np.concatenate([self.values, np.stack(list(new_values.values()))], axis= 0)
+        return IndicatorPanel(values, self.indicators + list(new_values), self.terc_codes, self.county_names, self.years, self.present)
+
+    def shift_years(self, years: int) -> "IndicatorPanel":
+        """Returns the same data relabelled `years` later (the lag used for election features)."""
+        return IndicatorPanel(self.values, self.indicators, self.terc_codes, self.county_names, self.years + years, self.present)
@@ -0,0 +1,610 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.arima_cache_methods import ArimaCache
+from src.data_cleaning_methods import merge_df_by_voivodeship
+from src.terc_methods import get_terc_resolver
+from src.feature_engineering_methods import extrapolate_1999_data, prepare_lagged_features, merge_election_data, forecast_arima_to_2030
+from src.model_selection_methods import MODEL_SELECTION_DIR, best_params_path
+from src.election_data_methods import ELECTION_FILE_PATTERN, ingest_election_files, aggregate_county_turnout
+
+PIPELINE_CACHE_DIR: str = os.path.join("..", "Data", "Cache", "pipeline")
+PIPELINE_EXPORT_DIR: str = os.path.join("..", "Data", "Pipeline_outputs")
+PROCESSED_DATA_DIR: str = os.path.join("..", "Data", "Proccesed_data")
+
+INDICATOR_FILES: dict = {
+    "population_density": "population_density.csv",
+    "population_70_plus": "population_70_plus.csv",
+    "total_population": "total_population.csv",
+    "urbanization_rate": "urbanization_rate.csv",
+    "demographic_dependency_ratio": "demographic_dependency_ratio.csv",
+    "average_gross_salary": "average_gross_salary.csv",
+    "unemployment": "unemployment.csv",
+    "gdp_per_capita": "GDP_per_capita.csv",
+}
+
+FORECAST_INDICATORS: list = ["gdp_per_capita", "average_gross_salary", "demographic_dependency_ratio", "population_70_plus"]
+
+MODEL_FEATURES: list = [
+    "gdp_per_capita_delta_5_years", "average_gross_salary",
+    "demographic_dependency_ratio", "demographic_dependency_ratio_delta_5_years",
+    "population_70_plus_delta_1_year"
+]
+
+PIPELINE_OUTPUTS: dict = {
+    "indicators": "indicators.parquet",
+    "model_set": "model_set.parquet",
+    "model_set_2030": "model_set_2030.parquet",
+    "final_predictions": "final_predictions_to_visualize.parquet",
+}
+
+# Methods:
+
+@dataclass
+class Stage:
+    """
+    One node of a `Pipeline`.
+
+    Attributes:
+        name (str): Unique stage name, also the name of its cached Parquet output.
+        function (Callable): Called as `function(*inputs, **params, **context)`, must return a DataFrame.
+        inputs (tuple): Names of upstream stages (passed as DataFrames) or file paths (passed as str).
+        params (dict): JSON-serialisable keyword arguments, part of the fingerprint.
+        context (dict): Keyword arguments that do not change the result (caches, n_jobs), not fingerprinted.
+    """
+    name: str
+    function: Callable
+    inputs: tuple = ()
+    params: dict = field(default_factory= dict)
+    context: dict = field(default_factory= dict)
+
+
+class Pipeline:
+    """
+    Small DAG runner with fingerprinted, Parquet-cached stage outputs.
+
+    The fingerprint of a stage is a hash of its function source, its `params` and
+    the content of its inputs: file inputs are hashed byte-wise, stage inputs
+    contribute the hash of the upstream output data (not of the upstream
+    fingerprint). A stage is rerun only when its fingerprint differs from the one
+    stored next to its cached output, and an upstream stage that reruns but
+    produces identical data does not invalidate anything downstream. This is what
+    keeps a change in one indicator file from re-forecasting every indicator: the
+    per-indicator forecast stages only see their own column.
+
+    Only the source of the stage function itself is fingerprinted; after editing a
+    helper it calls, rerun the affected stages with `force`.
+
+    Args:
+        cache_dir (str): Directory of cached outputs and manifests (created if missing).
+    """
+
+    def __init__(self, cache_dir: str = PIPELINE_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        self.stages: dict[str, Stage] = {}
+        self._file_hashes: dict = {}
+        os.makedirs(cache_dir, exist_ok= True)
+
+    def add(self, name: str, function: Callable, inputs: tuple = (), params: dict|None = None, context: dict|None = None) -> "Pipeline":
+        """
+        Registers a stage. Upstream stages must be added first, so insertion order is a topological order.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined.")
+
+        self.stages[name] = Stage(name, function, tuple(inputs), params or {}, context or {})
+
+        return self
+
+    @staticmethod
+    def _hash(*parts: bytes) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part)
+        return digest.hexdigest()
+
+    def _hash_file(self, path: str) -> str:
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        if key not in self._file_hashes:
+            with open(path, "rb") as file:
+                self._file_hashes[key] = self._hash(file.read())
+        return self._file_hashes[key]
+
+    @classmethod
+    def _hash_frame(cls, dataframe: pd.DataFrame) -> str:
+        schema = json.dumps([[str(col), str(dtype)] for col, dtype in dataframe.dtypes.items()]).encode("utf-8")
+        rows = pd.util.hash_pandas_object(dataframe, index= True).to_numpy().tobytes()
+        return cls._hash(schema, rows)
+
+    @classmethod
+    def _hash_function(cls, function: Callable) -> str:
+        try:
+            source = inspect.getsource(function)
+        except (OSError, TypeError):
+            source = f"{function.__module__}.{function.__qualname__}"
+        return cls._hash(source.encode("utf-8"))
+
+    def _fingerprint(self, stage: Stage, input_hashes: list[str]) -> str:
+        description = {
+            "function": self._hash_function(stage.function),
+            "params": stage.params,
+            "inputs": input_hashes,
+        }
+        return self._hash(json.dumps(description, sort_keys= True, default= str).encode("utf-8"))
+
+    def _output_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.parquet")
+
+    def _manifest_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _read_manifest(self, name: str) -> dict|None:
+        path = self._manifest_path(name)
+        if not os.path.exists(path) or not os.path.exists(self._output_path(name)):
+            return None
+        with open(path, "r", encoding= "utf-8") as file:
+            return json.load(file)
+
+    def _write_output(self, name: str, dataframe: pd.DataFrame, manifest: dict) -> None:
+        # Output first, manifest last: a crash in between leaves a stale manifest, never a wrong hit.
+        output_path, manifest_path = self._output_path(name), self._manifest_path(name)
+
+        dataframe.to_parquet(f"{output_path}.{os.getpid()}.tmp")
+        os.replace(f"{output_path}.{os.getpid()}.tmp", output_path)
+
+        with open(f"{manifest_path}.{os.getpid()}.tmp", "w", encoding= "utf-8") as file:
+            json.dump(manifest, file)
+        os.replace(f"{manifest_path}.{os.getpid()}.tmp", manifest_path)
+
+    def _required_stages(self, targets: list[str]) -> list[str]:
+        required = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage '{name}'.")
+            if name not in required:
+                required.add(name)
+                pending.extend(i for i in self.stages[name].inputs if i in self.stages)
+        return [name for name in self.stages if name in required]
+
+    def _input_hash(self, source: str, output_hashes: dict) -> str:
+        if source in self.stages:
+            return output_hashes[source]
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Pipeline input file not found: {source}")
+        return self._hash_file(source)
+
+    def status(self, targets: list[str]|None = None) -> pd.DataFrame:
+        """
+        Returns which stages are up to date without running anything.
+
+        A stage whose upstream is stale is reported as stale, since its inputs are
+        not known until the upstream has been rerun.
+
+        Returns:
+            pd.DataFrame: stage, up_to_date, rows, seconds (of the cached run) and created_at.
+        """
+        output_hashes = {}
+        report = []
+
+        for name in self._required_stages(targets or list(self.stages)):
+            stage = self.stages[name]
+            manifest = self._read_manifest(name)
+            upstream_known = all(i in output_hashes for i in stage.inputs if i in self.stages)
+
+            up_to_date = (
+                manifest is not None and upstream_known
+                and manifest["fingerprint"] == self._fingerprint(stage, [self._input_hash(i, output_hashes) for i in stage.inputs])
+            )
+            if up_to_date:
+                output_hashes[name] = manifest["output_hash"]
+
+            report.append({
+                "stage": name,
+                "up_to_date": up_to_date,
+                "rows": manifest["rows"] if manifest else None,
+                "seconds": manifest["seconds"] if manifest else None,
+                "created_at": manifest["created_at"] if manifest else None,
+            })
+
+        return pd.DataFrame(report)
+
+    def run(self, targets: list[str]|None = None, force: tuple = (), verbose: bool = True) -> dict[str, pd.DataFrame]:
+        """
+        Brings `targets` (default: all stages) up to date and returns their outputs.
+
+        Stages are visited in topological order; cached outputs are only read from
+        disk when a stale downstream stage or the caller needs them.
+
+        Args:
+            targets (list[str]|None): Stages whose outputs are requested.
+            force (tuple): Stage names to rerun regardless of their fingerprint.
+            verbose (bool): Prints one line per stage (cached / ran, seconds).
+
+        Returns:
+            dict[str, pd.DataFrame]: Output of every target stage.
+        """
+        targets = targets or list(self.stages)
+        output_hashes = {}
+        loaded = {}
+
+        def load(name: str) -> pd.DataFrame:
+            if name not in loaded:
+                loaded[name] = pd.read_parquet(self._output_path(name))
+            return loaded[name]
+
+        for name in self._required_stages(targets):
+            stage = self.stages[name]
+            fingerprint = self._fingerprint(stage, [self._input_hash(i, output_hashes) for i in stage.inputs])
+            manifest = self._read_manifest(name)
+
+            if manifest is not None and manifest["fingerprint"] == fingerprint and name not in force:
+                output_hashes[name] = manifest["output_hash"]
+                if verbose:
+                    print(f"[cached] {name}")
+                continue
+
+            arguments = [load(i) if i in self.stages else i for i in stage.inputs]
+            start = time.perf_counter()
+            result = stage.function(*arguments, **stage.params, **stage.context)
+            seconds = time.perf_counter() - start
+
+            if not isinstance(result, pd.DataFrame):
+                raise TypeError(f"Stage '{name}' returned {type(result).__name__}, expected a DataFrame.")
+
+            output_hashes[name] = self._hash_frame(result)
+            loaded[name] = result
+            self._write_output(name, result, {
+                "fingerprint": fingerprint,
+                "output_hash": output_hashes[name],
+                "rows": len(result),
+                "seconds": round(seconds, 3),
+                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            })
+            if verbose:
+                print(f"[ran]    {name} ({seconds:.2f} s)")
+
+        return {name: load(name) for name in targets}
+
+    def export(self, outputs: dict[str, str], output_dir: str) -> None:
+        """
+        Runs the stages in `outputs` and writes each one to `output_dir` under the mapped file name.
+
+        Exporting into a directory holding one of the pipeline's input files (such as
+        the curated `PROCESSED_DATA_DIR`) is refused, so the notebooks' files are never
+        overwritten by pipeline outputs.
+        """
+        input_dirs = {
+            os.path.realpath(os.path.dirname(source))
+            for stage in self.stages.values() for source in stage.inputs if source not in self.stages
+        }
+        if os.path.realpath(output_dir) in input_dirs:
+            raise ValueError(f"Refusing to export into {output_dir}: it holds pipeline inputs. Use a separate directory (e.g. PIPELINE_EXPORT_DIR).")
+
+        os.makedirs(output_dir, exist_ok= True)
+        for name, dataframe in self.run(list(outputs)).items():
+            dataframe.to_parquet(os.path.join(output_dir, outputs[name]))
+
+
+def load_gus_indicator(path: str, value_column: str) -> pd.DataFrame:
+    """
+    Reads one indicator CSV exported from the GUS Local Data Bank.
+
+    The files are ";"-separated with a decimal comma and 7-digit unit codes
+    ("0201000" is powiat 0201, "0200000" is voivodeship 02). County-level rows are
+    returned when the file has them, otherwise voivodeship-level rows with 2-digit
+    TERC codes (to be broadcast with `merge_df_by_voivodeship`).
+
+    Returns:
+        pd.DataFrame: "terc_code", "county", "year" and `value_column`.
+    """
+    raw_df = pd.read_csv(path, sep= ";", decimal= ",", dtype= {"Kod": str})
+
+    is_voivodeship = raw_df["Kod"].str[2:4] == "00"
+    is_county = ~is_voivodeship
+
+    if is_county.any():
+        selected = raw_df[is_county]
+        terc_codes = selected["Kod"].str[:4]
+    else:
+        selected = raw_df[is_voivodeship & (raw_df["Kod"].str[:2] != "00")]
+        terc_codes = selected["Kod"].str[:2]
+
+    county_names = (
+        selected["Nazwa"]
+        .str.replace(r"^Powiat\s+", "", regex= True)
+        .str.replace(r"^m\.\s+(st\.\s+)?", "", regex= True)
+        .str.replace(r"\s+(do|od)\s+\d{4}$", "", regex= True)
+    )
+
+    return pd.DataFrame({
+        "terc_code": terc_codes.to_numpy(),
+        "county": county_names.to_numpy(),
+        "year": selected["Rok"].astype("int64").to_numpy(),
+        value_column: pd.to_numeric(selected["Wartosc"], errors= "coerce").to_numpy(dtype= float),
+    }).sort_values(["terc_code", "year"]).reset_index(drop= True)
+
+def assign_terc_codes(indicator_df: pd.DataFrame, territory_path: str) -> pd.DataFrame:
+    """
+    Replaces GUS unit codes of county-level rows with current TERC codes (the shared
+    `get_terc_resolver` of `territory_path`), drops unmatched rows and keeps one row per (terc_code, year).
+    """
+    if indicator_df["terc_code"].str.len().max() <= 2:
+        return indicator_df
+
+    resolver = get_terc_resolver(os.path.abspath(territory_path), None)
+    updated = resolver.resolve_frame(indicator_df).dropna(subset= ["terc_code"])
+
+    # Units split over time ("m. Wałbrzych do 2002" / "od 2013") resolve to one code.
+    return (
+        updated
+        .groupby(["terc_code", "county", "year"], as_index= False, sort= True)
+        .first()
+    )
+
+def merge_indicators(*indicator_dfs: pd.DataFrame, first_year: int = 2000) -> pd.DataFrame:
+    """
+    Joins county-level indicators on (terc_code, year) and broadcasts voivodeship-level ones with `merge_df_by_voivodeship`.
+    """
+    county_level = [df for df in indicator_dfs if df["terc_code"].str.len().max() > 2]
+    voivodeship_level = [df for df in indicator_dfs if df["terc_code"].str.len().max() <= 2]
+
+    merged_df = county_level[0].drop(columns= ["county"])
+    for df in county_level[1:]:
+        merged_df = merged_df.merge(df.drop(columns= ["county"]), on= ["terc_code", "year"], how= "outer")
+
+    county_names = pd.concat(county_level)[["terc_code", "county"]].drop_duplicates("terc_code")
+    merged_df = county_names.merge(merged_df, on= "terc_code", how= "right")
+
+    for df in voivodeship_level:
+        merged_df = merge_df_by_voivodeship(merged_df, df, df.columns[-1])
+
+    merged_df = merged_df[merged_df["year"] >= first_year]
+
+    return merged_df.sort_values(["terc_code", "year"]).reset_index(drop= True)
+
+def select_columns(dataframe: pd.DataFrame, columns: list) -> pd.DataFrame:
+    return dataframe[columns].reset_index(drop= True)
+
+def extrapolate_1999_stage(dataframe: pd.DataFrame, first_indicator: int = 3) -> pd.DataFrame:
+    """`extrapolate_1999_data` over every indicator column (all columns from `first_indicator` on)."""
+    return extrapolate_1999_data(dataframe, dataframe.columns[first_indicator:].tolist())
+
+def lagged_features_stage(dataframe: pd.DataFrame, indicators_list: list) -> pd.DataFrame:
+    return prepare_lagged_features(dataframe, indicators_list).reset_index(drop= True)
+
+def forecast_indicator_to_2030(dataframe: pd.DataFrame, indicator: str, last_year: int = 2029, n_jobs: int = -1, cache: ArimaCache|None = None) -> pd.DataFrame:
+    """
+    Forecasts one indicator for every county with `forecast_arima_to_2030` (thread pool, as in notebook 02).
+
+    Each county is forecasted from the year after its last observed value up to
+    `last_year`, so indicators published with a longer delay are not shifted.
+
+    Returns:
+        pd.DataFrame: "terc_code", "year", "county" and `indicator` for the forecasted years.
+    """
+    observed = dataframe.dropna(subset= [indicator])
+    last_observed = observed.groupby("terc_code")["year"].max()
+
+    results_nested = Parallel(n_jobs= n_jobs, prefer= "threads")(
+        delayed(forecast_arima_to_2030)(terc, group, [indicator], list(range(int(last_observed[terc]) + 1, last_year + 1)), cache)
+        for terc, group in observed.groupby("terc_code")
+        if last_observed[terc] < last_year
+    )
+
+    return pd.DataFrame(
+        [item for sublist in results_nested for item in sublist],
+        columns= ["terc_code", "year", "county", indicator]
+    )
+
+def combine_forecasts(history_df: pd.DataFrame, *forecast_dfs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fills the forecasted years into the history like notebook 02 (`combine_first` on terc_code, year, county).
+    """
+    index = ["terc_code", "year", "county"]
+    combined_df = history_df.set_index(index)
+
+    for forecast_df in forecast_dfs:
+        combined_df = combined_df.combine_first(forecast_df.set_index(index))
+
+    return combined_df.reset_index()[history_df.columns.tolist()]
+
+def add_election_rows(election_df: pd.DataFrame, year: int = 2030, rounds: list = [1, 2]) -> pd.DataFrame:
+    """
+    Appends empty (NaN turnout) rows of a future election for every county.
+    """
+    new_rows_df = pd.DataFrame({"year": year, "round": rounds, "turnout_percentage": np.nan})
+    unique_counties = election_df[["terc_code", "county"]].drop_duplicates()
+
+    election_df = pd.concat([election_df, unique_counties.merge(new_rows_df, how= "cross")], ignore_index= True)
+
+    return election_df.sort_values(by= ["terc_code", "year", "round"]).reset_index(drop= True)
+
+def merge_election_stage(election_df: pd.DataFrame, features_df: pd.DataFrame, target_years: list, columns: list|None = None) -> pd.DataFrame:
+    model_set_df = merge_election_data(election_df, features_df, target_years)
+    return model_set_df[columns].reset_index(drop= True) if columns else model_set_df.reset_index(drop= True)
+
+def predict_turnout(model_set_df: pd.DataFrame, features: list, model_params: dict, target: str = "turnout_percentage", year: int = 2030) -> pd.DataFrame:
+    """
+    Fits XGBoost with `model_params` on all years except `year` and predicts `year` (notebook 03), rounded to 2 decimals.
+
+    Returns:
+        pd.DataFrame: "terc_code", "county", "round", `target`, "year" of the predicted year.
+    """
+    from xgboost import XGBRegressor
+    from src.model_training_and_prediction_methods import prepare_train_and_test_data
+
+    train_df, test_df = prepare_train_and_test_data(model_set_df, target, year)
+
+    model = XGBRegressor(random_state= 42, **model_params)
+    model.fit(train_df[features], train_df[target])
+
+    test_df[target] = np.round(model.predict(test_df[features]), 2)
+
+    return test_df[["terc_code", "county", "round", target, "year"]]
+
+def predict_turnout_with_best_params(model_set_df: pd.DataFrame, params_path: str, features: list, target: str = "turnout_percentage", year: int = 2030) -> pd.DataFrame:
+    """
+    `predict_turnout` with the parameters of a `halving_search` record. The record must have
+    been searched for the same features and target.
+    """
+    with open(params_path, "r", encoding= "utf-8") as file:
+        record = json.load(file)
+
+    if record["features"] != features or record["target"] != target:
+        raise ValueError(
+            f"{params_path} was searched for {record['target']} on {record['features']}, "
+            f"the final model predicts {target} from {features}."
+        )
+
+    return predict_turnout(model_set_df, features, record["params"], target, year)
+
+def ingest_election_stage(territory_path: str, county_names_path: str, *election_paths: str, n_jobs: int = -1) -> pd.DataFrame:
+    """
+    County turnout table from the raw round files (`ingest_election_files` + `aggregate_county_turnout`).
+    """
+    resolver = get_terc_resolver(territory_path, county_names_path)
+    election_df = ingest_election_files(os.path.dirname(election_paths[0]), resolver, n_jobs= n_jobs)
+
+    return aggregate_county_turnout(election_df)
+
+def build_turnout_pipeline(
+        indicators_path: str|None = os.path.join(PROCESSED_DATA_DIR, "indicators.parquet"),
+        raw_dir: str = os.path.join("..", "Data", "Raw_data"),
+        election_path: str|None = os.path.join(PROCESSED_DATA_DIR, "presidential_election.parquet"),
+        cache_dir: str = PIPELINE_CACHE_DIR,
+        forecast_last_year: int = 2029,
+        model_params: dict|None = None,
+        params_dir: str = MODEL_SELECTION_DIR,
+        params_dataset: str = "final_2030",
+        n_jobs: int = -1,
+        arima_cache: ArimaCache|None = None
+) -> Pipeline:
+    """
+    Builds the indicators -> final predictions pipeline of notebooks 02 and 03.
+
+    Stages (one Parquet output each):
+        - "indicators": the curated `indicators.parquet` of the data cleaning notebook,
+        - "election": the curated `presidential_election.parquet`,
+        - "indicators_1999" -> "features" -> "model_set",
+        - "history_{indicator}" -> "forecast_{indicator}": ARIMA forecast of one indicator,
+        - "indicators_2030" -> "features_2030" -> "model_set_2030",
+        - "final_predictions".
+    With `indicators_path=None` the "indicators" stage is rebuilt from the raw GUS
+    files instead ("raw_{indicator}" / "terc_{indicator}" stages). The gap filling
+    done by hand in the data cleaning notebook is not part of that path, so its
+    indicators keep missing values and years the curated file does not have; use it
+    to check new raw data, not to produce the model inputs.
+
+    With `election_path=None` the "election" stage parses the raw round files of
+    "Raw_data/Election_data" with `ingest_election_files`. Those files end at 2020
+    and their 2000 counts do not match the curated table, so the 2025 rows and part of
+    2000 of the curated table are missing on that path.
+
+    The final model uses `model_params` when given; otherwise the record that
+    `halving_search(..., dataset= params_dataset)` persisted in `params_dir` is an
+    input file of "final_predictions", so a new search reruns that stage.
+
+    Args:
+        indicators_path (str|None): Curated indicators file, None to rebuild indicators from `raw_dir`.
+        raw_dir (str): The "Raw_data" directory (Indicators/, TERC/), used when `indicators_path` is None.
+        election_path (str|None): Cleaned presidential election data, None to ingest the raw round files.
+        cache_dir (str): Directory of the cached stage outputs.
+        forecast_last_year (int): Last year forecasted with ARIMA (features are lagged by one year).
+        model_params (dict|None): XGBRegressor parameters of the final model (default: the best
+            parameters persisted by `model_selection_methods.halving_search` in `params_dir`).
+        params_dir (str): Directory of the persisted best parameters.
+        params_dataset (str): `dataset` tag of the persisted search to use.
+        n_jobs (int): Threads used by the forecast stages.
+        arima_cache (ArimaCache|None): Optional fitted-model cache shared by the forecast stages.
+
+    Example:
+        pipeline = build_turnout_pipeline(arima_cache= ArimaCache())
+        pipeline.export(PIPELINE_OUTPUTS, PIPELINE_EXPORT_DIR)
+
+    Returns:
+        Pipeline: The configured (not yet run) pipeline.
+
+    Raises:
+        ValueError: If `model_params` is not given and no best parameters are persisted.
+    """
+    params_path = best_params_path("xgboost", "turnout_percentage", params_dir, params_dataset)
+    if model_params is None and not os.path.exists(params_path):
+        raise ValueError(f"No persisted XGBoost parameters at {params_path}; run model selection first or pass `model_params`.")
+
+    pipeline = Pipeline(cache_dir)
+
+    if indicators_path is not None:
+        pipeline.add("indicators", pd.read_parquet, inputs= (indicators_path,))
+    else:
+        reference_path = os.path.join(raw_dir, "TERC", "territory_codes.csv")
+
+        for indicator, file_name in INDICATOR_FILES.items():
+            pipeline.add(f"raw_{indicator}", load_gus_indicator, inputs= (os.path.join(raw_dir, "Indicators", file_name),), params= {"value_column": indicator})
+            pipeline.add(f"terc_{indicator}", assign_terc_codes, inputs= (f"raw_{indicator}", reference_path))
+
+        pipeline.add("indicators", merge_indicators, inputs= tuple(f"terc_{indicator}" for indicator in INDICATOR_FILES))
+
+    pipeline.add("indicators_1999", extrapolate_1999_stage, inputs= ("indicators",))
+    if election_path is not None:
+        pipeline.add("election", pd.read_parquet, inputs= (election_path,))
+    else:
+        election_dir = os.path.join(raw_dir, "Election_data")
+        election_files = sorted(
+            os.path.join(election_dir, name) for name in os.listdir(election_dir)
+            if name.endswith((".xls", ".xlsx", ".csv")) and ELECTION_FILE_PATTERN.match(os.path.splitext(name)[0])
+        )
+        pipeline.add(
+            "election", ingest_election_stage,
+            inputs= (os.path.join(raw_dir, "TERC", "territory_codes.csv"), os.path.join(raw_dir, "TERC", "county_names.xlsx"), *election_files),
+            context= {"n_jobs": n_jobs}
+        )
+
+    election_years = [2000, 2005, 2010, 2015, 2020, 2025]
+    model_columns = ["terc_code", "county", "year", "round", "turnout_percentage"] + MODEL_FEATURES
+
+    pipeline.add("features", lagged_features_stage, inputs= ("indicators_1999",), params= {"indicators_list": list(INDICATOR_FILES)})
+    pipeline.add("model_set", merge_election_stage, inputs= ("election", "features"), params= {"target_years": election_years, "columns": model_columns})
+
+    for indicator in FORECAST_INDICATORS:
+        pipeline.add(f"history_{indicator}", select_columns, inputs= ("indicators_1999",), params= {"columns": ["terc_code", "county", "year", indicator]})
+        pipeline.add(
+            f"forecast_{indicator}", forecast_indicator_to_2030,
+            inputs= (f"history_{indicator}",),
+            params= {"indicator": indicator, "last_year": forecast_last_year},
+            context= {"n_jobs": n_jobs, "cache": arima_cache}
+        )
+
+    pipeline.add("history_2030", select_columns, inputs= ("indicators_1999",), params= {"columns": ["terc_code", "county", "year"] + FORECAST_INDICATORS})
+    pipeline.add("indicators_2030", combine_forecasts, inputs= ("history_2030",) + tuple(f"forecast_{indicator}" for indicator in FORECAST_INDICATORS))
+    pipeline.add("features_2030", lagged_features_stage, inputs= ("indicators_2030",), params= {"indicators_list": FORECAST_INDICATORS})
+    pipeline.add("election_2030", add_election_rows, inputs= ("election",), params= {"year": 2030, "rounds": [1, 2]})
+    pipeline.add(
+        "model_set_2030", merge_election_stage,
+        inputs= ("election_2030", "features_2030"),
+        params= {"target_years": election_years + [2030], "columns": model_columns}
+    )
+    if model_params is not None:
+        pipeline.add(
+            "final_predictions", predict_turnout,
+            inputs= ("model_set_2030",),
+            params= {"features": ["round"] + MODEL_FEATURES, "year": 2030, "model_params": model_params}
+        )
+    else:
+        pipeline.add(
+            "final_predictions", predict_turnout_with_best_params,
+            inputs= ("model_set_2030", params_path),
+            params= {"features": ["round"] + MODEL_FEATURES, "year": 2030}
+        )
+
+    return pipeline
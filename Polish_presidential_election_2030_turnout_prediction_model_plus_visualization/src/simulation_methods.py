@@ -0,0 +1,213 @@
+from dataclasses import dataclass
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed, parallel_config
+
+from src.arima_cache_methods import ArimaCache
+from src.panel_methods import IndicatorPanel
+from src.feature_engineering_methods import simulate_series_arima, _delta_name
+from src.model_training_and_prediction_methods import load_model, predict_array
+
+# Methods:
+
+@dataclass
+class IndicatorDraws:
+    """
+    Monte Carlo sample of indicator trajectories.
+
+    Attributes:
+        values (np.ndarray): float32 array of shape (draw, county, year, indicator). Observed
+            years hold the observed value in every draw, later years the simulated paths.
+        indicators (list[str]): Indicator names (last axis).
+        terc_codes (np.ndarray): TERC codes of the counties (second axis).
+        county_names (np.ndarray): County names aligned with `terc_codes`.
+        years (np.ndarray): Contiguous ascending years (third axis).
+    """
+    values: np.ndarray
+    indicators: list[str]
+    terc_codes: np.ndarray
+    county_names: np.ndarray
+    years: np.ndarray
+
+    def features(self, election_year: int, deltas: tuple = (1, 5)) -> tuple[np.ndarray, list[str]]:
+        """
+        Rebuilds the election features of `prepare_lagged_features` for every draw at once.
+
+        Indicators are lagged by one year, so the features of `election_year` are the
+        levels of the year before and their differences to `deltas` years earlier.
+
+        Returns:
+            tuple[np.ndarray, list[str]]: float32 array of shape (draw, county, feature) and
+                the feature names (the indicator names and "{indicator}_delta_..." columns).
+        """
+        position = int(election_year - 1 - self.years[0])
+        if position < max(deltas, default= 0) or position >= len(self.years):
+            raise ValueError(f"Years {self.years[0]}-{self.years[-1]} do not cover the features of {election_year} with deltas {deltas}")
+
+        levels = self.values[:, :, position, :]
+        blocks = [levels] + [levels - self.values[:, :, position - periods, :] for periods in deltas]
+        names = list(self.indicators) + [_delta_name(col, periods) for periods in deltas for col in self.indicators]
+
+        return np.concatenate(blocks, axis= -1), names
+
+def _simulate_task_batch(tasks: list[tuple], n_draws: int, cache: ArimaCache|None = None) -> list[tuple]:
+    results = []
+
+    for county_position, indicator_position, terc_code, col, values, periods, seed in tasks:
+        try:
+            paths = simulate_series_arima(values, periods, n_draws, seed, cache, f"forecast/{terc_code}/{col}")
+            results.append((county_position, indicator_position, paths, None))
+        except Exception as e:
+            results.append((county_position, indicator_position, np.full((periods, n_draws), np.nan, dtype= np.float32), f"{type(e).__name__}: {e}"))
+
+    return results
+
+def simulate_indicator_draws(
+        dataframe: pd.DataFrame|IndicatorPanel,
+        indicators_list: list,
+        last_year: int = 2029,
+        n_draws: int = 1000,
+        history_years: int = 5,
+        n_jobs: int = -1,
+        batch_size: int = 16,
+        cache: ArimaCache|None = None,
+        random_state: int = 42,
+        verbose: int = 0
+) -> tuple[IndicatorDraws, pd.DataFrame]:
+    """
+    Simulates `n_draws` ARIMA sample paths of every (county, indicator) series up to `last_year`.
+
+    Every series is simulated from the year after its last observation (as in
+    `pipeline_methods.forecast_indicator_to_2030`) with the same models as the point
+    forecasts, so a shared `cache` skips refitting. Fits run on a process pool in
+    batches like `forecast_indicators_parallel`; each series gets its own seed,
+    so results do not depend on `n_jobs`. Only the last `history_years` + 1 years are
+    kept, which is all the 5-year deltas of the next election need: at 1000 draws,
+    380 counties and 4 indicators the float32 sample takes about 36 MB.
+
+    Args:
+        dataframe (pd.DataFrame|IndicatorPanel): History with "terc_code", "county", "year"
+            and the indicator columns, or an `IndicatorPanel`.
+        indicators_list (list): Indicators to simulate.
+        last_year (int): Last simulated year.
+        n_draws (int): Number of sample paths per series.
+        history_years (int): Years kept before `last_year`.
+        n_jobs (int): Worker processes.
+        batch_size (int): Series simulated per worker task.
+        cache (ArimaCache|None): Optional cache of fitted models and selected orders.
+        random_state (int): Base seed.
+        verbose (int): joblib verbosity level.
+
+    Returns:
+        tuple[IndicatorDraws, pd.DataFrame]:
+            - the draws,
+            - failures: "terc_code", "indicator", "error" for every failed series (NaN draws).
+    """
+    panel = dataframe if isinstance(dataframe, IndicatorPanel) else IndicatorPanel.from_long(dataframe, indicators_list)
+    years = np.arange(last_year - history_years, last_year + 1)
+
+    values = np.full((n_draws, len(panel.terc_codes), len(years), len(indicators_list)), np.nan, dtype= np.float32)
+    tasks = []
+
+    for indicator_position, col in enumerate(indicators_list):
+        series = panel.indicator(col)
+
+        for county_position, terc_code in enumerate(panel.terc_codes):
+            observed = ~np.isnan(series[county_position])
+            if not observed.any():
+                continue
+
+            last_observed = int(panel.years[np.flatnonzero(observed)[-1]])
+            in_range = (panel.years >= years[0]) & (panel.years <= min(last_observed, last_year))
+            values[:, county_position, panel.years[in_range] - years[0], indicator_position] = series[county_position, in_range]
+
+            if last_observed < last_year:
+                seed = [random_state, indicator_position, county_position]
+                tasks.append((county_position, indicator_position, terc_code, col, series[county_position, observed], last_year - last_observed, seed))
+
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+
+    with parallel_config(backend= "loky", inner_max_num_threads= 1):
+        results_nested = Parallel(n_jobs= n_jobs, verbose= verbose)(
+            delayed(_simulate_task_batch)(batch, n_draws, cache) for batch in batches
+        )
+
+    failures = []
+    for batch_results in results_nested:
+        for county_position, indicator_position, paths, error in batch_results:
+            periods = len(paths)
+            kept = min(periods, len(years))
+            # paths[-kept:] are the simulated years that fall inside the kept window.
+            values[:, county_position, len(years) - kept:, indicator_position] = paths[periods - kept:].T
+            if error is not None:
+                failures.append({"terc_code": panel.terc_codes[county_position], "indicator": indicators_list[indicator_position], "error": error})
+
+    draws = IndicatorDraws(values, list(indicators_list), panel.terc_codes, panel.county_names, years)
+
+    return draws, pd.DataFrame(failures, columns= ["terc_code", "indicator", "error"])
+
+def simulate_turnout(
+        model_path: str,
+        draws: IndicatorDraws,
+        election_year: int = 2030,
+        rounds: tuple = (1, 2),
+        quantiles: tuple = (0.05, 0.5, 0.95),
+        batch_draws: int = 100
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Scores every indicator draw with a persisted turnout model and summarises the spread per county.
+
+    The model features are rebuilt from the draws (`IndicatorDraws.features`) and
+    scored `batch_draws` draws at a time, each batch in one `predict` call over all
+    counties and rounds.
+
+    Args:
+        model_path (str): File written by `model_training_and_prediction_methods.save_model`.
+        draws (IndicatorDraws): Output of `simulate_indicator_draws`.
+        election_year (int): Election year to predict.
+        rounds (tuple): Election rounds (the "round" feature).
+        quantiles (tuple): Quantiles reported as prediction interval bounds.
+        batch_draws (int): Draws scored per `predict` call (bounds memory).
+
+    Returns:
+        tuple[pd.DataFrame, np.ndarray]:
+            - intervals: "terc_code", "county", "year", "round" and the mean, standard
+              deviation and quantiles of the target, e.g. "turnout_percentage_q05",
+            - predictions: float32 array of shape (draw, county, round).
+    """
+    record = load_model(model_path)
+    features, target_column = record["features"], record["target"]
+
+    feature_values, names = draws.features(election_year)
+    positions = {name: i for i, name in enumerate(names)}
+
+    missing = [feature for feature in features if feature != "round" and feature not in positions]
+    if missing:
+        raise KeyError(f"Features cannot be rebuilt from the simulated indicators: {missing}")
+
+    n_draws, n_counties = feature_values.shape[:2]
+    predictions = np.empty((n_draws, n_counties, len(rounds)), dtype= np.float32)
+
+    for start in range(0, n_draws, batch_draws):
+        batch = feature_values[start:start + batch_draws]
+
+        X = np.empty((len(batch), n_counties, len(rounds), len(features)))
+        for j, feature in enumerate(features):
+            X[..., j] = np.asarray(rounds)[None, None, :] if feature == "round" else batch[:, :, positions[feature], None]
+
+        predictions[start:start + len(batch)] = predict_array(record["model"], X.reshape(-1, len(features)), features).reshape(len(batch), n_counties, len(rounds))
+
+    intervals_df = pd.DataFrame({
+        "terc_code": np.repeat(draws.terc_codes, len(rounds)),
+        "county": np.repeat(draws.county_names, len(rounds)),
+        "year": election_year,
+        "round": np.tile(rounds, n_counties),
+    })
+    intervals_df[f"{target_column}_mean"] = predictions.mean(axis= 0).ravel()
+    intervals_df[f"{target_column}_std"] = predictions.std(axis= 0).ravel()
+
+    quantile_values = np.quantile(predictions, quantiles, axis= 0)
+    for q, q_values in zip(quantiles, quantile_values):
+        intervals_df[f"{target_column}_q{round(q * 100):02d}"] = q_values.ravel()
+
+    return intervals_df, predictions
@@ -0,0 +1,161 @@
+import os
+from functools import cache
+import pandas as pd
+import numpy as np
+
+TERRITORY_CODES_PATH: str = os.path.join("..", "Data", "Raw_data", "TERC", "territory_codes.csv")
+COUNTY_NAMES_PATH: str = os.path.join("..", "Data", "Raw_data", "TERC", "county_names.xlsx")
+
+# Methods:
+
+def normalise_county_names(names: pd.Series) -> pd.Series:
+    """
+    Lower-cases county names and strips the decorations used across sources
+    ("Powiat m. st. Warszawa", "m. Wrocław", "Wrocław, m." -> "warszawa", "wrocław").
+    """
+    return (
+        names.astype(str)
+        .str.strip()
+        .str.casefold()
+        .str.replace(r"^powiat\s+", "", regex= True)
+        .str.replace(r"^m\.\s+(st\.\s+)?", "", regex= True)
+        .str.replace(r",\s*m\.$", "", regex= True)
+    )
+
+
+class TercResolver:
+    """
+    Prebuilt index from county names to 4-digit TERC codes.
+
+    Built once from the powiat rows of the TERC register, it keeps two hash maps:
+    (name, voivodeship prefix) -> code and name -> code (first code of the name in
+    register order). `resolve` maps whole arrays of names through them with the rule
+    of `update_terc_codes` (a code in the row's voivodeship wins, any code of the name
+    otherwise) without merging, sorting and deduplicating the data: only the distinct
+    (name, prefix) pairs are looked up.
+
+    Unlike `update_terc_codes`, names are compared after `normalise_county_names` by
+    default, so "Powiat m. Wrocław" or "WROCŁAW" resolve where the exact join finds
+    nothing. With `exact=True` names must be equal as given, like in the join. When a
+    name has several candidate codes in the same voivodeship the first one in register
+    order wins, where `update_terc_codes` keeps whichever its (unstable) sort puts first.
+
+    The resolver is read-only after construction, so one instance (`get_terc_resolver`)
+    can be shared between threads.
+
+    Args:
+        reference_df (pd.DataFrame): "county" and "terc_code" columns (see `load_terc_reference`).
+        unknown_names (list[str]): Names from additional sources that are missing in the register.
+        exact (bool): Matches names exactly instead of after normalisation.
+    """
+
+    def __init__(self, reference_df: pd.DataFrame, unknown_names: list[str]|None = None, exact: bool = False) -> None:
+        self.exact = exact
+        names = self._normalise(reference_df["county"]).to_numpy()
+        codes = reference_df["terc_code"].astype(str).to_numpy()
+
+        self.candidates: dict[str, list[str]] = {}
+        for name, code in zip(names, codes):
+            self.candidates.setdefault(name, []).append(code)
+
+        self.county_names: dict[str, str] = dict(zip(codes[::-1], reference_df["county"].to_numpy()[::-1]))
+        self._by_name = {name: name_codes[0] for name, name_codes in self.candidates.items()}
+        self._by_name_and_prefix = {f"{name}|{code[:2]}": code for name, code in zip(names[::-1], codes[::-1])}
+        self.unknown_names = unknown_names or []
+
+    def _normalise(self, names: pd.Series) -> pd.Series:
+        return names.astype(str) if self.exact else normalise_county_names(names)
+
+    @classmethod
+    def from_files(cls, territory_path: str = TERRITORY_CODES_PATH, county_names_path: str|None = COUNTY_NAMES_PATH) -> "TercResolver":
+        """
+        Loads the powiat rows of "territory_codes.csv" and, when given, checks the
+        county list of "county_names.xlsx" against them (per voivodeship); names of the
+        list that the register does not know are kept in `unknown_names`.
+        """
+        territory_df = pd.read_csv(territory_path, sep= ";", dtype= str, encoding= "utf-8-sig")
+        counties = territory_df[territory_df["POW"].notna() & territory_df["GMI"].isna()]
+
+        reference_df = pd.DataFrame({
+            "county": counties["NAZWA"].to_numpy(),
+            "terc_code": (counties["WOJ"] + counties["POW"]).to_numpy(),
+        })
+
+        unknown_names = []
+        if county_names_path is not None:
+            voivodeships = territory_df[territory_df["POW"].isna()]
+            voivodeship_codes = dict(zip(voivodeships["NAZWA"].str.casefold(), voivodeships["WOJ"]))
+
+            names_df = pd.read_excel(county_names_path, dtype= str)
+            prefixes = names_df["Województwo"].str.casefold().map(voivodeship_codes)
+            keys = normalise_county_names(names_df["Powiat"]) + "|" + prefixes.fillna("")
+
+            known = set(normalise_county_names(reference_df["county"]) + "|" + reference_df["terc_code"].str[:2])
+            unknown_names = names_df.loc[~keys.isin(known), "Powiat"].tolist()
+
+        return cls(reference_df, unknown_names)
+
+    def resolve(self, names, prefixes= None, return_unmatched: bool = False) -> np.ndarray|tuple[np.ndarray, list[str]]:
+        """
+        Returns the TERC code of every name (None where the name is unknown).
+
+        Args:
+            names: Array-like of county names.
+            prefixes: Optional array-like of voivodeship prefixes (or longer codes,
+                only the first 2 characters are used) preferred for ambiguous names.
+            return_unmatched (bool): Also returns the sorted distinct names that were not matched.
+
+        Returns:
+            np.ndarray|tuple[np.ndarray, list[str]]: Object array of codes aligned with `names`,
+                and the unmatched names when `return_unmatched` is set.
+        """
+        names = np.asarray(names, dtype= object)
+        name_positions, unique_names = pd.factorize(names)
+
+        if prefixes is None:
+            prefix_positions, unique_prefixes = np.zeros(len(names), dtype= np.int64), pd.Index([""])
+        else:
+            prefix_positions, unique_prefixes = pd.factorize(pd.Series(np.asarray(prefixes, dtype= object)).astype(str).str[:2].to_numpy())
+
+        # Distinct (name, prefix) pairs are resolved once and broadcast back to the rows.
+        pair_ids = name_positions * len(unique_prefixes) + prefix_positions
+        pair_positions, unique_pairs = pd.factorize(pair_ids)
+
+        normalised = self._normalise(pd.Series(unique_names)).to_numpy()
+        pair_names = normalised[unique_pairs // len(unique_prefixes)]
+        pair_prefixes = np.asarray(unique_prefixes)[unique_pairs % len(unique_prefixes)]
+
+        pair_codes = np.array([
+            self._by_name_and_prefix.get(f"{name}|{prefix}", self._by_name.get(name))
+            for name, prefix in zip(pair_names, pair_prefixes)
+        ], dtype= object)
+
+        codes = pair_codes[pair_positions] if len(names) else np.array([], dtype= object)
+        codes[name_positions < 0] = None
+
+        if not return_unmatched:
+            return codes
+
+        unmatched = pd.isna(codes) & (name_positions >= 0)
+        return codes, sorted(str(name) for name in pd.unique(names[unmatched]))
+
+    def resolve_frame(self, target_df: pd.DataFrame, join_column: str = "county", code_column: str = "terc_code") -> pd.DataFrame:
+        """
+        Drop-in replacement of `update_terc_codes(target_df, reference_df)`: returns a copy with
+        `code_column` resolved from `join_column`, preferring the voivodeship of the current code.
+        """
+        resolved_df = target_df.copy()
+        prefixes = target_df[code_column].astype(str) if code_column in target_df.columns else None
+        resolved_df[code_column] = self.resolve(target_df[join_column].to_numpy(), None if prefixes is None else prefixes.to_numpy())
+
+        return resolved_df
+
+    def unmatched(self, names) -> list[str]:
+        """Returns the distinct names that `resolve` cannot map."""
+        return self.resolve(names, return_unmatched= True)[1]
+
+
+@cache
+def get_terc_resolver(territory_path: str = TERRITORY_CODES_PATH, county_names_path: str|None = COUNTY_NAMES_PATH) -> TercResolver:
+    """Returns the process-wide resolver for the given files (built on first use)."""
+    return TercResolver.from_files(territory_path, county_names_path)